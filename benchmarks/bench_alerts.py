@@ -0,0 +1,175 @@
+"""
+Level-proximity alerts over a replayed random-walk price stream.
+
+Times alerts.AlertEngine with its bisected LevelIndex against the same
+engine scanning every level of the universe on each tick, for a small and
+the full universe, and checks both fire identical alerts. Then walks one
+level through a scripted price path to check debounce, cooldown and
+hysteresis, replays the stream through the local websocket server into a
+LogSink and a WebhookSink (a local HTTP receiver), and polls the fake quotes
+endpoint once.
+
+    python benchmarks/bench_alerts.py --symbols 1000 --ticks 5000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.alerts import AlertEngine, LevelIndex, LogSink, WebhookSink, poll_quotes
+from oi_analyzer.engine import analyze_symbol
+from oi_analyzer.streaming import stream_websocket
+
+
+class LinearIndex(LevelIndex):
+    """The same lookups by checking every level of the universe."""
+
+    def near(self, symbol, price, width):
+        below = [level for level in self.levels
+                 if level.symbol == symbol and level.strike < price and price - level.strike <= width(level.strike)]
+        above = [level for level in self.levels
+                 if level.symbol == symbol and level.strike >= price and level.strike - price <= width(level.strike)]
+        key = lambda level: (level.strike, level.kind)
+        return sorted(below, key=key, reverse=True) + sorted(above, key=key)
+
+
+def make_ticks(rows, count, seed=0):
+    """Random-walk spot ticks, 20 per second, starting from each row's spot."""
+    rng = random.Random(seed)
+    spots = {row["symbol"]: row["stock_price"] for row in rows}
+    symbols = list(spots)
+    ticks = []
+    for i in range(count):
+        symbol = rng.choice(symbols)
+        spots[symbol] = round(spots[symbol] * (1 + rng.gauss(0, 0.003)), 2)
+        ticks.append({"symbol": symbol, "ltp": spots[symbol], "ts": 1_700_000_000 + i * 0.05})
+    return ticks
+
+
+def run(engine, ticks):
+    alerts = []
+    start = time.perf_counter()
+    for tick in ticks:
+        alerts.extend(engine.on_price(tick["symbol"], tick["ltp"], tick["ts"]))
+    return alerts, time.perf_counter() - start
+
+
+def check_state_machine():
+    """One support at 100, 1% band, 2 s debounce, 60 s cooldown, re-arm at 2 bands."""
+    engine = AlertEngine([{"symbol": "X", "support_strike": 100.0, "resistance_strike": None}],
+                         pct=0.01, debounce=2, cooldown=60, rearm=2)
+    path = [  # (ts, price, fires)
+        (0, 105.0, False),   # far away
+        (1, 100.8, False),   # enters the band: pending
+        (2, 101.5, False),   # leaves before the debounce ran out
+        (3, 100.5, False),   # pending again
+        (4, 100.4, False),   # 1 s in the band
+        (5, 100.2, True),    # 2 s in the band: fires
+        (6, 101.5, False),   # out of the band but inside the re-arm band
+        (8, 100.5, False),   # back in: still fired, no repeat
+        (9, 102.5, False),   # beyond 2 bands: re-armed
+        (10, 100.5, False),  # pending
+        (13, 100.5, False),  # debounced, but within the cooldown
+        (66, 99.6, True),    # cooldown over, still in the band: fires
+    ]
+    for ts, price, fires in path:
+        alerts = engine.on_price("X", price, ts)
+        assert bool(alerts) == fires, (ts, price, alerts)
+    assert alerts[0].side == "below" and alerts[0].kind == "support", alerts
+    print(f"  state machine: debounce, cooldown and hysteresis behave as scripted ({engine.stats})")
+
+
+class Receiver(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.received.append(body)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check_sinks(rows, ticks, expected, root):
+    receiver = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    receiver.received, receiver.lock = [], threading.Lock()
+    threading.Thread(target=receiver.serve_forever, daemon=True).start()
+    log_path = os.path.join(root, "alerts.log")
+    webhook = WebhookSink(f"http://127.0.0.1:{receiver.server_address[1]}/alert")
+    engine = AlertEngine(rows, [LogSink(log_path), webhook])
+    server, url = fake_fyers.start_replay_server(ticks, batch_size=100)
+    start = time.perf_counter()
+    stream_websocket(url, engine)
+    engine.close()
+    elapsed = time.perf_counter() - start
+    with open(log_path) as f:
+        logged = [json.loads(line) for line in f]
+    assert [(a["symbol"], a["strike"], a["ts"]) for a in logged] == [(a.symbol, a.strike, a.ts) for a in expected]
+    assert len(receiver.received) == len(expected) and webhook.stats["sent"] == len(expected), webhook.stats
+    print(f"  websocket replay -> log file + webhook: {len(logged)} alerts delivered to both in {elapsed:.2f} s")
+    server.shutdown()
+    receiver.shutdown()
+
+
+def check_quotes(rows, root):
+    from fyers_apiv3 import fyersModel
+    os.chdir(root)  # the SDK writes its log files to the working directory
+    server, base_url = fake_fyers.start_server(latency=0)
+    fake_fyers.point_sdk_at(base_url)
+    fyers = fyersModel.FyersModel(client_id="BENCH", token="bench", is_async=False, log_path="")
+    target = next(row for row in rows if row["support_strike"] is not None)
+    server.spots[target["symbol"]] = target["support_strike"]
+    symbols = [row["symbol"] for row in rows]
+    engine = AlertEngine(rows)
+    alerts = []
+    for symbol, ltp, ts in poll_quotes(fyers, symbols, rate_per_sec=1e6, cycles=1):
+        alerts.extend(engine.on_price(symbol, ltp, ts))
+    assert any(a.symbol == target["symbol"] and a.kind == "support" for a in alerts), alerts
+    print(f"  quotes poll: {engine.stats['ticks']} LTPs in {server.hits} calls, "
+          f"{len(alerts)} alert(s) incl. {target['symbol']} at support")
+    server.shutdown()
+    os.chdir("/")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+
+    universe = fake_fyers.make_universe(args.symbols)
+    rows = [row for row in (analyze_symbol(s, r) for s, r in universe.items()) if row is not None]
+    print(f"{len(rows)} symbols, {len(LevelIndex(rows))} levels, {args.ticks} ticks")
+    for size in (max(1, len(rows) // 10), len(rows)):
+        subset = rows[:size]
+        ticks = make_ticks(subset, args.ticks)
+        indexed = AlertEngine(subset)
+        linear = AlertEngine(subset)
+        linear.index = LinearIndex(subset)
+        alerts, fast = run(indexed, ticks)
+        reference, slow = run(linear, ticks)
+        assert alerts == reference, "indexed and linear engines disagree"
+        print(f"  {len(indexed.index):6d} levels: LevelIndex {fast / len(ticks) * 1e6:7.1f} us/tick, "
+              f"linear scan {slow / len(ticks) * 1e6:8.1f} us/tick; {len(alerts)} identical alerts")
+
+    check_state_machine()
+    root = tempfile.mkdtemp(prefix="alerts_")
+    try:
+        check_sinks(rows, ticks, alerts, root)
+        check_quotes(rows[:120], root)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
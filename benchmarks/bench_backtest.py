@@ -0,0 +1,112 @@
+"""
+Record synthetic trading days into a store, check that the prepared rows
+reproduce levels.compute_levels() at the default parameters, then time a
+parameter sweep and extrapolate it to a month of the full universe.
+
+    python benchmarks/bench_backtest.py --days 5 --symbols 50 --workers 8
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from oi_analyzer import backtest
+from tests import fake_fyers
+from oi_analyzer.batch import intraday_levels
+from oi_analyzer.levels import compute_levels
+from oi_analyzer.store import SnapshotStore, chain_columns
+
+
+def record(store, symbols, days, snapshots, rng):
+    """Random-walk spot and OI for every symbol, `snapshots` per day, 5 minutes apart."""
+    chains = {s: fake_fyers.make_option_chain(s) for s in symbols}
+    state = {}
+    for s, response in chains.items():
+        spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp = chain_columns(response)
+        state[s] = [spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp]
+    for d in range(days):
+        t0 = time.mktime(time.strptime(f"2025-01-{d + 1:02d} 09:15", "%Y-%m-%d %H:%M"))
+        for n in range(snapshots):
+            for s in symbols:
+                spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp = state[s]
+                spot = state[s][0] = round(spot * (1 + rng.gauss(0, 0.002)), 2)
+                ce_oi += np.array([max(0, int(rng.gauss(0, 2000))) for _ in ce_oi])
+                pe_oi += np.array([max(0, int(rng.gauss(0, 2000))) for _ in pe_oi])
+                store.append_arrays(s, t0 + n * 300, spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp)
+
+
+def check_default_params(store, out_dir):
+    """Prepared rows scored at compute_levels()'s parameters give compute_levels()'s levels."""
+    data = backtest.open_prepared(out_dir)
+    day = store.days()[0]
+    name = store.symbols(day)[0]
+    row = 0
+    for s in store.symbols(day):
+        if s == name:
+            break
+        row += len(store.snapshots(s, day)["snap_ts"])
+    _, spot, cols = store.snapshot(name, day, 0)
+    calls = {float(k): int(v) for k, v in zip(cols["strike"], cols["ce_oi"]) if v >= 0}
+    puts = {float(k): int(v) for k, v in zip(cols["strike"], cols["pe_oi"]) if v >= 0}
+    want = compute_levels(calls, puts, spot)
+    got = intraday_levels(
+        data["strikes"][row:row + 1], data["ce_oi"][row:row + 1], data["pe_oi"][row:row + 1],
+        data["ce_mask"][row:row + 1], data["pe_mask"][row:row + 1], data["spot"][row:row + 1, None])
+    for side in ("resistance", "support"):
+        expected = want[f"intraday_{side}s"][0][0] if want[f"intraday_{side}s"] else None
+        actual = got[f"{side}_strike"][0]
+        assert (expected is None and np.isnan(actual)) or expected == actual, (side, expected, actual)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--snapshots", type=int, default=75, help="snapshots per symbol per day")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--combos", type=int, default=None, help="score the first N of the 1000 grid combinations")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="backtest_")
+    store = SnapshotStore(os.path.join(root, "store"))
+    symbols = [f"NSE:SYM{i}-EQ" for i in range(args.symbols)]
+    start = time.perf_counter()
+    record(store, symbols, args.days, args.snapshots, random.Random(0))
+    print(f"recorded {args.days} days x {args.symbols} symbols x {args.snapshots} snapshots "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    out_dir = os.path.join(root, "prepared")
+    start = time.perf_counter()
+    rows = backtest.prepare(store, out_dir=out_dir)
+    print(f"prepared {rows:,} rows in {time.perf_counter() - start:.2f}s")
+    check_default_params(store, out_dir)
+
+    # Default: a reduced grid (every dominance value) to extrapolate from.
+    grid = backtest.grid_combinations()[:args.combos or 100]
+    start = time.perf_counter()
+    serial = backtest.score(grid[0], backtest.open_prepared(out_dir))
+    per_combo = time.perf_counter() - start
+    print(f"one combination, one process: {per_combo * 1e3:.0f} ms "
+          f"({per_combo / rows * 1e6:.2f} us/row, respect rate {serial['respect_rate']:.1%})")
+
+    start = time.perf_counter()
+    results = backtest.sweep(out_dir, grid, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{len(grid)} combinations on {args.workers} workers: {elapsed:.1f}s")
+    month_rows = 20 * 200 * args.snapshots
+    print(f"extrapolated: month of 200 symbols ({month_rows:,} rows) x 1000 combinations "
+          f"~{elapsed / len(grid) * 1000 * month_rows / rows / 60:.1f} min")
+    best = results[0]
+    print("best:", {k: best[k] for k in list(backtest.GRID) + ["tested", "respect_rate"]})
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Time batch.batch_levels (plus packing the OI dicts with pack_dicts, as
+run_scan does) against levels.compute_levels symbol by symbol over a full
+universe. tests/test_batch.py checks both return the same levels.
+
+    python benchmarks/bench_batch.py --symbols 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oi_analyzer import batch
+from oi_analyzer import levels
+
+
+def time_universe(symbols, strikes=41, repeat=20):
+    rng = random.Random(symbols)
+    chains = []
+    for _ in range(symbols):
+        base = rng.randint(20, 200) * 10.0
+        calls = {base + i * 10: rng.randint(1000, 500000) for i in range(strikes)}
+        puts = {base + i * 10: rng.randint(1000, 500000) for i in range(strikes)}
+        chains.append((calls, puts, base + strikes * 5 + rng.uniform(-20, 20)))
+    start = time.perf_counter()
+    for calls, puts, spot in chains:
+        levels.compute_levels(calls, puts, spot)
+    per_symbol = time.perf_counter() - start
+
+    spots = [spot for _, _, spot in chains]
+    start = time.perf_counter()
+    packed = batch.pack_dicts([(c, p) for c, p, _ in chains])
+    pack_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        batch.batch_levels(*packed, spots)
+    batch_time = (time.perf_counter() - start) / repeat
+    print(f"{symbols:5d} symbols x {strikes} strikes: per-symbol {per_symbol * 1e3:7.2f} ms"
+          f"  batch {batch_time * 1e3:7.2f} ms  (+pack {pack_time * 1e3:.2f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, nargs="*", default=[10, 200, 2000])
+    args = parser.parse_args()
+    for symbols in args.symbols:
+        time_universe(symbols)
+
+
+if __name__ == "__main__":
+    main()
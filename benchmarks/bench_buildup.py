@@ -0,0 +1,165 @@
+"""
+Change in OI, buildup and level shifts between two scans of a synthetic
+universe: buildup.BuildupTracker (one aligned pass over the whole universe)
+against a per-symbol loop over strike dicts, checked for identical columns.
+Also checks that seeding from a SnapshotStore and the previous results
+reproduces the in-memory tracker, as `oi-analyzer scan --buildup` does.
+
+    python benchmarks/bench_buildup.py --symbols 2000 --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.buildup import BUILDUPS, COLUMNS, TREND_PCT, BuildupTracker, chains_from
+from oi_analyzer.engine import analyze_symbol
+from oi_analyzer.store import SnapshotStore
+
+
+def evolve(response, rng):
+    """Next scan: spot, OI and premiums move; a few far legs appear or vanish."""
+    response = json.loads(json.dumps(response))
+    chain = response["data"]["optionsChain"]
+    chain[0]["ltp"] = round(chain[0]["ltp"] * (1 + rng.gauss(0, 0.01)), 2)
+    legs = []
+    for row in chain[1:]:
+        if rng.random() < 0.01:
+            continue
+        row["oi"] = max(0, int(row["oi"] * rng.uniform(0.9, 1.1)))
+        row["ltp"] = round(max(0.05, row["ltp"] + rng.gauss(0, 1)), 2)
+        legs.append(row)
+    response["data"]["optionsChain"] = chain[:1] + legs
+    return response
+
+
+def rows_for(responses):
+    return [row for row in (analyze_symbol(s, r) for s, r in responses.items()) if row is not None]
+
+
+def legs(response):
+    """(spot, {strike: {"CE": (oi, ltp), "PE": (oi, ltp)}})."""
+    spot, strikes = None, {}
+    for item in response["data"]["optionsChain"]:
+        if item["option_type"] in ("CE", "PE"):
+            strikes.setdefault(float(item["strike_price"]), {})[item["option_type"]] = (item["oi"], item["ltp"])
+        else:
+            spot = item["ltp"]
+    return spot, strikes
+
+
+def classify(price_change, oi_change):
+    if price_change > 0 and oi_change > 0:
+        return BUILDUPS[1]
+    if price_change < 0 and oi_change > 0:
+        return BUILDUPS[2]
+    if price_change < 0 and oi_change < 0:
+        return BUILDUPS[3]
+    if price_change > 0 and oi_change < 0:
+        return BUILDUPS[4]
+    return BUILDUPS[0]
+
+
+def shift(before, after):
+    if before is None and after is None:
+        return None
+    if before is None:
+        return "new"
+    if after is None:
+        return "lost"
+    return "up" if after > before else "down" if after < before else "same"
+
+
+def reference(previous, previous_rows, current, rows):
+    """The same columns, one symbol and one strike at a time."""
+    levels = {row["symbol"]: row for row in previous_rows}
+    for row in rows:
+        symbol = row["symbol"]
+        old_spot, old = legs(previous[symbol])
+        _, new = legs(current[symbol])
+        calls = puts = matched = 0
+        for strike, sides in new.items():
+            if strike in old:
+                matched += 1
+                calls += sides["CE"][0] - old[strike]["CE"][0] if "CE" in sides and "CE" in old[strike] else 0
+                puts += sides["PE"][0] - old[strike]["PE"][0] if "PE" in sides and "PE" in old[strike] else 0
+        row["buildup"] = classify(row["stock_price"] - old_spot, calls + puts) if matched else None
+        row["call_oi_change"], row["put_oi_change"] = (calls, puts) if matched else (None, None)
+        for side, kind in (("support", "PE"), ("resistance", "CE")):
+            strike = row[f"{side}_strike"]
+            now, before = new.get(strike, {}).get(kind), old.get(strike, {}).get(kind)
+            if strike is None or now is None or before is None:
+                row[f"{side}_oi_change"] = row[f"{side}_trend"] = row[f"{side}_buildup"] = None
+            else:
+                change = now[0] - before[0]
+                ratio = change / before[0] if before[0] else (float("inf") if change > 0 else 0.0)
+                row[f"{side}_oi_change"] = change
+                row[f"{side}_trend"] = ("strengthening" if ratio >= TREND_PCT
+                                        else "unwinding" if ratio <= -TREND_PCT else "steady")
+                row[f"{side}_buildup"] = classify(now[1] - before[1], change)
+            row[f"{side}_shift"] = shift(levels[symbol][f"{side}_strike"], row[f"{side}_strike"])
+    return rows
+
+
+def columns(rows):
+    return [tuple(row[c] for c in COLUMNS) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    first = fake_fyers.make_universe(args.symbols)
+    second = {symbol: evolve(response, rng) for symbol, response in first.items()}
+    first_rows, second_chains = rows_for(first), chains_from(second)
+
+    best = {"BuildupTracker.annotate": float("inf"), "per-symbol dict loop": float("inf")}
+    for _ in range(args.repeat):
+        tracker = BuildupTracker()
+        tracker.annotate(rows_for(first), chains_from(first))
+        rows = rows_for(second)
+        start = time.perf_counter()
+        tracker.annotate(rows, second_chains)
+        best["BuildupTracker.annotate"] = min(best["BuildupTracker.annotate"], time.perf_counter() - start)
+        expected = rows_for(second)
+        start = time.perf_counter()
+        reference(first, first_rows, second, expected)
+        best["per-symbol dict loop"] = min(best["per-symbol dict loop"], time.perf_counter() - start)
+    assert columns(rows) == columns(expected), "tracker and reference disagree"
+    strikes = sum(len(chain) for chain in second_chains.values())
+    print(f"{len(rows)} symbols, {strikes:,d} strikes; columns identical to the per-symbol reference")
+    for name, seconds in best.items():
+        print(f"  {name:26s} {seconds * 1e3:8.1f} ms")
+    counts = {}
+    for row in rows:
+        counts[row["buildup"]] = counts.get(row["buildup"], 0) + 1
+    print("  symbol buildups: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items(), key=str)))
+
+    root = tempfile.mkdtemp(prefix="buildup_")
+    try:
+        store = SnapshotStore(os.path.join(root, "store"))
+        for symbol, response in first.items():
+            store.append(symbol, response)
+        seeded = BuildupTracker()
+        start = time.perf_counter()
+        seeded.seed(store, list(first), first_rows)
+        seed_time = time.perf_counter() - start
+        rows = rows_for(second)
+        seeded.annotate(rows, second_chains)
+        assert columns(rows) == columns(expected), "seeded tracker disagrees"
+        print(f"  seeding from the store + previous rows: {seed_time * 1e3:.1f} ms, same columns")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Sharded scanning against several local fake API servers, one per account,
+each enforcing its own per-second quota and checking access tokens.
+
+Times coordinator.ShardedScanner with 1 account against --accounts accounts,
+checks the merged output equals a single-process run_scan(), then revokes
+one account's tokens part-way through a scan and checks every symbol still
+comes back through the other workers.
+
+    python benchmarks/bench_coordinator.py --symbols 200 --accounts 4 --rate 10
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.coordinator import Account, ShardedScanner
+from oi_analyzer.engine import run_scan
+
+os.environ.setdefault("FYERS_SECRET_KEY", "secret")  # the app secret the refresh call sends
+
+
+def make_accounts(count, rate, root):
+    """(servers, accounts): a quota-limited, auth-checking fake server and a token file per account."""
+    servers, accounts = [], []
+    for i in range(count):
+        server, base_url = fake_fyers.start_server(latency=0.01, rate_per_sec=rate, require_auth=True)
+        token = fake_fyers.make_access_token()
+        server.valid_tokens.add(token)
+        server.refresh_token = f"refresh-{i}"
+        path = os.path.join(root, f"account{i}.json")
+        with open(path, "w") as f:
+            json.dump({"client_id": f"APP{i}-100", "access_token": token,
+                       "refresh_token": server.refresh_token}, f)
+        servers.append(server)
+        accounts.append(Account(path, rate, base_url))
+    return servers, accounts
+
+
+def revoke_after(server, hits):
+    """Kill the server's tokens (and its refresh token) once it has served `hits` chain requests."""
+    def run():
+        while server.hits < hits:
+            time.sleep(0.01)
+        with server.auth_lock:
+            server.valid_tokens.clear()
+        server.refresh_token = "revoked"
+    threading.Thread(target=run, daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=10, help="per-account quota, requests per second")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="coordinator_")
+    os.chdir(root)  # the SDK writes its log files to the working directory
+    symbols = [f"NSE:SYM{i}-EQ" for i in range(args.symbols)]
+    from fyers_apiv3 import fyersModel
+    reference_server, base_url = fake_fyers.start_server(latency=0)
+    fake_fyers.point_sdk_at(base_url)
+    fyers = fyersModel.FyersModel(client_id="BENCH", token="bench", is_async=False, log_path="")
+    expected = run_scan(fyers, symbols, rate_per_sec=1e6)
+
+    print(f"{len(symbols)} symbols, {args.rate:g} requests/s per account")
+    for count in (1, args.accounts):
+        servers, accounts = make_accounts(count, args.rate, root)
+        start = time.perf_counter()
+        results = ShardedScanner(accounts).scan(symbols)
+        elapsed = time.perf_counter() - start
+        assert results == expected, "sharded results differ from run_scan"
+        hits = ", ".join(str(server.hits) for server in servers)
+        print(f"  {count} account(s): {elapsed:6.1f} s  ({len(symbols) / elapsed:5.1f} symbols/s; requests per server {hits})")
+        for server in servers:
+            server.shutdown()
+
+    servers, accounts = make_accounts(args.accounts, args.rate, root)
+    revoke_after(servers[0], args.symbols // (2 * args.accounts))
+    scanner = ShardedScanner(accounts)
+    results = scanner.scan(symbols)
+    assert results == expected, "failover lost or changed rows"
+    assert list(scanner.failures) == [accounts[0].tokens_path], scanner.failures
+    print(f"  failover: account 0 revoked mid-scan, all {len(results)} rows returned; stats {scanner.stats}")
+    for server in servers + [reference_server]:
+        server.shutdown()
+    os.chdir("/")
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Fetch volume of the expiry-aware scan against the fake API: the current
+near-expiry ±20 scan, near/next/monthly at a blanket strikecount (20, and
+the widest count any symbol in the universe needs), and expiries.ExpiryPlanner
+(first scan with probes, then steady state). Also checks that the adaptive
+window loses nothing the max_pct_away-bounded intraday filters would use.
+
+    python benchmarks/bench_expiries.py --stocks 200 --indices 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer import levels
+from oi_analyzer.engine import parse_option_chain, run_scan
+from oi_analyzer.expiries import ExpiryPlanner, select_expiries
+from oi_analyzer.fetcher import fetch_chain_requests
+
+INDICES = ["NSE:NIFTY50-INDEX", "NSE:NIFTYBANK-INDEX", "NSE:FINNIFTY-INDEX", "NSE:MIDCPNIFTY-INDEX"]
+
+
+def measure(server, fn):
+    """(requests, chain rows, seconds) served while running fn()."""
+    hits, rows = server.hits, server.chain_rows
+    start = time.perf_counter()
+    fn()
+    return server.hits - hits, server.chain_rows - rows, time.perf_counter() - start
+
+
+def blanket(fyers, symbols, strikecount, fetch_kwargs):
+    """Every symbol's near/next/monthly expiries at one strikecount."""
+    requests = []
+    for symbol in symbols:
+        for _, ts in select_expiries(fake_fyers.expiry_data(symbol)):
+            requests.append((symbol, strikecount, str(ts)))
+    return fetch_chain_requests(fyers, requests, **fetch_kwargs)
+
+
+def check_window(fyers, symbols, planner):
+    """Intraday filters on the planner's near chain vs the same expiry at strikecount 50."""
+    for symbol in symbols:
+        plan = planner.plans[symbol]
+        ts = plan.expiries[0][1]
+        narrow, wide = fetch_chain_requests(
+            fyers, [(symbol, plan.strikecount(ts, planner.window_pct), str(ts)), (symbol, 50, str(ts))])
+        (spot, n_calls, n_puts), (_, w_calls, w_puts) = parse_option_chain(narrow), parse_option_chain(wide)
+        same = (levels.intraday_resistance_only_highest(n_calls, spot, 0.04, 0.7, 1.5)
+                == levels.intraday_resistance_only_highest(w_calls, spot, 0.04, 0.7, 1.5)
+                and levels.nearest_strong_supports_cluster(n_puts, spot, 2, 0.06, 0.6, 1.5)
+                == levels.nearest_strong_supports_cluster(w_puts, spot, 2, 0.06, 0.6, 1.5))
+        if not same:
+            raise AssertionError(f"{symbol}: adaptive window changes the intraday levels")
+    print(f"adaptive windows keep every intraday level on {len(symbols)} symbols")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=200)
+    parser.add_argument("--indices", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="expiries_")
+    os.chdir(root)  # the SDK writes its log files to the working directory
+    from fyers_apiv3 import fyersModel
+    server, base_url = fake_fyers.start_server(latency=0)
+    fake_fyers.point_sdk_at(base_url)
+    fyers = fyersModel.FyersModel(client_id="BENCH", token="bench", is_async=False, log_path="")
+    symbols = INDICES[:args.indices] + [f"NSE:SYM{i}-EQ" for i in range(args.stocks)]
+    fetch_kwargs = {"max_workers": args.workers, "rate_per_sec": 1e6}
+
+    planner = ExpiryPlanner()
+    first = measure(server, lambda: run_scan(fyers, symbols, expiries=planner, **fetch_kwargs))
+    steady = measure(server, lambda: run_scan(fyers, symbols, expiries=planner, **fetch_kwargs))
+    widest = max(plan.strikecount(ts, planner.window_pct) for plan in planner.plans.values() for _, ts in plan.expiries)
+    cases = [
+        ("near expiry only, strikecount 20 (current)",
+         measure(server, lambda: run_scan(fyers, symbols, strikecount=20, **fetch_kwargs))),
+        ("near/next/monthly, strikecount 20", measure(server, lambda: blanket(fyers, symbols, 20, fetch_kwargs))),
+        (f"near/next/monthly, strikecount {widest} (widest needed)",
+         measure(server, lambda: blanket(fyers, symbols, widest, fetch_kwargs))),
+        ("near/next/monthly, ExpiryPlanner first scan", first),
+        ("near/next/monthly, ExpiryPlanner steady state", steady),
+    ]
+    print(f"{len(symbols)} symbols ({args.indices} indices)            requests   chain rows      ms")
+    for name, (requests, rows, seconds) in cases:
+        print(f"  {name:52s} {requests:6d} {rows:12,d} {seconds * 1e3:7.0f}")
+    check_window(fyers, symbols, planner)
+
+    server.shutdown()
+    os.chdir("/")
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
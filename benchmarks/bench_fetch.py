@@ -0,0 +1,64 @@
+"""
+Serial vs concurrent option-chain fetching against the local fake API.
+
+    python benchmarks/bench_fetch.py --symbols 200 --latency 0.05 --rate 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fyers_apiv3 import fyersModel
+
+from tests import fake_fyers
+from oi_analyzer.fetcher import fetch_option_chains
+
+
+def serial_fetch(fyers, symbols, strikecount=20):
+    """The original main.py loop: one blocking call per symbol."""
+    responses = []
+    for symbol in symbols:
+        data = {"symbol": symbol, "strikecount": strikecount, "timestamp": ""}
+        responses.append(fyers.optionchain(data=data))
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency (s)")
+    parser.add_argument("--rate", type=float, default=50, help="client rate limit (req/s)")
+    parser.add_argument("--server-quota", type=float, default=None, help="server quota (req/s), 429 beyond it")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url = fake_fyers.start_server(latency=args.latency, rate_per_sec=args.server_quota)
+    fake_fyers.point_sdk_at(base_url)
+    fyers = fyersModel.FyersModel(client_id="FAKE", token="FAKE", is_async=False, log_path="")
+    symbols = [f"NSE:SYM{i}-EQ" for i in range(args.symbols)]
+
+    start = time.perf_counter()
+    serial = serial_fetch(fyers, symbols)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = fetch_option_chains(fyers, symbols, max_workers=args.workers, rate_per_sec=args.rate)
+    concurrent_time = time.perf_counter() - start
+
+    serial_ok = sum(1 for r in serial if r.get("code") == 200)
+    concurrent_ok = sum(1 for r in concurrent if r.get("code") == 200)
+    same_order = all(
+        a["data"]["optionsChain"][0]["symbol"] == b["data"]["optionsChain"][0]["symbol"]
+        for a, b in zip(serial, concurrent) if a.get("code") == 200 and b.get("code") == 200
+    )
+    print(f"symbols={args.symbols} latency={args.latency}s workers={args.workers} rate={args.rate}/s")
+    print(f"serial:     {serial_time:8.2f}s  ok={serial_ok}")
+    print(f"concurrent: {concurrent_time:8.2f}s  ok={concurrent_ok}  speedup={serial_time / concurrent_time:.1f}x")
+    print(f"order preserved: {same_order}  server hits: {server.hits}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
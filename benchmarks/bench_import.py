@@ -0,0 +1,59 @@
+"""
+Cold-start cost of the package's entry points: wall time of a fresh
+interpreter running each import (best of --repeat, minus a bare
+interpreter's start-up) and which heavy dependencies it pulled in.
+
+    python benchmarks/bench_import.py --repeat 7
+    python benchmarks/bench_import.py "import levels" --cli "main.py --help"   # any statements/command
+"""
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "pandas", "openpyxl", "fyers_apiv3", "requests", "flask", "tkinter")
+STATEMENTS = [
+    "import oi_analyzer",
+    "from oi_analyzer.levels import compute_levels",
+    "from oi_analyzer import compute_levels",
+    "import oi_analyzer.engine",
+    "import oi_analyzer.cli",
+    "import oi_analyzer.web",
+]
+REPORT = "import sys; print(' '.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def best_of(args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("statements", nargs="*", default=STATEMENTS)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--cli", default="-m oi_analyzer --help",
+                        help="interpreter arguments timed as a command (empty to skip)")
+    args = parser.parse_args()
+
+    bare = best_of([sys.executable, "-c", "pass"], args.repeat)
+    print(f"bare interpreter: {bare * 1e3:.0f} ms; times below exclude it")
+    for statement in args.statements:
+        elapsed = best_of([sys.executable, "-c", statement], args.repeat) - bare
+        loaded = subprocess.run([sys.executable, "-c", f"{statement}; " + REPORT.format(heavy=HEAVY)], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+        print(f"  {statement:50s} {elapsed * 1e3:7.0f} ms   loads: {loaded or '-'}")
+    if args.cli:
+        elapsed = best_of([sys.executable] + shlex.split(args.cli), args.repeat) - bare
+        print(f"  {'python ' + args.cli:50s} {elapsed * 1e3:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Time incremental.IncrementalLadder update + recompute against full
+recomputation with levels.py for ladders of 20-200 strikes.
+tests/test_incremental.py checks both agree under random updates.
+
+    python benchmarks/bench_incremental.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oi_analyzer import levels
+from oi_analyzer.incremental import IncrementalLadder
+
+
+def time_updates(strike_count, updates=3000):
+    rng = random.Random(strike_count)
+    strikes = [float(1000 + i * 10) for i in range(strike_count)]
+    calls = {k: rng.randint(1000, 500000) for k in strikes}
+    puts = {k: rng.randint(1000, 500000) for k in strikes}
+    spot = strikes[strike_count // 2] + 3.0
+    ops = []
+    for _ in range(updates):
+        if rng.random() < 0.3:
+            ops.append(("spot", spot * (1 + rng.gauss(0, 0.002)), None, None))
+        else:
+            ops.append(("oi", rng.choice(strikes), rng.choice(["CE", "PE"]), rng.randint(1000, 500000)))
+
+    ladder = IncrementalLadder(calls, puts, spot)
+    start = time.perf_counter()
+    for kind, a, b, c in ops:
+        if kind == "spot":
+            ladder.set_spot(a)
+        else:
+            ladder.set_oi(a, b, c)
+        ladder.compute_levels()
+    incremental = (time.perf_counter() - start) / updates
+
+    current_spot = spot
+    start = time.perf_counter()
+    for kind, a, b, c in ops:
+        if kind == "spot":
+            current_spot = a
+        else:
+            (calls if b == "CE" else puts)[a] = c
+        levels.compute_levels(calls, puts, current_spot)
+    full = (time.perf_counter() - start) / updates
+    print(f"{strike_count:4d} strikes: incremental {incremental * 1e6:7.1f} us/update"
+          f"   full recompute {full * 1e6:7.1f} us/update   ({full / incremental:.1f}x)")
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    for strike_count in (20, 50, 100, 200):
+        time_updates(strike_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Live dashboard push: what a scan costs to publish and what each viewer
+costs to serve, against the old page that re-rendered the whole table with
+pandas.to_html on every load.
+
+Publishes successive synthetic result sets where --changed of the rows move,
+with --viewers threads reading live.Broadcaster.stream() like /events does,
+and checks the Flask route end to end through the test client.
+
+    python benchmarks/bench_live.py --symbols 2000 --viewers 1,10,100,1000
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oi_analyzer.live import COLUMNS, Broadcaster
+
+
+def make_results(count, rng):
+    results = []
+    for i in range(count):
+        price = rng.uniform(50, 5000)
+        results.append({"symbol": f"NSE:SYM{i}-EQ", "stock_price": round(price, 2),
+                        "support_strike": round(price * 0.97), "support_oi": rng.randrange(10_000, 5_000_000),
+                        "resistance_strike": round(price * 1.03), "resistance_oi": rng.randrange(10_000, 5_000_000),
+                        "nearest_level": round(rng.uniform(0, 3), 2)})
+    results.append({"symbol": "NSE:NOLEVEL-EQ", "stock_price": 100.0, "support_strike": None,
+                    "support_oi": None, "resistance_strike": None, "resistance_oi": None,
+                    "nearest_level": float("nan")})
+    return results
+
+
+def tick(results, fraction, rng):
+    """A copy of `results` with `fraction` of the rows moved."""
+    results = [dict(row) for row in results]
+    for row in rng.sample(results, max(1, int(len(results) * fraction))):
+        row["stock_price"] = round(row["stock_price"] * rng.uniform(0.995, 1.005), 2)
+        row["nearest_level"] = round(rng.uniform(0, 3), 2)
+    return results
+
+
+def to_html_page(results):
+    return pd.DataFrame(results)[list(COLUMNS)].to_html(index=False).encode()
+
+
+def fan_out(results, viewers, rounds, fraction, rng):
+    """(ms per publish, ms from then until every viewer has the event, broadcaster stats)."""
+    broadcaster = Broadcaster(keepalive=60)
+    broadcaster.publish(results)
+    delivered = [0]
+    cond = threading.Condition()
+
+    def viewer():
+        stream = broadcaster.stream()
+        seen = 0
+        for chunk in stream:
+            if chunk.startswith(b"id:"):
+                seen += 1
+                with cond:
+                    delivered[0] += 1
+                    cond.notify_all()
+                if seen == rounds + 1:
+                    break
+        stream.close()
+
+    threads = [threading.Thread(target=viewer, daemon=True) for _ in range(viewers)]
+    for t in threads:
+        t.start()
+    with cond:
+        cond.wait_for(lambda: delivered[0] == viewers)  # everyone has the snapshot
+    publish_ms, deliver_ms = [], []
+    for i in range(rounds):
+        results = tick(results, fraction, rng)
+        start = time.perf_counter()
+        broadcaster.publish(results)
+        published = time.perf_counter()
+        with cond:
+            cond.wait_for(lambda: delivered[0] == viewers * (i + 2))
+        done = time.perf_counter()
+        publish_ms.append((published - start) * 1e3)
+        deliver_ms.append((done - published) * 1e3)
+    for t in threads:
+        t.join()
+    return min(publish_ms), min(deliver_ms), broadcaster.stats
+
+
+def check_route(results, fraction, rng):
+    """/events through Flask's test client: retry, the snapshot on connect, then one diff per publish."""
+    from oi_analyzer import web as web_view
+    app = web_view.create_app()
+    client = app.test_client()
+    response = client.get("/events", buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 3000\n\n"
+    assert next(chunks).startswith(b"id: 0\nevent: snapshot\n")
+    app.broadcaster.publish(results)
+    assert next(chunks).startswith(b"id: 1\nevent: diff\n")
+    app.broadcaster.publish(tick(results, fraction, rng))
+    assert next(chunks).startswith(b"id: 2\nevent: diff\n")
+    response.close()
+    assert app.broadcaster.clients == 0
+    print("/events: retry, snapshot/diff and resumable ids OK; viewer count back to 0 after disconnect")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of rows that move per scan")
+    parser.add_argument("--viewers", default="1,10,100,1000")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    results = make_results(args.symbols, rng)
+
+    start = time.perf_counter()
+    page = to_html_page(results)
+    html_ms = (time.perf_counter() - start) * 1e3
+    broadcaster = Broadcaster()
+    broadcaster.publish(results)
+    snapshot = broadcaster._snapshot_event()
+    diff = broadcaster.publish(tick(results, args.changed, rng))
+    print(f"{len(results)} rows, {args.changed:.0%} changing per scan")
+    print(f"  old page (pandas to_html per load)   {len(page):10,d} bytes  {html_ms:7.1f} ms per viewer per load")
+    print(f"  SSE snapshot (once per connect)      {len(snapshot):10,d} bytes")
+    print(f"  SSE diff (once per scan)             {len(diff):10,d} bytes")
+
+    print(f"  viewers   publish ms   then delivered to all ms   us per viewer   events encoded   snapshots encoded")
+    for viewers in [int(v) for v in args.viewers.split(",")]:
+        publish_ms, deliver_ms, stats = fan_out(results, viewers, args.rounds, args.changed, rng)
+        assert stats["published"] == args.rounds + 1 and stats["snapshots_encoded"] == 1, stats
+        print(f"  {viewers:7d} {publish_ms:12.2f} {deliver_ms:26.2f} {deliver_ms * 1e3 / viewers:15.1f}"
+              f" {stats['published']:16d} {stats['snapshots_encoded']:19d}")
+    check_route(results, args.changed, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time writing/reading results in each output format, the import cost each
+format drags in, and the cached symbol-list load.
+
+    python benchmarks/bench_output.py --rows 2000
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oi_analyzer import output
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        spot = rng.uniform(100, 5000)
+        sup, res = round(spot * 0.98, -1), round(spot * 1.02, -1)
+        rows.append({"symbol": f"NSE:SYM{i}-EQ", "stock_price": spot,
+                     "support_strike": sup, "support_oi": float(rng.randint(1000, 10 ** 6)), "support_diff": spot - sup,
+                     "resistance_strike": res, "resistance_oi": float(rng.randint(1000, 10 ** 6)),
+                     "resistance_diff": res - spot, "nearest_level": min(spot - sup, res - spot)})
+    return rows
+
+
+def import_cost(module):
+    """Wall time of a fresh interpreter importing `module` (minus a bare interpreter)."""
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        return time.perf_counter() - start
+    base = min(run("pass") for _ in range(3))
+    return min(run(f"import {module}") for _ in range(3)) - base
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+    tmp = tempfile.mkdtemp()
+
+    for ext, module in ((".csv", "csv"), (".parquet", "pyarrow.parquet"), (".arrow", "pyarrow"), (".xlsx", "openpyxl")):
+        path = os.path.join(tmp, "results" + ext)
+        try:
+            start = time.perf_counter()
+            output.write_results(rows, path)
+            write = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{ext:9s} skipped: {e}")
+            continue
+        start = time.perf_counter()
+        back = output.read_results(path)
+        read = time.perf_counter() - start
+        assert [r["symbol"] for r in back] == [r["symbol"] for r in rows]
+        print(f"{ext:9s} write {write * 1e3:7.1f} ms  read {read * 1e3:7.1f} ms  "
+              f"{os.path.getsize(path) / 1e3:7.0f} kB  import {module} ~{import_cost(module) * 1e3:.0f} ms")
+
+    symbols_csv = os.path.join(tmp, "stock_list.csv")
+    output.write_results([{"symbol": r["symbol"]} for r in rows], symbols_csv)
+    symbols_xlsx = os.path.join(tmp, "stock_list.xlsx")
+    output.write_results([{"symbol": r["symbol"]} for r in rows], symbols_xlsx)
+    for path in (symbols_xlsx, symbols_csv):
+        start = time.perf_counter()
+        output.load_symbols(path)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(100):
+            output.load_symbols(path)
+        cached = (time.perf_counter() - start) / 100
+        print(f"load_symbols {os.path.basename(path)}: first {first * 1e3:.1f} ms, unchanged file {cached * 1e6:.0f} us")
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Time engine.parse_option_chain() (the loop scans use) against
+parser.parse_chain() (the arrays buildup.py and store.py use) on 20- and
+100-strike chains. The dict loop is the faster way to get OI by strike;
+parse_chain() pays NumPy's per-call overhead for aligned arrays and the
+change-in-OI/volume columns. tests/test_parser.py checks that both agree.
+
+    python benchmarks/bench_parser.py --number 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.engine import parse_option_chain
+from oi_analyzer.parser import parse_chain
+
+
+def with_extras(response):
+    chain = parse_chain(response)
+    return chain.ce_oich, chain.pe_oich, chain.ce_volume, chain.pe_volume
+
+
+def best(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def time_parsers(strike_count, number):
+    # strikecount is per side of ATM, so 10 and 50 give 20- and 100-strike chains.
+    response = fake_fyers.make_option_chain("NSE:BENCH-EQ", strikecount=strike_count // 2, seed=1, missing=0)
+    gapped = fake_fyers.make_option_chain("NSE:BENCH-EQ", strikecount=strike_count // 2, seed=1, missing=0.2)
+    cases = [
+        ("parse_option_chain -> OI dicts", lambda: parse_option_chain(response)),
+        ("parse_chain -> arrays", lambda: parse_chain(response)),
+        ("parse_chain, some far-OTM legs missing", lambda: parse_chain(gapped)),
+        ("parse_chain + CE/PE oich and volume", lambda: with_extras(response)),
+    ]
+    print(f"\n{strike_count} strikes (us per chain, best of 5)")
+    for name, fn in cases:
+        print(f"  {name:48s} {best(fn, number):8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+    for strike_count in (20, 100):
+        time_parsers(strike_count, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Write a synthetic trading day of option-chain snapshots into store.py, then
+time "OI at strike X over the last hour" queries and a universe-wide load
+against re-reading the same history from JSON lines.
+
+    python benchmarks/bench_store.py --symbols 200 --snapshots 75
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.store import SnapshotStore, day_of
+
+
+def evolve(response, rng):
+    """Next snapshot: random-walk spot and OI, keeping the chain's shape."""
+    response = json.loads(json.dumps(response))
+    chain = response["data"]["optionsChain"]
+    chain[0]["ltp"] = round(chain[0]["ltp"] * (1 + rng.gauss(0, 0.001)), 2)
+    for row in chain[1:]:
+        row["oi"] = max(0, row["oi"] + int(rng.gauss(0, 2000)))
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--snapshots", type=int, default=75, help="snapshots per symbol (75 = every 5 min)")
+    parser.add_argument("--strikecount", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    root = tempfile.mkdtemp(prefix="oi_store_")
+    jsonl = os.path.join(root, "history.jsonl")
+    store = SnapshotStore(os.path.join(root, "store"))
+    symbols = [f"NSE:SYM{i}-EQ" for i in range(args.symbols)]
+    chains = {s: fake_fyers.make_option_chain(s, strikecount=args.strikecount) for s in symbols}
+    t0 = time.mktime(time.strptime("2025-01-31 09:15", "%Y-%m-%d %H:%M"))
+
+    write_time = 0.0
+    with open(jsonl, "w") as history:
+        for n in range(args.snapshots):
+            ts = t0 + n * 300
+            for symbol in symbols:
+                chains[symbol] = evolve(chains[symbol], rng)
+                start = time.perf_counter()
+                store.append(symbol, chains[symbol], ts=ts)
+                write_time += time.perf_counter() - start
+                history.write(json.dumps({"ts": ts, "symbol": symbol, "response": chains[symbol]}) + "\n")
+    appends = args.snapshots * args.symbols
+    day = day_of(t0)
+    print(f"wrote {appends} snapshots: {write_time / appends * 1e6:.0f} us/append, "
+          f"store {dir_size(store.root) / 1e6:.1f} MB vs JSON lines {os.path.getsize(jsonl) / 1e6:.1f} MB")
+
+    # "OI at strike X over the last hour" for one symbol.
+    end = t0 + args.snapshots * 300
+    symbol = symbols[len(symbols) // 2]
+    strike = float(store.snapshot(symbol, day, 0)[2]["strike"][args.strikecount // 2])
+    start = time.perf_counter()
+    for _ in range(100):
+        ts, oi = store.oi_at_strike(symbol, strike, end - 3600, end)
+    per_query = (time.perf_counter() - start) / 100
+
+    start = time.perf_counter()
+    want = []
+    with open(jsonl) as history:
+        for line in history:
+            record = json.loads(line)
+            if record["symbol"] == symbol and end - 3600 <= record["ts"] < end:
+                for row in record["response"]["data"]["optionsChain"]:
+                    if row["strike_price"] == strike and row["option_type"] == "CE":
+                        want.append(row["oi"])
+    scan_jsonl = time.perf_counter() - start
+    assert list(oi) == want, "store and JSON lines disagree"
+    print(f"OI at strike over last hour ({len(oi)} points): store {per_query * 1e3:.2f} ms, "
+          f"JSON lines scan {scan_jsonl * 1e3:.0f} ms ({scan_jsonl / per_query:.0f}x)")
+
+    # Whole universe for the day, then touch every CE OI value.
+    start = time.perf_counter()
+    universe = store.load_day(day)
+    total = sum(int(cols["ce_oi"].sum()) for cols in universe.values())
+    load_day = time.perf_counter() - start
+    print(f"load_day + sum of {sum(len(c['ts']) for c in universe.values()):,} rows: {load_day * 1e3:.0f} ms "
+          f"(total CE OI {total:,})")
+    shutil.rmtree(root)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Replay a synthetic tick stream through the local websocket server into
+streaming.OIStreamer and compare recomputes against recompute-per-tick.
+
+    python benchmarks/bench_streaming.py --symbols 50 --ticks 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.levels import compute_levels
+from oi_analyzer.streaming import OIStreamer, stream_websocket
+
+
+def make_ticks(responses, count, seed=0):
+    """Random-walk spot ticks mixed with OI changes on random CE/PE symbols."""
+    rng = random.Random(seed)
+    spots = {}
+    options = []
+    for symbol, response in responses.items():
+        chain = response["data"]["optionsChain"]
+        spots[symbol] = chain[0]["ltp"]
+        options.extend((row["symbol"], row["oi"]) for row in chain[1:])
+    oi = dict(options)
+    ticks = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            symbol = rng.choice(list(spots))
+            spots[symbol] = round(spots[symbol] * (1 + rng.gauss(0, 0.001)), 2)
+            ticks.append({"symbol": symbol, "ltp": spots[symbol]})
+        else:
+            symbol = rng.choice(options)[0]
+            oi[symbol] = max(0, oi[symbol] + int(rng.gauss(0, 2000)))
+            ticks.append({"symbol": symbol, "oi": oi[symbol]})
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=50, help="ticks per websocket message")
+    args = parser.parse_args()
+
+    responses = {f"NSE:SYM{i}-EQ": fake_fyers.make_option_chain(f"NSE:SYM{i}-EQ") for i in range(args.symbols)}
+    ticks = make_ticks(responses, args.ticks)
+    server, url = fake_fyers.start_replay_server(ticks, batch_size=args.batch)
+
+    streamer = OIStreamer()
+    for symbol, response in responses.items():
+        streamer.seed(symbol, response)
+    seeded = streamer.stats["recomputes"]
+    start = time.perf_counter()
+    stream_websocket(url, streamer)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    stats = streamer.stats
+    recomputes = stats["recomputes"] - seeded
+    print(f"ticks received: {stats['ticks']}/{len(ticks)} in {elapsed:.2f}s ({stats['ticks'] / elapsed:,.0f}/s)")
+    print(f"level recomputes: {recomputes} ({recomputes / max(1, stats['ticks']):.1%} of ticks), "
+          f"skipped: {stats['skipped']}, unknown: {stats['unknown']}")
+
+    # What recompute-on-every-tick would have cost on the same final state.
+    state = next(iter(streamer.states.values()))
+    ladder = state.ladder
+    calls, puts = ladder.oi_by_strike(ladder.calls), ladder.oi_by_strike(ladder.puts)
+    assert ladder.compute_levels() == compute_levels(calls, puts, state.spot)
+    start = time.perf_counter()
+    for _ in range(1000):
+        compute_levels(calls, puts, state.spot)
+    per_recompute = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    for _ in range(1000):
+        ladder.compute_levels()
+    per_incremental = (time.perf_counter() - start) / 1000
+    print(f"full recompute ~{per_recompute * 1e6:.0f} us, incremental ~{per_incremental * 1e6:.0f} us: "
+          f"gated {recomputes * per_incremental * 1e3:.1f} ms vs full-per-tick {stats['ticks'] * per_recompute * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Regression benchmark for the per-symbol pipeline at several universe sizes.
+
+For 10/200/2000 synthetic symbols it times the chain parsing loop, every
+support/resistance function, the adjacent-OI filters, the in-process
+analysis of the whole universe (per symbol, and batched as run_scan does)
+and an end-to-end run_scan() against the fake API server, and records each stage's tracemalloc peak in a separate
+pass (tracing slows the code it measures). Each stage runs once to warm up
+and then --repeat times; the median of those runs is what gets compared.
+Results go to a JSON file that a later run can be compared against. A stage
+counts as a regression only when its median is both --threshold slower and
+--min-delta-ms slower in absolute terms, so microsecond stages don't trip
+on timer noise.
+
+    python benchmarks/bench_suite.py --out bench_results.json
+    python benchmarks/bench_suite.py --compare bench_results.json --threshold 0.15 --min-delta-ms 1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer import levels
+from oi_analyzer.engine import ATM_WINDOW, analyze_symbol, build_rows, parse_option_chain, run_scan
+
+SIZES = (10, 200, 2000)
+
+
+def stages(responses, fyers):
+    """(name, callable) for every timed stage over one universe."""
+    parsed = [parse_option_chain(r) for r in responses.values()]
+    parsed = [(spot, calls, puts) for spot, calls, puts in parsed if spot is not None]
+    resistances = [levels.intraday_resistance_only_highest(c, s, 0.04, 0.7, 1.5) for s, c, _ in parsed]
+    supports = [levels.nearest_strong_supports_cluster(p, s, 2, 0.06, 0.6, 1.5) for s, _, p in parsed]
+
+    def each(fn):
+        return lambda: [fn(*args) for args in parsed]
+
+    return [
+        ("parse_option_chain", lambda: [parse_option_chain(r) for r in responses.values()]),
+        ("atm_preferred_level", each(lambda s, c, p: (levels.atm_preferred_level(c, s, 'call'),
+                                                      levels.atm_preferred_level(p, s, 'put')))),
+        ("intraday_resistance_only_highest", each(lambda s, c, p: levels.intraday_resistance_only_highest(c, s))),
+        ("nearest_strong_supports_cluster", each(lambda s, c, p: levels.nearest_strong_supports_cluster(p, s, n=2))),
+        ("positional_resistances_highest", each(lambda s, c, p: levels.positional_resistances_highest(c, s))),
+        ("positional_supports_highest", each(lambda s, c, p: levels.positional_supports_highest(p, s))),
+        ("filter_resistances_by_adjacent_puts_near_price",
+         lambda: [levels.filter_resistances_by_adjacent_puts_near_price(r, p, s) for r, (s, _, p) in zip(resistances, parsed)]),
+        ("filter_supports_by_adjacent_calls_near_price",
+         lambda: [levels.filter_supports_by_adjacent_calls_near_price(r, c, s) for r, (s, c, _) in zip(supports, parsed)]),
+        ("analyze_universe", lambda: sorted(
+            (row for row in (analyze_symbol(sym, r) for sym, r in responses.items()) if row is not None),
+            key=lambda x: x["nearest_level"])),
+        ("build_rows_universe", lambda: build_rows(
+            [(sym, s, c, p, ATM_WINDOW) for sym, (s, c, p) in zip(responses, (parse_option_chain(r) for r in responses.values()))
+             if s is not None])),
+        ("run_scan_end_to_end", lambda: run_scan(fyers, list(responses), rate_per_sec=1e6)),
+    ]
+
+
+def measure(fn, repeat):
+    """(best, median) seconds over `repeat` runs after one warm-up run, and the tracemalloc peak."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def run(sizes, strikecount, repeat, fyers):
+    results = {}
+    for size in sizes:
+        responses = fake_fyers.make_universe(size, strikecount=strikecount)
+        for name, fn in stages(responses, fyers):
+            # The network-bound stage is slow at scale; three runs still give a usable median.
+            runs = min(repeat, 3) if name == "run_scan_end_to_end" else repeat
+            best, median, peak = measure(fn, runs)
+            results[f"{name}@{size}"] = {"seconds": median, "best": best, "runs": runs,
+                                         "per_symbol_us": median / size * 1e6, "peak_kib": peak / 1024}
+            print(f"{size:5d} symbols  {name:48s} {median * 1e3:9.2f} ms  (best {best * 1e3:9.2f})  "
+                  f"{median / size * 1e6:8.1f} us/symbol  peak {peak / 1024:9.0f} KiB")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"python": platform.python_version(), "platform": platform.platform(), "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline_path, threshold, min_delta):
+    """
+    Print the median time/memory ratio per stage; returns the stages whose
+    median is more than `threshold` and more than `min_delta` seconds slower.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        ratio = now["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        mem = now["peak_kib"] / before["peak_kib"] if before["peak_kib"] else float("inf")
+        slower = ratio > 1 + threshold and now["seconds"] - before["seconds"] > min_delta
+        flag = "  REGRESSION" if slower else ""
+        delta_ms = (now["seconds"] - before["seconds"]) * 1e3
+        print(f"{key:56s} time x{ratio:5.2f} ({delta_ms:+8.2f} ms)  memory x{mem:5.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SIZES))
+    parser.add_argument("--strikecount", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="absolute slowdown a regression must also exceed")
+    args = parser.parse_args()
+
+    from fyers_apiv3 import fyersModel
+    server, base_url = fake_fyers.start_server(latency=0)
+    fake_fyers.point_sdk_at(base_url)
+    fyers = fyersModel.FyersModel(client_id="BENCH", token="bench", is_async=False, log_path="")
+
+    results = run(args.sizes, args.strikecount, args.repeat, fyers)
+    server.shutdown()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"environment": environment(), "args": vars(args), "results": results}, f, indent=2)
+        print(f"wrote {args.out}")
+    if args.compare and compare(results, args.compare, args.threshold, args.min_delta_ms / 1e3):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+N concurrent "page loads" needing a token, against the fake auth endpoints:
+the old per-load get_profile check vs tokens.TokenManager (one validation),
+then an expired token refreshed once across threads and across processes.
+
+    python benchmarks/bench_tokens.py --loads 50 --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import fake_fyers
+from oi_analyzer.tokens import TokenManager
+
+os.environ.setdefault("FYERS_SECRET_KEY", "secret")  # the app secret the refresh call sends
+
+
+def write_tokens(path, access_token, refresh_token):
+    with open(path, "w") as f:
+        json.dump({"client_id": "TEST-100", "access_token": access_token,
+                   "refresh_token": refresh_token}, f)
+
+
+def old_page_load(path):
+    """What web_view did per page load: a fresh FyersModel and a get_profile call."""
+    from fyers_apiv3 import fyersModel
+    with open(path) as f:
+        tokens = json.load(f)
+    fyers = fyersModel.FyersModel(client_id=tokens["client_id"], token=tokens["access_token"], is_async=False, log_path="")
+    return fyers.get_profile().get("code") == 200
+
+
+def concurrent(loads, fn):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=loads) as pool:
+        list(pool.map(lambda _: fn(), range(loads)))
+    return time.perf_counter() - start
+
+
+def process_worker(base_url, path, barrier):
+    fake_fyers.point_sdk_at(base_url)
+    manager = TokenManager(path)
+    barrier.wait()
+    manager.access_token()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="tokens_")
+    os.chdir(root)  # the SDK writes its log files to the working directory
+    server, base_url = fake_fyers.start_server(latency=0.05)
+    fake_fyers.point_sdk_at(base_url)
+    path = os.path.join(root, "fyers_tokens.json")
+    hits = server.auth_hits
+
+    token = fake_fyers.make_access_token()
+    server.valid_tokens.add(token)
+    write_tokens(path, token, server.refresh_token)
+    elapsed = concurrent(args.loads, lambda: old_page_load(path))
+    print(f"old check per load: {args.loads} loads -> {hits['profile']} validations in {elapsed * 1e3:.0f} ms")
+
+    hits["profile"] = 0
+    manager = TokenManager(path)
+    elapsed = concurrent(args.loads, manager.client)
+    assert hits["profile"] == 1, hits
+    print(f"TokenManager:       {args.loads} loads -> {hits['profile']} validation in {elapsed * 1e3:.0f} ms")
+    elapsed = concurrent(args.loads, manager.client)
+    print(f"  warm:             {args.loads} loads -> {hits['profile']} validation total in {elapsed * 1e3:.1f} ms")
+
+    hits.update(profile=0, refresh=0)
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    manager = TokenManager(path)
+    concurrent(args.loads, manager.client)
+    assert hits == {"profile": 0, "refresh": 1}, hits
+    print(f"expired token, {args.loads} threads: {hits['refresh']} refresh, {hits['profile']} validations")
+
+    hits.update(profile=0, refresh=0)
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    barrier = multiprocessing.Barrier(args.processes)
+    procs = [multiprocessing.Process(target=process_worker, args=(base_url, path, barrier))
+             for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert hits["refresh"] == 1, hits
+    print(f"expired token, {args.processes} processes: {hits['refresh']} refresh, "
+          f"{hits['profile']} validations of the refreshed token")
+
+    server.shutdown()
+    os.chdir("/")
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+F&O open interest support & resistance analyzer.
+
+Importing the package loads nothing else: the names below come from their
+modules on first use, and NumPy, pandas, fyers_apiv3, requests and Flask are
+only imported by the code paths that need them. The level functions in
+oi_analyzer.levels are pure Python.
+
+    from oi_analyzer import compute_levels, run_scan
+
+Command line: oi-analyzer {scan,serve,login,stream,backtest,alerts} (see cli.py).
+"""
+import importlib
+
+__version__ = "0.2.0"
+
+_EXPORTS = {
+    "compute_levels": "levels",
+    "run_scan": "engine",
+    "analyze_symbol": "engine",
+    "parse_option_chain": "engine",
+    "load_symbols": "engine",
+    "save_results": "engine",
+    "AnalyzerService": "engine",
+    "parse_chain": "parser",
+    "TokenManager": "tokens",
+    "SnapshotStore": "store",
+    "ChainCache": "cache",
+    "ExpiryPlanner": "expiries",
+    "BuildupTracker": "buildup",
+    "ShardedScanner": "coordinator",
+    "AlertEngine": "alerts",
+    "LevelIndex": "alerts",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+from .cli import main
+
+# Guarded: coordinator's spawned workers re-import the main module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+"""
+Price alerts on the levels a scan computed (oi-analyzer alerts).
+
+The support and resistance strikes of every results row go into one
+LevelIndex: a flat list of level prices sorted by (symbol, price), with each
+symbol owning a contiguous slice. A tick bisects its symbol's slice and walks
+outwards only while levels are within reach, so it costs O(log n) plus the
+levels it actually hits, however large the universe.
+
+Per level, AlertEngine runs a small state machine:
+
+* price comes within `distance` (price units) or `pct` (fraction of the
+  level) of it: the level is pending;
+* it stays within the band for `debounce` seconds: the alert fires, unless
+  the same level fired less than `cooldown` seconds ago;
+* after firing, the level re-arms only once price moves `rearm` times the
+  band away, so a price hovering at the edge of the band fires once.
+
+Prices come from a cheap LTP source rather than option chains: polling the
+Fyers quotes API (50 symbols per call), the Fyers data socket or a JSON tick
+websocket via streaming.py, a tick file, or the spot column of a
+SnapshotStore day. Alerts go to pluggable sinks, any callable taking an
+Alert: LogSink (JSON lines), WebhookSink (POST to a local URL) and
+DesktopSink.
+"""
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from . import metrics
+
+# Results columns that hold levels, and the kind each one is reported as.
+LEVEL_COLUMNS = {"support_strike": "support", "resistance_strike": "resistance"}
+QUOTES_BATCH = 50  # symbols per quotes call, the API's limit
+
+Level = namedtuple("Level", "symbol kind strike")
+Alert = namedtuple("Alert", "ts symbol kind strike price distance side")
+
+
+def describe(alert):
+    """One-line text for an alert."""
+    pct = alert.distance / alert.strike * 100 if alert.strike else 0.0
+    return (f"{alert.symbol} at {alert.price:g} is {alert.distance:g} ({pct:.2f}%) {alert.side} "
+            f"{alert.kind} {alert.strike:g}")
+
+
+# --- LEVEL INDEX ---
+class LevelIndex:
+    """All levels of a universe, sorted by (symbol, price); each symbol is one slice."""
+
+    def __init__(self, rows=(), columns=LEVEL_COLUMNS):
+        levels = set()
+        for row in rows:
+            for column, kind in columns.items():
+                strike = row.get(column)
+                if isinstance(strike, (int, float)) and math.isfinite(strike):
+                    levels.add(Level(row["symbol"], kind, float(strike)))
+        levels = sorted(levels, key=lambda level: (level.symbol, level.strike, level.kind))
+        self.levels = levels
+        self.prices = [level.strike for level in levels]
+        self.bounds = {}
+        for i, level in enumerate(levels):
+            start, _ = self.bounds.get(level.symbol, (i, i))
+            self.bounds[level.symbol] = (start, i + 1)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def symbols(self):
+        return list(self.bounds)
+
+    def near(self, symbol, price, width):
+        """Levels of `symbol` with |price - level| <= width(level), nearest first on each side."""
+        lo, hi = self.bounds.get(symbol, (0, 0))
+        i = bisect.bisect_left(self.prices, price, lo, hi)
+        found = []
+        # Both walks stop at the first level out of reach: the gap grows faster than
+        # width() does for any pct < 1, so nothing further out can be in reach either.
+        j = i - 1
+        while j >= lo and price - self.prices[j] <= width(self.prices[j]):
+            found.append(self.levels[j])
+            j -= 1
+        j = i
+        while j < hi and self.prices[j] - price <= width(self.prices[j]):
+            found.append(self.levels[j])
+            j += 1
+        return found
+
+
+# --- ENGINE ---
+class AlertEngine:
+    def __init__(self, rows=(), sinks=(), distance=0.0, pct=0.002, debounce=0.0, cooldown=300.0, rearm=2.0):
+        if not distance and not pct:
+            raise ValueError("Give a distance, a pct or both")
+        if rearm < 1:
+            raise ValueError("rearm must be at least 1 (a multiple of the alert band)")
+        self.distance = distance or 0.0
+        self.pct = pct or 0.0
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self.rearm = rearm
+        self.sinks = list(sinks)
+        self.index = LevelIndex()
+        self.pending = {}     # symbol -> {level: ts it entered the band}
+        self.fired = {}       # symbol -> {level} waiting for price to leave the re-arm band
+        self.last_fired = {}  # level -> ts of its last alert, for the cooldown
+        self.lock = threading.Lock()
+        self.stats = {"ticks": 0, "alerts": 0, "suppressed": 0, "sink_errors": 0, "unknown": 0}
+        self.set_levels(rows)
+
+    def width(self, level_price):
+        """Half-width of a level's alert band."""
+        return max(self.distance, level_price * self.pct)
+
+    def set_levels(self, rows):
+        """Swap in the levels of a new scan; state carries over for levels that are still there."""
+        index = LevelIndex(rows)
+        with self.lock:
+            self.index = index
+            live = set(index.levels)
+            self.pending = {symbol: {level: ts for level, ts in levels.items() if level in live}
+                            for symbol, levels in self.pending.items()}
+            self.fired = {symbol: {level for level in levels if level in live}
+                          for symbol, levels in self.fired.items()}
+            self.last_fired = {level: ts for level, ts in self.last_fired.items() if level in live}
+
+    def subscriptions(self):
+        """Symbols with at least one level (what a tick source should subscribe to)."""
+        return self.index.symbols()
+
+    # --- TICKS ---
+    def on_tick(self, tick):
+        """Tick dict from a websocket or the Fyers data socket: {"symbol", "ltp"[, "ts"]}."""
+        ltp = tick.get("ltp")
+        if ltp is None:
+            return []
+        return self.on_price(tick.get("symbol"), ltp, tick.get("ts"))
+
+    def on_price(self, symbol, price, ts=None):
+        """Apply one LTP; returns the alerts it fired."""
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            self.stats["ticks"] += 1
+            if symbol not in self.index.bounds:
+                self.stats["unknown"] += 1
+                return []
+            fired = self.fired.get(symbol)
+            if fired:
+                # Hysteresis: a fired level re-arms only well outside its band
+                for level in [level for level in fired
+                              if abs(price - level.strike) > self.width(level.strike) * self.rearm]:
+                    fired.discard(level)
+            near = self.index.near(symbol, price, self.width)
+            pending = self.pending.get(symbol)
+            if pending:
+                # Left the band before the debounce ran out: start over next time
+                inside = set(near)
+                for level in [level for level in pending if level not in inside]:
+                    del pending[level]
+            alerts = []
+            for level in near:
+                if fired and level in fired:
+                    continue
+                if pending is None:
+                    pending = self.pending[symbol] = {}
+                entered = pending.setdefault(level, ts)
+                if ts - entered < self.debounce:
+                    continue
+                if ts - self.last_fired.get(level, -math.inf) < self.cooldown:
+                    self.stats["suppressed"] += 1
+                    continue
+                del pending[level]
+                self.fired.setdefault(symbol, set()).add(level)
+                self.last_fired[level] = ts
+                distance = abs(price - level.strike)
+                side = "above" if price > level.strike else "below" if price < level.strike else "at"
+                alerts.append(Alert(ts, symbol, level.kind, level.strike, price, round(distance, 4), side))
+            self.stats["alerts"] += len(alerts)
+        for alert in alerts:
+            metrics.inc("oi_alerts_total", kind=alert.kind)
+            self._deliver(alert)
+        return alerts
+
+    def _deliver(self, alert):
+        for sink in self.sinks:
+            try:
+                sink(alert)
+            except Exception as e:
+                # One broken sink must not stop the others or the feed
+                self.stats["sink_errors"] += 1
+                metrics.inc("oi_alert_sink_errors_total", sink=type(sink).__name__)
+                print(f"Alert sink {type(sink).__name__} failed: {e}", file=sys.stderr)
+
+    def close(self):
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+
+
+# --- SINKS ---
+class LogSink:
+    """Appends one JSON line per alert to `path`."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, alert):
+        line = json.dumps(dict(alert._asdict(), message=describe(alert)))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class WebhookSink:
+    """
+    POSTs each alert as JSON to `url` from a background thread, so a slow
+    receiver never holds up the tick feed. Alerts beyond `max_queue` waiting
+    deliveries are dropped and counted.
+    """
+
+    def __init__(self, url, timeout=5.0, max_queue=1000):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue(max_queue)
+        self.stats = {"sent": 0, "failed": 0, "dropped": 0}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, alert):
+        try:
+            self.queue.put_nowait(dict(alert._asdict(), message=describe(alert)))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        import urllib.request
+        while True:
+            payload = self.queue.get()
+            if payload is None:
+                break
+            request = urllib.request.Request(self.url, data=json.dumps(payload).encode(),
+                                             headers={"Content-Type": "application/json"}, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                self.stats["sent"] += 1
+            except OSError as e:
+                self.stats["failed"] += 1
+                print(f"Webhook {self.url} failed: {e}", file=sys.stderr)
+
+    def close(self):
+        """Deliver what is queued, then stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+
+class DesktopSink:
+    """Desktop notifications through plyer, or notify-send / osascript when plyer is missing."""
+
+    def __init__(self, title="OI level alert"):
+        self.title = title
+        self.notify = None
+        try:
+            from plyer import notification
+            self.notify = lambda text: notification.notify(title=self.title, message=text, timeout=10)
+        except ImportError:
+            if shutil.which("notify-send"):
+                self.notify = lambda text: subprocess.Popen(["notify-send", self.title, text])
+            elif sys.platform == "darwin":
+                self.notify = lambda text: subprocess.Popen(
+                    ["osascript", "-e", f"display notification {json.dumps(text)} with title {json.dumps(self.title)}"])
+        if self.notify is None:
+            raise ImportError("Desktop notifications need plyer (pip install plyer) or notify-send")
+
+    def __call__(self, alert):
+        self.notify(describe(alert))
+
+
+# --- PRICE FEEDS ---
+def poll_quotes(fyers, symbols, interval=1.0, rate_per_sec=10, cycles=None, token_manager=None):
+    """
+    Yield (symbol, ltp, ts) from the quotes API: one call per 50 symbols,
+    the whole list every `interval` seconds, `cycles` times (None: forever).
+    A failed call skips its batch for that cycle. With a TokenManager, a
+    batch rejected as unauthenticated renews the token and is retried once;
+    a token that can't be renewed raises TokenError.
+    """
+    from .fetcher import TokenBucket, is_throttled, is_unauthenticated
+    bucket = TokenBucket(rate_per_sec)
+    symbols = list(symbols)
+    cycle = 0
+    while cycles is None or cycle < cycles:
+        started = time.monotonic()
+        for i in range(0, len(symbols), QUOTES_BATCH):
+            batch = ",".join(symbols[i:i + QUOTES_BATCH])
+            for attempt in range(2):
+                bucket.acquire()
+                try:
+                    response = fyers.quotes(data={"symbols": batch})
+                except Exception as e:
+                    print(f"Quotes request failed: {e}", file=sys.stderr)
+                    response = {"s": "error", "code": -99, "message": str(e)}
+                if attempt or token_manager is None or not is_unauthenticated(response):
+                    break
+                # The token expired mid-feed: renew it (or find out it can't be) and retry the batch.
+                token_manager.invalidate()
+                fyers = token_manager.client()
+            if response.get("s") != "ok":
+                metrics.inc("oi_quotes_errors_total", code=response.get("code"))
+                if is_throttled(response):
+                    metrics.inc("oi_quotes_throttled_total")
+                continue
+            ts = time.time()
+            for quote in response.get("d", []):
+                ltp = quote.get("v", {}).get("lp")
+                if ltp is not None:
+                    yield quote.get("n"), float(ltp), ts
+        cycle += 1
+        if cycles is None or cycle < cycles:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def replay_file(path):
+    """
+    Yield (symbol, ltp, ts) from a recorded tick file: CSV with symbol, ltp
+    and ts columns, or JSON lines of tick dicts. Rows without ts get None
+    (the engine then uses the wall clock).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            ticks = csv.DictReader(f)
+        else:
+            ticks = (json.loads(line) for line in f if line.strip())
+        for tick in ticks:
+            ts = tick.get("ts")
+            yield tick["symbol"], float(tick["ltp"]), float(ts) if ts not in (None, "") else None
+
+
+def replay_store(store, day, symbols=None):
+    """
+    Yield (symbol, spot, ts) from every snapshot of `day` in a SnapshotStore,
+    in time order. Without `symbols`, symbols are the store's directory names.
+    """
+    from .store import symbol_dir
+    names = {symbol_dir(symbol): symbol for symbol in symbols} if symbols is not None else None
+
+    def spots(name):
+        index = store.snapshots(name, day)
+        symbol = names[name] if names is not None else name
+        return ((float(ts), symbol, float(spot)) for ts, spot in zip(index["snap_ts"], index["snap_spot"]))
+
+    stored = [name for name in store.symbols(day) if names is None or name in names]
+    for ts, symbol, spot in heapq.merge(*(spots(name) for name in stored)):
+        yield symbol, spot, ts
+
+
+def watch_levels(engine, path, every=5.0):
+    """Reload the levels from `path` whenever the file changes (daemon thread)."""
+    from .output import read_results
+
+    def run():
+        seen = os.stat(path).st_mtime_ns
+        while True:
+            time.sleep(every)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if mtime != seen:
+                    seen = mtime
+                    engine.set_levels(read_results(path))
+            except (OSError, ValueError) as e:
+                print(f"Could not reload levels from {path}: {e}", file=sys.stderr)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def main(argv=None):
+    from .engine import OUTPUT_FILE
+    parser = argparse.ArgumentParser(prog="oi-analyzer alerts",
+                                     description="Alert when spot comes near a scanned support/resistance level.")
+    parser.add_argument("results", nargs="?", default=OUTPUT_FILE, help="results file written by oi-analyzer scan")
+    parser.add_argument("--distance", type=float, default=0.0, help="alert band in price units")
+    parser.add_argument("--pct", type=float, default=0.2, help="alert band in percent of the level (default 0.2)")
+    parser.add_argument("--debounce", type=float, default=0.0, help="seconds price must stay in the band")
+    parser.add_argument("--cooldown", type=float, default=300.0, help="minimum seconds between alerts on one level")
+    parser.add_argument("--rearm", type=float, default=2.0,
+                        help="re-arm a level once price is this many band widths away")
+    parser.add_argument("--log", metavar="FILE", help="append alerts to FILE as JSON lines")
+    parser.add_argument("--webhook", metavar="URL", help="POST alerts as JSON to URL")
+    parser.add_argument("--desktop", action="store_true", help="show desktop notifications")
+    feed = parser.add_mutually_exclusive_group()
+    feed.add_argument("--replay", metavar="FILE", help="replay ticks from a .csv or JSON-lines file")
+    feed.add_argument("--ws", metavar="URL", help="JSON tick websocket")
+    feed.add_argument("--socket", action="store_true", help="Fyers data socket instead of polling quotes")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between quote polls")
+    parser.add_argument("--tokens", default="fyers_tokens.json")
+    args = parser.parse_args(argv)
+
+    from .output import read_results
+
+    def print_alert(alert):
+        print(f"{time.strftime('%H:%M:%S', time.localtime(alert.ts))} {describe(alert)}", flush=True)
+
+    sinks = [print_alert]
+    if args.log:
+        sinks.append(LogSink(args.log))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    if args.desktop:
+        sinks.append(DesktopSink())
+    engine = AlertEngine(read_results(args.results), sinks, distance=args.distance, pct=args.pct / 100,
+                         debounce=args.debounce, cooldown=args.cooldown, rearm=args.rearm)
+    print(f"Watching {len(engine.index)} levels on {len(engine.subscriptions())} symbols from {args.results}")
+    try:
+        if args.replay:
+            for symbol, ltp, ts in replay_file(args.replay):
+                engine.on_price(symbol, ltp, ts)
+            return
+        watch_levels(engine, args.results)
+        if args.ws:
+            from .streaming import stream_websocket
+            stream_websocket(args.ws, engine)
+            return
+        from .tokens import TokenError, TokenManager
+        token_manager = TokenManager(args.tokens)
+        if args.socket:
+            from .streaming import stream_fyers_spot
+            client_id, access_token = token_manager.access_token()
+            stream_fyers_spot(f"{client_id}:{access_token}", engine, engine.subscriptions())
+            while True:
+                time.sleep(1)
+        try:
+            for symbol, ltp, ts in poll_quotes(token_manager.client(), engine.subscriptions(), args.interval,
+                                               token_manager=token_manager):
+                engine.on_price(symbol, ltp, ts)
+        except TokenError as e:
+            raise SystemExit(f"oi-analyzer alerts: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
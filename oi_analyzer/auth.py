@@ -0,0 +1,132 @@
+"""
+First-time Fyers login (oi-analyzer login): opens the consent page, takes the
+redirected URL and saves the access and refresh tokens to fyers_tokens.json,
+next to the client_id tokens.TokenManager needs to renew them later. The app
+secret is never written to the file: pass --client-secret or set
+FYERS_SECRET_KEY, which TokenManager also reads when it renews the token.
+"""
+import argparse
+import json
+import os
+import subprocess
+import webbrowser
+from urllib.parse import urlparse, parse_qs
+
+from .tokens import write_private_json
+
+# ---------- Fyers Auth Details ----------
+CLIENT_SECRET = "YourClient_secret"  # Replace with your secret key
+REDIRECT_URI = "https://www.google.com/"  # Must match your app settings
+STATE = "sample_state"
+GRANT_TYPE = "authorization_code"
+
+TOKEN_FILE = "fyers_tokens.json"
+
+# ---------- Chrome paths ----------
+# Used when the executable exists; otherwise the default browser opens the login page
+chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+profile_path = r"C:\Users\USERNAME\AppData\Local\Google\Chrome\User Data" #Replace this path
+
+
+# ---------- Helper functions ----------
+def save_tokens(filepath, tokens):
+    # Owner-only and atomic; the secret stays out of the file (older versions saved it there).
+    write_private_json(filepath, {k: v for k, v in tokens.items() if k != "client_secret"})
+    print(f"Tokens saved to {filepath}")
+
+
+def load_tokens(filepath):
+    try:
+        with open(filepath, "r") as f:
+            tokens = json.load(f)
+        return tokens
+    except FileNotFoundError:
+        print("Token file not found. Please authenticate first.")
+        return None
+
+
+def auth_url(client_id):
+    return (
+        f"https://api-t1.fyers.in/api/v3/generate-authcode?"
+        f"client_id={client_id}&redirect_uri={REDIRECT_URI}&response_type=code&state={STATE}"
+    )
+
+
+def open_login(url):
+    if os.path.exists(chrome_path):
+        subprocess.Popen([chrome_path, f"--user-data-dir={profile_path}", url])
+        print(" Chrome opened with your profile. Log in manually and pass captcha.")
+    else:
+        webbrowser.open_new(url)
+        print(" Login page opened in your default browser.")
+
+
+def login(token_file=TOKEN_FILE, client_id=None, client_secret=None):
+    """Interactive login; returns the saved tokens, or None when it fails."""
+    from fyers_apiv3 import fyersModel
+
+    tokens = load_tokens(token_file) or {}
+    client_id = client_id or tokens.get("client_id")
+    client_secret = (client_secret or os.environ.get("FYERS_SECRET_KEY") or tokens.get("client_secret")
+                     or CLIENT_SECRET)
+    if not client_id:
+        print(f"No client_id given and none in {token_file}.")
+        return None
+
+    # ---------- Open the consent page ----------
+    open_login(auth_url(client_id))
+
+    # ---------- Wait for manual login ----------
+    input("Once login is complete and you are redirected to the redirect URL, press Enter here...")
+
+    # ---------- Capture redirected URL ----------
+    redirected_url = input("Paste the full redirected URL here: ").strip()
+
+    # ---------- Extract auth code ----------
+    parsed = urlparse(redirected_url)
+    params = parse_qs(parsed.query)
+    auth_code = params.get("auth_code", [""])[0]
+
+    if not auth_code:
+        print("Failed to capture auth code. Check the URL you pasted.")
+        return None
+
+    print("Auth code captured:", auth_code)
+
+    # ---------- Exchange auth code for tokens ----------
+    session = fyersModel.SessionModel(
+        client_id=client_id,
+        secret_key=client_secret,
+        redirect_uri=REDIRECT_URI,
+        response_type="code",
+        grant_type=GRANT_TYPE,
+    )
+    session.set_token(auth_code)
+    response = session.generate_token()
+
+    if "access_token" in response and "refresh_token" in response:
+        print(" Access Token:", response["access_token"])
+        print(" Refresh Token:", response["refresh_token"])
+
+        # ---------- Save tokens ----------
+        # Keep client_id (and a pin, if any) so TokenManager can renew the token in-process
+        tokens = dict(tokens, client_id=client_id,
+                      access_token=response["access_token"], refresh_token=response["refresh_token"])
+        save_tokens(token_file, tokens)
+        return tokens
+    print(" Failed to get tokens:", response)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="oi-analyzer login", description="Log in to Fyers and save tokens.")
+    parser.add_argument("--tokens", default=TOKEN_FILE, help="token file to read client_id from and write to")
+    parser.add_argument("--client-id", help="Fyers app id (default: client_id in the token file)")
+    parser.add_argument("--client-secret", help="Fyers app secret (default: FYERS_SECRET_KEY in the environment)")
+    args = parser.parse_args(argv)
+    if login(args.tokens, args.client_id, args.client_secret) is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Backtest the intraday level parameters against recorded chains.
+
+prepare() packs every stored snapshot (store.py) into padded row matrices,
+one row per symbol per snapshot, saved as .npy files next to each other,
+together with the spot path that followed each snapshot. Each process in the
+sweep np.load()s them with mmap_mode='r', so the data is shared through the
+page cache and never pickled; a task is just a few parameter combinations
+(those sharing everything but dominance_factor, which only the ATM check uses).
+
+Scoring, per emitted level and snapshot, over the next `horizon` snapshots:
+
+* tested    - spot came within `touch_pct` of the level;
+* respected - tested, and spot never closed more than `break_pct` through it.
+
+The respect rate is respected / tested over supports and resistances together.
+
+    oi-analyzer backtest --store oi_store --workers 8 --top 20
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch import atm_levels, cluster_levels, prefer_atm
+from .store import STORE_DIR, SnapshotStore
+
+BACKTEST_DIR = "backtest_cache"
+HORIZON = 12        # snapshots ahead (1 hour at 5-minute snapshots)
+TOUCH_PCT = 0.002
+BREAK_PCT = 0.005
+CHUNK_ROWS = 20000
+
+GRID = {
+    "cluster_ratio": [0.5, 0.6, 0.7, 0.8, 0.9],
+    "min_avg_multiplier": [1.0, 1.25, 1.5, 1.75, 2.0],
+    "dominance_factor": [1.0, 1.2, 1.5, 2.0, 2.5],
+    "max_pct_away": [0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08, 0.1],
+}
+
+ARRAYS = ("strikes", "ce_oi", "pe_oi", "ce_mask", "pe_mask", "spot", "future_min", "future_max")
+
+
+# --- DATA PREPARATION ---
+def prepare(store, days=None, out_dir=BACKTEST_DIR, horizon=HORIZON):
+    """Pack stored snapshots for `days` (default: all) into .npy matrices; returns the row count."""
+    parts = []
+    for day in days or store.days():
+        for name in store.symbols(day):
+            index = store.snapshots(name, day)
+            if len(index["snap_ts"]):
+                parts.append((day, name, index))
+    rows = sum(len(index["snap_ts"]) for _, _, index in parts)
+    width = max((int(index["snap_len"].max()) for _, _, index in parts), default=0) or 1
+
+    os.makedirs(out_dir, exist_ok=True)
+    def create(name, dtype, shape, fill):
+        array = np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+        array[:] = fill
+        return array
+    out = {
+        "strikes": create("strikes", np.float64, (rows, width), np.nan),
+        "ce_oi": create("ce_oi", np.float64, (rows, width), 0.0),
+        "pe_oi": create("pe_oi", np.float64, (rows, width), 0.0),
+        "ce_mask": create("ce_mask", bool, (rows, width), False),
+        "pe_mask": create("pe_mask", bool, (rows, width), False),
+        "spot": create("spot", np.float64, (rows,), np.nan),
+        "future_min": create("future_min", np.float64, (rows,), np.nan),
+        "future_max": create("future_max", np.float64, (rows,), np.nan),
+    }
+
+    base = 0
+    for day, name, index in parts:
+        cols = store.columns(name, day)
+        count = len(index["snap_ts"])
+        lengths = np.asarray(index["snap_len"])
+        starts = np.asarray(index["snap_row"])
+        # Matrix (row, column) for every stored strike row of this symbol-day.
+        row_of = np.repeat(np.arange(count), lengths) + base
+        col_of = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        source = np.concatenate([np.arange(s, s + n) for s, n in zip(starts, lengths)])
+        ce_oi, pe_oi = cols["ce_oi"][source], cols["pe_oi"][source]
+        out["strikes"][row_of, col_of] = cols["strike"][source]
+        out["ce_oi"][row_of, col_of] = np.maximum(ce_oi, 0)
+        out["pe_oi"][row_of, col_of] = np.maximum(pe_oi, 0)
+        out["ce_mask"][row_of, col_of] = ce_oi >= 0
+        out["pe_mask"][row_of, col_of] = pe_oi >= 0
+
+        spot = np.asarray(index["snap_spot"])
+        out["spot"][base:base + count] = spot
+        if count > horizon:
+            # Snapshot t looks at spot over t+1 .. t+horizon; the day's last
+            # `horizon` snapshots have no full future and stay NaN.
+            future = np.lib.stride_tricks.sliding_window_view(spot[1:], horizon)
+            out["future_min"][base:base + count - horizon] = future.min(axis=1)
+            out["future_max"][base:base + count - horizon] = future.max(axis=1)
+        base += count
+
+    for array in out.values():
+        array.flush()
+    return rows
+
+
+def open_prepared(out_dir=BACKTEST_DIR):
+    return {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+
+
+# --- SCORING ---
+def score_group(group, data, atm_cache=None, touch_pct=TOUCH_PCT, break_pct=BREAK_PCT, chunk_rows=CHUNK_ROWS):
+    """
+    Score combinations that differ only in dominance_factor; one result dict each.
+
+    The cluster fallback is computed once per chunk for the whole group, and
+    the ATM levels (which depend on dominance_factor alone) come from
+    `atm_cache` when an earlier group already computed them.
+    """
+    atm_cache = {} if atm_cache is None else atm_cache
+    first = group[0]
+    totals = [{"rows": 0, "levels": 0, "tested": 0, "respected": 0} for _ in group]
+    for lo in range(0, len(data["spot"]), chunk_rows):
+        hi = lo + chunk_rows
+        chunk = (data["strikes"][lo:hi], data["ce_oi"][lo:hi], data["pe_oi"][lo:hi],
+                 data["ce_mask"][lo:hi], data["pe_mask"][lo:hi], data["spot"][lo:hi, None])
+        fallback = cluster_levels(
+            *chunk, resistance_pct=first["max_pct_away"], support_pct=first["max_pct_away"],
+            resistance_cluster=first["cluster_ratio"], support_cluster=first["cluster_ratio"],
+            min_avg_multiplier=first["min_avg_multiplier"])
+        future_min = data["future_min"][lo:hi]
+        future_max = data["future_max"][lo:hi]
+        has_future = ~np.isnan(future_min)
+        for params, counts in zip(group, totals):
+            key = (params["dominance_factor"], lo)
+            if key not in atm_cache:
+                atm_cache[key] = atm_levels(*chunk, dominance_factor=params["dominance_factor"])
+            levels = prefer_atm(atm_cache[key], fallback)
+            support = levels["support_strike"]
+            resistance = levels["resistance_strike"]
+            with np.errstate(invalid="ignore"):
+                sup_tested = has_future & (future_min <= support * (1 + touch_pct))
+                sup_held = sup_tested & (future_min >= support * (1 - break_pct))
+                res_tested = has_future & (future_max >= resistance * (1 - touch_pct))
+                res_held = res_tested & (future_max <= resistance * (1 + break_pct))
+            counts["rows"] += int(has_future.sum())
+            counts["levels"] += int((has_future & ~np.isnan(support)).sum()
+                                    + (has_future & ~np.isnan(resistance)).sum())
+            counts["tested"] += int(sup_tested.sum() + res_tested.sum())
+            counts["respected"] += int(sup_held.sum() + res_held.sum())
+    results = []
+    for params, counts in zip(group, totals):
+        counts["respect_rate"] = counts["respected"] / counts["tested"] if counts["tested"] else 0.0
+        results.append(dict(params, **counts))
+    return results
+
+
+def score(params, data):
+    """Score a single parameter combination."""
+    return score_group([params], data)[0]
+
+
+_data = None
+_atm_cache = {}
+
+
+def _init_worker(out_dir):
+    global _data
+    _data = open_prepared(out_dir)
+
+
+def _score_worker(group):
+    return score_group(group, _data, _atm_cache)
+
+
+def grid_combinations(grid=GRID):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def sweep(out_dir=BACKTEST_DIR, combos=None, workers=None):
+    """Score parameter combinations (default: all of GRID) in a process pool; best respect rate first."""
+    combos = grid_combinations() if combos is None else combos
+    workers = workers or os.cpu_count()
+    groups = {}
+    for params in combos:
+        key = (params["cluster_ratio"], params["min_avg_multiplier"], params["max_pct_away"])
+        groups.setdefault(key, []).append(params)
+    groups = list(groups.values())
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(out_dir,)) as pool:
+        scored = pool.map(_score_worker, groups, chunksize=max(1, len(groups) // (4 * workers)))
+        results = [result for group in scored for result in group]
+    return sorted(results, key=lambda r: (-r["respect_rate"], -r["tested"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="oi-analyzer backtest",
+                                     description="Sweep level parameters over stored option chains.")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--days", nargs="*", help="YYYY-MM-DD partitions (default: all)")
+    parser.add_argument("--work-dir", default=BACKTEST_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write every result to this CSV")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = prepare(SnapshotStore(args.store), args.days, args.work_dir)
+    print(f"prepared {rows:,} snapshot rows in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    results = sweep(args.work_dir, workers=args.workers)
+    print(f"scored {len(results)} combinations in {time.perf_counter() - start:.1f}s")
+
+    import pandas as pd
+    table = pd.DataFrame(results)
+    print(table.head(args.top).to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
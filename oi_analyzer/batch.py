@@ -0,0 +1,346 @@
+"""
+Support/resistance for a whole universe in one pass of masked NumPy ops.
+
+Each chain is first a StrikeLadder (sorted strikes with aligned CE/PE OI),
+then the ladders are packed into padded (symbols x strikes) matrices: each
+row holds one symbol's strikes in ascending order, padded at the end, with
+CE/PE masks marking which cells carry a real quote. batch_levels() reproduces
+levels.compute_levels() for every row at once; missing levels come back as NaN.
+"""
+import numpy as np
+
+
+# --- PACKING ---
+class StrikeLadder:
+    """Sorted strike array with aligned CE/PE OI arrays for one option chain."""
+
+    def __init__(self, strikes, ce_oi, pe_oi, ce_mask=None, pe_mask=None):
+        self.strikes = np.asarray(strikes, dtype=np.float64)
+        self.ce_oi = np.asarray(ce_oi)
+        self.pe_oi = np.asarray(pe_oi)
+        n = len(self.strikes)
+        self.ce_mask = np.ones(n, dtype=bool) if ce_mask is None else np.asarray(ce_mask, dtype=bool)
+        self.pe_mask = np.ones(n, dtype=bool) if pe_mask is None else np.asarray(pe_mask, dtype=bool)
+
+    @classmethod
+    def from_dicts(cls, call_oi_by_strike, put_oi_by_strike):
+        strikes = sorted(set(call_oi_by_strike) | set(put_oi_by_strike))
+        ce_oi = _oi_array([call_oi_by_strike.get(k, 0) for k in strikes])
+        pe_oi = _oi_array([put_oi_by_strike.get(k, 0) for k in strikes])
+        ce_mask = [k in call_oi_by_strike for k in strikes]
+        pe_mask = [k in put_oi_by_strike for k in strikes]
+        return cls(strikes, ce_oi, pe_oi, ce_mask, pe_mask)
+
+    def __len__(self):
+        return len(self.strikes)
+
+
+def _oi_array(values):
+    # Integer OI stays int64, as in parser.Chain.
+    if all(isinstance(v, int) for v in values):
+        return np.asarray(values, dtype=np.int64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def pack_ladders(ladders):
+    """Stack StrikeLadders into padded strike, CE/PE OI and CE/PE mask matrices."""
+    rows = len(ladders)
+    width = max((len(l) for l in ladders), default=0)
+    strikes = np.full((rows, width), np.nan)
+    ce_oi = np.zeros((rows, width))
+    pe_oi = np.zeros((rows, width))
+    ce_mask = np.zeros((rows, width), dtype=bool)
+    pe_mask = np.zeros((rows, width), dtype=bool)
+    for i, ladder in enumerate(ladders):
+        m = len(ladder)
+        strikes[i, :m] = ladder.strikes
+        ce_oi[i, :m] = ladder.ce_oi
+        pe_oi[i, :m] = ladder.pe_oi
+        ce_mask[i, :m] = ladder.ce_mask
+        pe_mask[i, :m] = ladder.pe_mask
+    return strikes, ce_oi, pe_oi, ce_mask, pe_mask
+
+
+def pack_dicts(pairs):
+    """
+    pack_ladders() straight from (call_oi_by_strike, put_oi_by_strike) pairs,
+    as the scan parses them, without a StrikeLadder per chain. Each matrix is
+    one flat list converted once; missing cells go in as None (NaN).
+    """
+    keys = [sorted(calls.keys() | puts.keys()) for calls, puts in pairs]
+    width = max(map(len, keys), default=0)
+    strikes, ce_oi, pe_oi = [], [], []
+    for (calls, puts), row in zip(pairs, keys):
+        pad = [None] * (width - len(row))
+        strikes += row
+        strikes += pad
+        ce_oi += map(calls.get, row)
+        ce_oi += pad
+        pe_oi += map(puts.get, row)
+        pe_oi += pad
+    shape = (len(pairs), width)
+    strikes = np.array(strikes, dtype=np.float64).reshape(shape)
+    ce_oi = np.array(ce_oi, dtype=np.float64).reshape(shape)
+    pe_oi = np.array(pe_oi, dtype=np.float64).reshape(shape)
+    ce_mask, pe_mask = ~np.isnan(ce_oi), ~np.isnan(pe_oi)
+    ce_oi[~ce_mask] = 0
+    pe_oi[~pe_mask] = 0
+    return strikes, ce_oi, pe_oi, ce_mask, pe_mask
+
+
+# --- ROW-WISE HELPERS ---
+def _pick(values, cols, ok):
+    picked = np.take_along_axis(values, cols[:, None], axis=1)[:, 0]
+    return np.where(ok, picked, np.nan)
+
+
+def _adaptive_threshold(oi, window, min_avg_multiplier):
+    count = window.sum(axis=1)
+    # Sequential row sums so float OI rounds like Python's sum() in levels.py.
+    total = np.where(window, oi, 0.0).cumsum(axis=1)[:, -1]
+    max_oi = np.where(window, oi, -np.inf).max(axis=1, initial=-np.inf)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_oi = total / count
+    return np.minimum(avg_oi * min_avg_multiplier, max_oi)[:, None], max_oi[:, None]
+
+
+def _rank(oi, mask, prefer_high_strike):
+    """Column order per row by OI descending; ties go to the lower (or higher) strike."""
+    key = np.where(mask, -oi, np.inf)
+    if not prefer_high_strike:
+        return np.argsort(key, axis=1, kind='stable')
+    width = oi.shape[1]
+    return width - 1 - np.argsort(key[:, ::-1], axis=1, kind='stable')
+
+
+def _cluster(oi, window, cluster_ratio, min_avg_multiplier):
+    min_oi_threshold, _ = _adaptive_threshold(oi, window, min_avg_multiplier)
+    filtered = window & (oi >= min_oi_threshold)
+    max_filtered_oi = np.where(filtered, oi, -np.inf).max(axis=1, initial=-np.inf)[:, None]
+    return filtered & (oi >= max_filtered_oi * cluster_ratio)
+
+
+# --- LEVEL FUNCTIONS ---
+def atm_preferred_level(strikes, oi, mask, spot, kind='call', dominance_factor=1.2, atm_window=200):
+    distance = np.where(mask, np.abs(strikes - spot), np.inf)
+    atm = np.argmin(distance, axis=1)
+    has_chain = mask.any(axis=1)
+    atm_strike = _pick(strikes, atm, has_chain)[:, None]
+    atm_oi = _pick(oi, atm, has_chain)[:, None]
+    if kind == 'call':
+        neighbors = mask & (strikes > atm_strike) & (strikes <= atm_strike + atm_window)
+    else:
+        neighbors = mask & (strikes >= atm_strike - atm_window) & (strikes < atm_strike)
+    neighbors &= oi > 0
+    dominant = np.all(~neighbors | (atm_oi >= dominance_factor * oi), axis=1)
+    ok = has_chain & (atm_oi[:, 0] > 0) & dominant
+    return np.where(ok, atm_strike[:, 0], np.nan), np.where(ok, atm_oi[:, 0], np.nan)
+
+
+def intraday_resistance_only_highest(strikes, oi, mask, spot, max_pct_away=0.04, cluster_ratio=0.7, min_avg_multiplier=1.5):
+    window = mask & (strikes >= spot) & ((strikes - spot) / spot <= max_pct_away)
+    min_oi_threshold, max_oi = _adaptive_threshold(oi, window, min_avg_multiplier)
+    keep = window & (oi >= min_oi_threshold) & (oi >= max_oi * cluster_ratio)
+    best = _rank(oi, keep, prefer_high_strike=False)[:, 0]
+    ok = keep.any(axis=1)
+    return _pick(strikes, best, ok), _pick(oi, best, ok)
+
+
+def nearest_strong_supports_cluster(strikes, oi, mask, spot, n=2, max_pct_away=0.04, cluster_ratio=0.6, min_avg_multiplier=1.5):
+    window = mask & (strikes <= spot) & ((spot - strikes) / spot <= max_pct_away)
+    cluster = _cluster(oi, window, cluster_ratio, min_avg_multiplier)
+    return _top_n(strikes, oi, cluster, _rank(oi, cluster, prefer_high_strike=True), n)
+
+
+def _top_n(strikes, oi, selected, order, n):
+    """(rows x n) strikes and OI of the first n selected columns in `order`."""
+    rows, width = oi.shape
+    order = np.pad(order, ((0, 0), (0, max(0, n - width))))[:, :n]
+    ok = np.arange(n) < selected.sum(axis=1)[:, None]
+    padded_strikes = np.pad(strikes, ((0, 0), (0, max(0, n - width))), constant_values=np.nan)
+    padded_oi = np.pad(oi, ((0, 0), (0, max(0, n - width))))
+    return (np.where(ok, np.take_along_axis(padded_strikes, order, axis=1), np.nan),
+            np.where(ok, np.take_along_axis(padded_oi, order, axis=1), np.nan))
+
+
+def _positional(strikes, oi, window, cluster_ratio, min_avg_multiplier, dominance_factor, kind):
+    cluster = _cluster(oi, window, cluster_ratio, min_avg_multiplier)
+    order = _rank(oi, cluster, prefer_high_strike=(kind == 'put'))
+    count = cluster.sum(axis=1)[:, None]
+    valid = np.arange(oi.shape[1]) < count
+    ranked = np.where(valid, np.take_along_axis(oi, order, axis=1), -np.inf)
+    edge = np.full((len(oi), 1), -np.inf)
+    if kind == 'call':
+        # Overshadowed by anything ranked after it: running max from the right.
+        rivals = np.hstack((np.maximum.accumulate(ranked[:, ::-1], axis=1)[:, ::-1][:, 1:], edge))
+    else:
+        # Overshadowed by anything ranked before it: running max from the left.
+        rivals = np.hstack((edge, np.maximum.accumulate(ranked, axis=1)[:, :-1]))
+    dominant = valid & ~(rivals >= dominance_factor * ranked)
+    # Fall back to the plain cluster ranking for rows where nothing is dominant.
+    chosen = np.where(dominant.any(axis=1)[:, None], dominant, valid)
+    positions = _rank(chosen.astype(float), chosen, prefer_high_strike=False)
+    ranked_cols = np.take_along_axis(order, positions, axis=1)
+    return _top_n(strikes, oi, chosen, ranked_cols, 2)
+
+
+def positional_resistances_highest(strikes, oi, mask, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+    window = mask & (strikes >= spot)
+    return _positional(strikes, oi, window, cluster_ratio, min_avg_multiplier, dominance_factor, 'call')
+
+
+def positional_supports_highest(strikes, oi, mask, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+    window = mask & (strikes <= spot)
+    return _positional(strikes, oi, window, cluster_ratio, min_avg_multiplier, dominance_factor, 'put')
+
+
+# --- ADJACENT OI FILTERING NEAR PRICE ---
+def neighboring_put_oi_near_price(strikes, put_oi, put_mask, level_strike, spot, max_pct_away=0.05):
+    candidates = put_mask & (strikes < level_strike[:, None]) & ((spot - strikes) / spot <= max_pct_away)
+    nearest_lower = strikes.shape[1] - 1 - np.argmax(candidates[:, ::-1], axis=1)
+    return np.where(candidates.any(axis=1), _pick(put_oi, nearest_lower, True), 0.0)
+
+
+def neighboring_call_oi_near_price(strikes, call_oi, call_mask, level_strike, spot, max_pct_away=0.05):
+    candidates = call_mask & (strikes > level_strike[:, None]) & ((strikes - spot) / spot <= max_pct_away)
+    nearest_higher = np.argmax(candidates, axis=1)
+    return np.where(candidates.any(axis=1), _pick(call_oi, nearest_higher, True), 0.0)
+
+
+def filter_resistances_by_adjacent_puts_near_price(level_strike, level_oi, strikes, put_oi, put_mask, spot, max_pct_away=0.05):
+    """Keep-mask for each row's resistance: its OI must beat the nearest lower put's OI."""
+    adjacent = neighboring_put_oi_near_price(strikes, put_oi, put_mask, level_strike, spot, max_pct_away)
+    return ~np.isnan(level_strike) & (level_oi > adjacent)
+
+
+def filter_supports_by_adjacent_calls_near_price(level_strike, level_oi, strikes, call_oi, call_mask, spot, max_pct_away=0.05):
+    """Keep-mask for each row's support: its OI must beat the nearest higher call's OI."""
+    adjacent = neighboring_call_oi_near_price(strikes, call_oi, call_mask, level_strike, spot, max_pct_away)
+    return ~np.isnan(level_strike) & (level_oi > adjacent)
+
+
+# --- FULL PIPELINE ---
+def atm_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, dominance_factor=1.2, atm_window=200):
+    """ATM-preferred resistance/support per row (NaN where the ATM strike doesn't dominate)."""
+    res_strike, res_oi = atm_preferred_level(
+        strikes, ce_oi, ce_mask, spot_col, kind='call', dominance_factor=dominance_factor, atm_window=atm_window)
+    sup_strike, sup_oi = atm_preferred_level(
+        strikes, pe_oi, pe_mask, spot_col, kind='put', dominance_factor=dominance_factor, atm_window=atm_window)
+    return {"resistance_strike": res_strike, "resistance_oi": res_oi,
+            "support_strike": sup_strike, "support_oi": sup_oi}
+
+
+def cluster_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, resistance_pct=0.04, support_pct=0.06,
+                   resistance_cluster=0.7, support_cluster=0.6, min_avg_multiplier=1.5):
+    """Fallback resistance/support per row: cluster filters plus the adjacent-OI checks."""
+    res_strike, res_oi = intraday_resistance_only_highest(
+        strikes, ce_oi, ce_mask, spot_col, max_pct_away=resistance_pct, cluster_ratio=resistance_cluster,
+        min_avg_multiplier=min_avg_multiplier)
+    keep = filter_resistances_by_adjacent_puts_near_price(
+        res_strike, res_oi, strikes, pe_oi, pe_mask, spot_col, max_pct_away=0.05)
+    res_strike = np.where(keep, res_strike, np.nan)
+    res_oi = np.where(keep, res_oi, np.nan)
+
+    sup_strikes, sup_ois = nearest_strong_supports_cluster(
+        strikes, pe_oi, pe_mask, spot_col, n=2, max_pct_away=support_pct, cluster_ratio=support_cluster,
+        min_avg_multiplier=min_avg_multiplier)
+    keep = np.column_stack([
+        filter_supports_by_adjacent_calls_near_price(
+            sup_strikes[:, j], sup_ois[:, j], strikes, ce_oi, ce_mask, spot_col, max_pct_away=0.05)
+        for j in range(sup_strikes.shape[1])
+    ])
+    first = np.argmax(keep, axis=1)
+    any_kept = keep.any(axis=1)
+    return {"resistance_strike": res_strike, "resistance_oi": res_oi,
+            "support_strike": _pick(sup_strikes, first, any_kept), "support_oi": _pick(sup_ois, first, any_kept)}
+
+
+def prefer_atm(atm, fallback):
+    """Per side, the ATM level where there is one, else the fallback level."""
+    levels = {}
+    for side in ("resistance", "support"):
+        found = ~np.isnan(atm[f"{side}_strike"])
+        levels[f"{side}_strike"] = np.where(found, atm[f"{side}_strike"], fallback[f"{side}_strike"])
+        levels[f"{side}_oi"] = np.where(found, atm[f"{side}_oi"], fallback[f"{side}_oi"])
+    return levels
+
+
+def intraday_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, dominance_factor=1.2,
+                    resistance_pct=0.04, support_pct=0.06, resistance_cluster=0.7, support_cluster=0.6,
+                    min_avg_multiplier=1.5, atm_window=200):
+    """
+    Intraday resistance/support per row; the defaults are compute_levels()'s.
+
+    Takes float matrices with at least one column and spot as a column vector;
+    atm_window is a scalar or, like spot, a column vector.
+    """
+    # ATM-centric preferred intraday levels, falling back to the cluster filters
+    return prefer_atm(
+        atm_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, dominance_factor, atm_window),
+        cluster_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, resistance_pct, support_pct,
+                       resistance_cluster, support_cluster, min_avg_multiplier))
+
+
+def batch_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot, atm_window=200):
+    """
+    levels.compute_levels() for every row of the padded matrices.
+
+    atm_window is in price units, either one value for every row or one per
+    row (expiries.py sizes it in strike steps per symbol).
+
+    Returns a dict of arrays: one strike/OI per row for the intraday levels
+    and (rows x 2) strikes/OI for the positional ones, NaN where absent.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    ce_oi = np.asarray(ce_oi, dtype=np.float64)
+    pe_oi = np.asarray(pe_oi, dtype=np.float64)
+    spot_col = np.asarray(spot, dtype=np.float64)[:, None]
+    atm_window = np.asarray(atm_window, dtype=np.float64)
+    if atm_window.ndim:
+        atm_window = atm_window[:, None]
+    if not strikes.shape[1]:
+        # Keep one empty column so row-wise argmin/argmax have something to index.
+        strikes = np.full((len(spot_col), 1), np.nan)
+        ce_oi = pe_oi = np.zeros((len(spot_col), 1))
+        ce_mask = pe_mask = np.zeros((len(spot_col), 1), dtype=bool)
+
+    levels = intraday_levels(strikes, ce_oi, pe_oi, ce_mask, pe_mask, spot_col, atm_window=atm_window)
+    pos_res_strikes, pos_res_oi = positional_resistances_highest(
+        strikes, ce_oi, ce_mask, spot_col, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5)
+    pos_sup_strikes, pos_sup_oi = positional_supports_highest(
+        strikes, pe_oi, pe_mask, spot_col, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5)
+    levels.update({
+        "positional_resistance_strikes": pos_res_strikes,
+        "positional_resistance_oi": pos_res_oi,
+        "positional_support_strikes": pos_sup_strikes,
+        "positional_support_oi": pos_sup_oi,
+    })
+    return levels
+
+
+def to_results(symbols, spot, levels, oi_dicts=None):
+    """
+    Rows in the scan's results format from batch_levels() output.
+
+    With oi_dicts, the (call_oi_by_strike, put_oi_by_strike) pairs the rows were
+    packed from, OI is read back from them so rows equal engine.build_row()'s.
+    """
+    results = []
+    for i, symbol in enumerate(symbols):
+        row = {"symbol": symbol, "stock_price": spot[i]}
+        for side, kind in (("support", 1), ("resistance", 0)):
+            strike = levels[f"{side}_strike"][i]
+            found = not np.isnan(strike)
+            strike = float(strike) if found else None
+            if not found:
+                oi = None
+            elif oi_dicts is not None:
+                oi = oi_dicts[i][kind][strike]
+            else:
+                oi = float(levels[f"{side}_oi"][i])
+            row[f"{side}_strike"] = strike
+            row[f"{side}_oi"] = oi
+            row[f"{side}_diff"] = abs(row["stock_price"] - strike) if found else float('inf')
+        row["nearest_level"] = min(row["support_diff"], row["resistance_diff"])
+        results.append(row)
+    return results
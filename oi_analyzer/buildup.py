@@ -0,0 +1,255 @@
+"""
+Change in OI and long/short buildup between consecutive scans.
+
+BuildupTracker keeps the previous scan of the whole universe as one Frame:
+flat arrays of CE/PE OI and LTP, sorted on an int64 key that packs the
+symbol's id with the strike in paise. A new scan is turned into a Frame the
+same way, and one searchsorted against the previous keys aligns every
+strike of every symbol, so the deltas, the buildup codes and the per-symbol
+totals are a handful of array operations however many symbols are scanned.
+Symbols missing from a scan keep their previous rows for the next one.
+
+Buildup combines a price change with an OI change:
+
+    price up,   OI up    long_buildup
+    price down, OI up    short_buildup
+    price down, OI down  long_unwinding
+    price up,   OI down  short_covering
+
+A symbol's buildup uses the spot and the total OI of the strikes present in
+both scans; each option leg uses its own LTP and OI. annotate() adds these
+columns to results rows (None where there is nothing to compare yet):
+
+    buildup                                  symbol-level buildup
+    call_oi_change, put_oi_change            summed over strikes in both scans
+    support_oi_change, resistance_oi_change  PE OI at the support, CE OI at the resistance
+    support_trend, resistance_trend          strengthening / unwinding / steady
+    support_buildup, resistance_buildup      buildup of that leg
+    support_shift, resistance_shift          up / down / same / new / lost vs the previous scan
+
+Nothing is refetched: the tracker works from the chains the scan already
+has, and a one-shot run can seed it from the SnapshotStore and the previous
+results file.
+"""
+import numpy as np
+
+from .parser import parse_chain
+
+BUILDUPS = ("neutral", "long_buildup", "short_buildup", "long_unwinding", "short_covering")
+NEUTRAL, LONG_BUILDUP, SHORT_BUILDUP, LONG_UNWINDING, SHORT_COVERING = range(len(BUILDUPS))
+TREND_PCT = 0.02  # |change in OI| / previous OI below this is "steady"
+COLUMNS = ("buildup", "call_oi_change", "put_oi_change",
+           "support_oi_change", "support_trend", "support_buildup", "support_shift",
+           "resistance_oi_change", "resistance_trend", "resistance_buildup", "resistance_shift")
+
+
+def strike_keys(sym, strikes):
+    """int64 (symbol id, strike) keys that sort by symbol, then strike."""
+    return (sym << 32) | np.rint(strikes * 100).astype(np.int64)
+
+
+def classify(price_change, oi_change):
+    """Buildup codes (indexes into BUILDUPS); NaN on either side is neutral."""
+    codes = np.zeros(len(oi_change), np.int8)
+    up, down = price_change > 0, price_change < 0
+    added, shed = oi_change > 0, oi_change < 0
+    codes[up & added] = LONG_BUILDUP
+    codes[down & added] = SHORT_BUILDUP
+    codes[down & shed] = LONG_UNWINDING
+    codes[up & shed] = SHORT_COVERING
+    return codes
+
+
+class Frame:
+    """One scan of the universe: strike rows sorted by key; missing OI and LTP are NaN."""
+
+    def __init__(self, keys, ce_oi, pe_oi, ce_ltp, pe_ltp, spots):
+        self.keys = keys
+        self.ce_oi = ce_oi
+        self.pe_oi = pe_oi
+        self.ce_ltp = ce_ltp
+        self.pe_ltp = pe_ltp
+        self.spots = spots  # {symbol: spot}
+
+    @classmethod
+    def build(cls, ids, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp, spots):
+        """Frame from per-symbol lists of arrays; ids[i] is the id of the i-th symbol's arrays."""
+        if not strikes:
+            return cls.empty()
+        sym = np.repeat(np.asarray(ids, np.int64), [len(s) for s in strikes])
+        keys = strike_keys(sym, np.concatenate(strikes))
+        columns = [np.concatenate(c).astype(np.float64) for c in (ce_oi, pe_oi, ce_ltp, pe_ltp)]
+        if len(keys) > 1 and not (keys[1:] > keys[:-1]).all():
+            order = np.argsort(keys, kind="stable")
+            keys, columns = keys[order], [c[order] for c in columns]
+        return cls(keys, *columns, spots)
+
+    @classmethod
+    def empty(cls):
+        nothing = np.empty(0)
+        return cls(np.empty(0, np.int64), nothing, nothing, nothing, nothing, {})
+
+    def without(self, sym_ids):
+        """This frame minus the rows of the given symbol ids."""
+        keep = ~np.isin(self.keys >> 32, sym_ids)
+        return Frame(self.keys[keep], self.ce_oi[keep], self.pe_oi[keep], self.ce_ltp[keep],
+                     self.pe_ltp[keep], self.spots)
+
+    def merge(self, other):
+        """Rows of both frames (other's symbols must not be in self), re-sorted."""
+        keys = np.concatenate([self.keys, other.keys])
+        order = np.argsort(keys, kind="stable")
+        columns = [np.concatenate([a, b])[order] for a, b in
+                   ((self.ce_oi, other.ce_oi), (self.pe_oi, other.pe_oi),
+                    (self.ce_ltp, other.ce_ltp), (self.pe_ltp, other.pe_ltp))]
+        return Frame(keys[order], *columns, {**self.spots, **other.spots})
+
+
+class BuildupTracker:
+    def __init__(self, trend_pct=TREND_PCT):
+        self.trend_pct = trend_pct
+        self.ids = {}
+        self.frame = Frame.empty()
+        self.levels = {}  # {symbol: (support_strike, resistance_strike)} from the previous scan
+        self.changes = None
+
+    def _id(self, symbol):
+        return self.ids.setdefault(symbol, len(self.ids))
+
+    # --- SEEDING (one-shot runs) ---
+    def seed(self, store, symbols, previous_rows=()):
+        """
+        Previous scan from each symbol's latest snapshot in a store.SnapshotStore
+        and, for level shifts, from the rows of the previous results file.
+        Call before the scan appends to the store.
+        """
+        ids, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp, spots = [], [], [], [], [], [], {}
+        days = store.days()[::-1]
+        for symbol in symbols:
+            for day in days:
+                if len(store.snapshots(symbol, day)["snap_ts"]):
+                    _, spot, cols = store.snapshot(symbol, day, -1)
+                    ids.append(self._id(symbol))
+                    strikes.append(cols["strike"])
+                    ce_oi.append(np.where(cols["ce_oi"] >= 0, cols["ce_oi"], np.nan))
+                    pe_oi.append(np.where(cols["pe_oi"] >= 0, cols["pe_oi"], np.nan))
+                    ce_ltp.append(cols["ce_ltp"])
+                    pe_ltp.append(cols["pe_ltp"])
+                    spots[symbol] = spot
+                    break
+        self.frame = Frame.build(ids, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp, spots)
+        for row in previous_rows:
+            self.levels[row["symbol"]] = (row.get("support_strike"), row.get("resistance_strike"))
+
+    # --- SCANS ---
+    def frame_from(self, chains):
+        """Frame from {symbol: parser.Chain}."""
+        ids, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp, spots = [], [], [], [], [], [], {}
+        for symbol, chain in chains.items():
+            ids.append(self._id(symbol))
+            strikes.append(chain.strikes)
+            ce_oi.append(np.where(chain.ce_mask, chain.ce_oi, np.nan))
+            pe_oi.append(np.where(chain.pe_mask, chain.pe_oi, np.nan))
+            ce_ltp.append(chain.ce_ltp)
+            pe_ltp.append(chain.pe_ltp)
+            spots[symbol] = chain.spot
+        return Frame.build(ids, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp, spots)
+
+    def compare(self, current):
+        """
+        Per-strike changes from the previous frame to `current`, aligned on
+        current.keys: {"matched", "ce_oi_change", "pe_oi_change",
+        "ce_buildup", "pe_buildup"} (changes are NaN for unmatched strikes).
+        """
+        previous = self.frame
+        if len(previous.keys):
+            pos = np.minimum(np.searchsorted(previous.keys, current.keys), len(previous.keys) - 1)
+            matched = previous.keys[pos] == current.keys
+        else:
+            pos = np.zeros(len(current.keys), np.int64)
+            matched = np.zeros(len(current.keys), bool)
+
+        def change(cur, prev):
+            return np.where(matched, cur - prev[pos], np.nan) if len(prev) else np.full(len(cur), np.nan)
+
+        ce_oi, pe_oi = change(current.ce_oi, previous.ce_oi), change(current.pe_oi, previous.pe_oi)
+        return {
+            "matched": matched,
+            "ce_oi_change": ce_oi,
+            "pe_oi_change": pe_oi,
+            "ce_buildup": classify(change(current.ce_ltp, previous.ce_ltp), ce_oi),
+            "pe_buildup": classify(change(current.pe_ltp, previous.pe_ltp), pe_oi),
+        }
+
+    def annotate(self, rows, chains):
+        """
+        Add the COLUMNS to results rows (in place) from this scan's chains,
+        {symbol: parser.Chain}, then keep the scan as the previous one.
+        """
+        current = self.frame_from(chains)
+        changes = self.changes = self.compare(current)
+        sym = current.keys >> 32
+        size = len(self.ids)
+        matched = np.bincount(sym, weights=changes["matched"], minlength=size + 1)
+        calls = np.bincount(sym, weights=np.nan_to_num(changes["ce_oi_change"]), minlength=size + 1)
+        puts = np.bincount(sym, weights=np.nan_to_num(changes["pe_oi_change"]), minlength=size + 1)
+        # Rows of symbols the tracker has never seen point at the spare last slot, which stays empty.
+        sids = np.fromiter((self.ids.get(row["symbol"], size) for row in rows), np.int64, len(rows))
+        previous_spot = np.array([self.frame.spots.get(row["symbol"], np.nan) for row in rows], np.float64)
+        spot_change = np.array([row["stock_price"] for row in rows], np.float64) - previous_spot
+        codes = classify(spot_change, calls[sids] + puts[sids])
+        support = self._at(current, changes, sids, rows, "support_strike", "pe")
+        resistance = self._at(current, changes, sids, rows, "resistance_strike", "ce")
+
+        for i, row in enumerate(rows):
+            symbol = row["symbol"]
+            sid = sids[i]
+            if matched[sid]:
+                row["buildup"] = BUILDUPS[codes[i]]
+                row["call_oi_change"], row["put_oi_change"] = int(calls[sid]), int(puts[sid])
+            else:
+                row["buildup"] = row["call_oi_change"] = row["put_oi_change"] = None
+            previous = self.levels.get(symbol)
+            for side, found, j in (("support", support, 0), ("resistance", resistance, 1)):
+                row[f"{side}_oi_change"], row[f"{side}_trend"], row[f"{side}_buildup"] = found[i]
+                row[f"{side}_shift"] = _shift(previous[j] if previous else None, row.get(f"{side}_strike"),
+                                              previous is not None)
+            self.levels[symbol] = (row.get("support_strike"), row.get("resistance_strike"))
+
+        scanned = np.fromiter((self.ids[s] for s in chains), np.int64, len(chains))
+        self.frame = self.frame.without(scanned).merge(current) if len(self.frame.keys) else current
+        return rows
+
+    def _at(self, current, changes, sids, rows, strike_column, side):
+        """(oi_change, trend, buildup) of one leg at each row's level strike, looked up for all rows at once."""
+        n = len(rows)
+        if not len(current.keys):
+            return [(None, None, None)] * n
+        strikes = np.array([np.nan if row.get(strike_column) is None else row[strike_column] for row in rows],
+                           np.float64)
+        keys = strike_keys(sids, np.nan_to_num(strikes))
+        pos = np.minimum(np.searchsorted(current.keys, keys), len(current.keys) - 1)
+        oi_change = changes[f"{side}_oi_change"][pos]
+        known = ~np.isnan(strikes) & (current.keys[pos] == keys) & ~np.isnan(oi_change)
+        before = getattr(current, f"{side}_oi")[pos] - oi_change
+        ratio = np.divide(oi_change, before, out=np.where(oi_change > 0, np.inf, 0.0), where=known & (before > 0))
+        trends = np.where(ratio >= self.trend_pct, "strengthening",
+                          np.where(ratio <= -self.trend_pct, "unwinding", "steady"))
+        codes = changes[f"{side}_buildup"][pos]
+        return [(int(oi_change[i]), str(trends[i]), BUILDUPS[codes[i]]) if known[i] else (None, None, None)
+                for i in range(n)]
+
+
+def _shift(before, after, seen):
+    if not seen or (before is None and after is None):
+        return None
+    if before is None:
+        return "new"
+    if after is None:
+        return "lost"
+    return "up" if after > before else "down" if after < before else "same"
+
+
+def chains_from(responses):
+    """{symbol: parser.Chain} from {symbol: optionchain response}."""
+    return {symbol: parse_chain(response) for symbol, response in responses.items()}
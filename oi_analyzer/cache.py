@@ -0,0 +1,161 @@
+"""
+TTL + LRU cache for optionchain responses with stale-while-revalidate.
+
+Entries are keyed by (symbol, strikecount, expiry). A fresh entry is served
+as is; a stale one (older than `ttl` but within `ttl + stale_ttl`) is served
+immediately while a background fetch replaces it; anything older is a miss.
+With revalidate=False a stale entry is fetched again in the foreground and
+only served when that fetch fails. wait_revalidations() lets a caller that
+served stale entries wait for their replacements, as the dashboard's scans
+do before their final publish. Memory is bounded by the JSON size of the cached
+responses.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ChainCache:
+    def __init__(self, ttl=30, stale_ttl=300, max_bytes=64 * 1024 * 1024, path=None, revalidate_workers=2,
+                 revalidate=True):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.revalidate = revalidate
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = OrderedDict()  # key -> (stored_at, size, response)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.revalidating = set()
+        self.pool = ThreadPoolExecutor(max_workers=revalidate_workers)
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0,
+                      "revalidations": 0, "revalidation_errors": 0, "stale_fallbacks": 0}
+
+    @staticmethod
+    def key(symbol, strikecount=20, expiry=""):
+        return (symbol, int(strikecount), str(expiry))
+
+    # --- LOOKUP ---
+    def get_or_fetch(self, key, fetch):
+        """
+        Cached response for `key`, calling `fetch()` on a miss, and when stale
+        either in the background or (revalidate=False) before answering.
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            age = now - entry[0] if entry else None
+            if entry and age <= self.ttl:
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[2]
+            servable = entry is not None and age <= self.ttl + self.stale_ttl
+            if servable and self.revalidate:
+                self.entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                if key not in self.revalidating:
+                    self.revalidating.add(key)
+                    self.pool.submit(self._revalidate, key, fetch)
+                return entry[2]
+            self.stats["misses"] += 1
+        try:
+            response = fetch()
+        except Exception:
+            if not servable:
+                raise
+            response = None
+        if servable and (response is None or response.get("code") != 200):
+            # The fetch failed: the last good chain beats an error row
+            self._count("stale_fallbacks")
+            return entry[2]
+        self.put(key, response)
+        return response
+
+    def _revalidate(self, key, fetch):
+        try:
+            response = fetch()
+            if self.put(key, response):
+                self._count("revalidations")
+            else:
+                self._count("revalidation_errors")
+        except Exception:
+            self._count("revalidation_errors")
+        finally:
+            with self.lock:
+                self.revalidating.discard(key)
+                self.idle.notify_all()
+
+    def wait_revalidations(self, timeout=None):
+        """Block until no background revalidation is running; False if `timeout` ran out first."""
+        with self.idle:
+            return self.idle.wait_for(lambda: not self.revalidating, timeout)
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    # --- STORAGE ---
+    def put(self, key, response, stored_at=None):
+        """Store a successful response; errors are never cached. Returns True if stored."""
+        if response.get("code") != 200:
+            return False
+        size = len(json.dumps(response, separators=(",", ":")))
+        if size > self.max_bytes:
+            return False
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.bytes -= old[1]
+            self.entries[key] = (stored_at if stored_at is not None else time.time(), size, response)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.stats["evictions"] += 1
+        return True
+
+    def snapshot_stats(self):
+        with self.lock:
+            stats = dict(self.stats, entries=len(self.entries), bytes=self.bytes)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    # --- PERSISTENCE ---
+    def save(self, path=None):
+        """Write all entries to disk (write-then-rename, so a crash never leaves a torn file)."""
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            rows = [[list(k), stored_at, response] for k, (stored_at, _, response) in self.entries.items()]
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(rows, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        """Warm the cache from disk, dropping entries too old to serve even as stale."""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        cutoff = time.time() - self.ttl - self.stale_ttl
+        loaded = 0
+        for key, stored_at, response in rows:
+            if stored_at >= cutoff and self.put(tuple(key), response, stored_at=stored_at):
+                loaded += 1
+        return loaded
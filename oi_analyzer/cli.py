@@ -0,0 +1,40 @@
+"""
+oi-analyzer command line (also python -m oi_analyzer).
+
+Each command's module is imported only when that command runs, so --help
+and a mistyped command cost nothing beyond the interpreter.
+"""
+import importlib
+import sys
+
+COMMANDS = {
+    "scan": ("scan", "scan option chains and save stocks near OI support/resistance"),
+    "serve": ("web", "run the live dashboard"),
+    "login": ("auth", "log in to Fyers and save fyers_tokens.json"),
+    "stream": ("streaming", "stream OI ticks and print level changes"),
+    "backtest": ("backtest", "sweep level parameters over stored option chains"),
+    "alerts": ("alerts", "alert when spot comes near a scanned support/resistance level"),
+}
+
+
+def usage():
+    lines = ["usage: oi-analyzer <command> [options]", "", "commands:"]
+    lines += [f"  {name:10s} {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "oi-analyzer <command> --help shows a command's options."]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    if argv[0] in ("-V", "--version"):
+        from . import __version__
+        print(f"oi-analyzer {__version__}")
+        return
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        print(usage(), file=sys.stderr)
+        raise SystemExit(f"oi-analyzer: unknown command {argv[0]!r}")
+    importlib.import_module(f".{command[0]}", __package__).main(argv[1:])
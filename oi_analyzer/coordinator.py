@@ -0,0 +1,191 @@
+"""
+Sharded scans across worker processes, one per Fyers app.
+
+One app's rate limit caps how fast a single process can scan. ShardedScanner
+starts a worker process per account - a fyers_tokens.json-style file in a
+tokens directory - each with its own TokenManager, token bucket and
+connection pool. Symbols go out in chunks: a worker asks for the next chunk
+when it is done with the last, so a faster account simply takes more of
+them. Each row goes back over a results queue as soon as its symbol is
+analyzed, and the coordinator merges the rows into the order run_scan()
+returns.
+
+Failover: a worker whose token is rejected invalidates it and tries once
+more through its TokenManager (which renews the token or fails). If that
+fails, the worker reports the error and exits, and the symbols it had not
+finished go back to the front of the queue for the other workers. A worker
+that dies outright is treated the same way, starting from the chunk it
+held. Symbols still left when every worker is gone are reported as skipped.
+
+Workers are started with "spawn" (the only start method on Windows), so
+scripts that scan this way need an `if __name__ == "__main__"` guard.
+
+    scanner = ShardedScanner(accounts_from("tokens"))
+    results = scanner.scan(load_symbols())
+"""
+import glob
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque, namedtuple
+
+from .engine import MAX_CONCURRENCY, RATE_LIMIT_PER_SEC, analyze_symbol
+from .fetcher import TokenBucket, fetch_option_chains, is_unauthenticated
+from .tokens import TokenError, TokenManager
+
+TOKENS_DIR = "tokens"
+CHUNK_SIZE = 10
+POLL_SEC = 0.5
+JOIN_TIMEOUT_SEC = 5
+
+# base_url points a worker's SDK somewhere else (the fake API in benchmarks)
+Account = namedtuple("Account", ["tokens_path", "rate_per_sec", "base_url"],
+                     defaults=[RATE_LIMIT_PER_SEC, None])
+
+
+def accounts_from(directory=TOKENS_DIR, rate_per_sec=RATE_LIMIT_PER_SEC):
+    """One Account per *.json token file in `directory`, in name order."""
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")))
+    if not paths:
+        raise FileNotFoundError(f"No token files (*.json) in {directory}")
+    return [Account(path, rate_per_sec) for path in paths]
+
+
+# --- WORKER PROCESS ---
+def _worker(index, account, strikecount, max_workers, tasks, results):
+    """
+    Scan the chunks sent on `tasks` until None, with messages on `results`:
+    ("ready", i, None, None), ("row", i, symbol, row), ("skip", i, symbol, message)
+    and ("failed", i, None, error).
+    """
+    if account.base_url:
+        from fyers_apiv3 import fyersModel
+        fyersModel.Config.DATA_API = account.base_url + "/data"
+        fyersModel.Config.API = account.base_url + "/api/v3"
+    manager = TokenManager(account.tokens_path)
+    bucket = TokenBucket(account.rate_per_sec)
+    try:
+        fyers = manager.client()
+    except TokenError as e:
+        results.put(("failed", index, None, str(e)))
+        return
+    while True:
+        results.put(("ready", index, None, None))
+        pending = tasks.get()
+        if pending is None:
+            return
+        for attempt in range(2):
+            responses = fetch_option_chains(fyers, pending, strikecount=strikecount, max_workers=max_workers,
+                                            bucket=bucket)
+            rejected = []
+            for symbol, response in zip(pending, responses):
+                if is_unauthenticated(response):
+                    rejected.append(symbol)
+                    continue
+                row = analyze_symbol(symbol, response)
+                if row is None:
+                    results.put(("skip", index, symbol, response.get("message", "")))
+                else:
+                    results.put(("row", index, symbol, row))
+            if not rejected:
+                break
+            pending = rejected
+            # The token died mid-scan: renew it (or find out it can't be) before giving up the chunk.
+            manager.invalidate()
+            try:
+                fyers = manager.client()
+            except TokenError as e:
+                results.put(("failed", index, None, str(e)))
+                return
+        else:
+            results.put(("failed", index, None, "access token rejected again after renewal"))
+            return
+
+
+# --- COORDINATOR ---
+class ShardedScanner:
+    def __init__(self, accounts, strikecount=20, max_workers=MAX_CONCURRENCY, chunk_size=CHUNK_SIZE):
+        self.accounts = list(accounts)
+        self.strikecount = strikecount
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.failures = {}  # {tokens_path: error} from the last scan
+        self.stats = {"chunks": 0, "requeued": 0, "workers_failed": 0}
+
+    def scan(self, symbols):
+        """Scan `symbols` across the accounts; results sorted by nearest level, as run_scan() returns them."""
+        symbols = list(dict.fromkeys(symbols))
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        tasks = [ctx.Queue() for _ in self.accounts]
+        procs = [ctx.Process(target=_worker, daemon=True,
+                             args=(i, account, self.strikecount, self.max_workers, tasks[i], results))
+                 for i, account in enumerate(self.accounts)]
+        for proc in procs:
+            proc.start()
+
+        chunks = deque(symbols[i:i + self.chunk_size] for i in range(0, len(symbols), self.chunk_size))
+        outstanding = set(symbols)
+        rows = {}
+        live = set(range(len(procs)))
+        idle = set()
+        held = {i: set() for i in live}  # symbols sent to a worker and not yet answered
+        self.failures = {}
+
+        def dispatch():
+            while idle and chunks:
+                i = idle.pop()
+                chunk = chunks.popleft()
+                held[i] = set(chunk)
+                self.stats["chunks"] += 1
+                tasks[i].put(chunk)
+
+        def lose(i, error):
+            live.discard(i)
+            idle.discard(i)
+            self.failures[self.accounts[i].tokens_path] = error
+            self.stats["workers_failed"] += 1
+            print(f"Worker {i} ({self.accounts[i].tokens_path}) stopped: {error}")
+            requeue = [s for s in symbols if s in held[i] and s in outstanding]
+            held[i] = set()
+            if requeue:
+                self.stats["requeued"] += len(requeue)
+                chunks.appendleft(requeue)
+            dispatch()
+
+        last_check = time.monotonic()
+        while outstanding and live:
+            try:
+                kind, i, symbol, payload = results.get(timeout=POLL_SEC)
+            except queue.Empty:
+                kind = None
+            if kind == "ready" and i in live:
+                idle.add(i)
+                dispatch()
+            elif kind == "row" or kind == "skip":
+                held[i].discard(symbol)
+                outstanding.discard(symbol)
+                if kind == "row":
+                    rows[symbol] = payload
+                else:
+                    print(f"Skipping {symbol}: no underlying price in response ({payload})")
+            elif kind == "failed" and i in live:
+                lose(i, payload)
+            if kind is None or time.monotonic() - last_check > POLL_SEC:
+                last_check = time.monotonic()
+                for i in list(live):
+                    # A clean exit is always preceded by a "failed" message, still on its way.
+                    if not procs[i].is_alive() and procs[i].exitcode != 0:
+                        lose(i, f"worker exited with code {procs[i].exitcode}")
+
+        for i in live:
+            tasks[i].put(None)
+        for proc in procs:
+            proc.join(JOIN_TIMEOUT_SEC)
+            if proc.is_alive():
+                proc.terminate()
+        for symbol in symbols:
+            if symbol in outstanding:
+                print(f"Skipping {symbol}: no worker left to scan it")
+        return sorted((rows[s] for s in symbols if s in rows), key=lambda x: x["nearest_level"])
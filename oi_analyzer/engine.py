@@ -0,0 +1,248 @@
+"""
+Importable scan engine and the background service that keeps the latest
+results in memory for web.py.
+"""
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from . import metrics
+from . import output
+from .fetcher import fetch_option_chains
+from .levels import compute_levels
+
+STOCK_LIST_XLSX = "stock_list.xlsx"
+OUTPUT_FILE = "stocks_near_intraday_support_resistance.csv"
+OUTPUT_XLSX = "stocks_near_intraday_support_resistance.xlsx"
+
+# compute_levels()'s default ATM dominance window, in price units
+ATM_WINDOW = 200
+
+# Fetch concurrency; the rate limit should match the app's per-second API quota
+MAX_CONCURRENCY = 8
+RATE_LIMIT_PER_SEC = 10
+
+
+# --- SCAN ---
+def load_symbols(filepath=STOCK_LIST_XLSX):
+    return output.load_symbols(filepath)
+
+
+def parse_option_chain(response):
+    """
+    Underlying price plus CE/PE OI by strike from one optionchain response, in one pass.
+
+    This dict form is what levels.py takes, and building it with one plain
+    loop is cheaper than going through parser.parse_chain()'s arrays, so
+    scans use this. parse_chain() is for callers that also need change in OI,
+    volume or LTP per strike.
+    """
+    stock_price = None
+    call_oi_by_strike = {}
+    put_oi_by_strike = {}
+    for option in response.get("data", {}).get("optionsChain", []):
+        strike = option.get("strike_price")
+        option_type = option.get("option_type")
+        if option_type == "CE" or option_type == "PE":
+            oi = option.get("oi")
+            if strike is not None and strike != -1 and oi is not None:
+                if option_type == "CE":
+                    call_oi_by_strike[float(strike)] = oi
+                else:
+                    put_oi_by_strike[float(strike)] = oi
+        elif stock_price is None and not option_type and strike == -1:
+            stock_price = option.get("ltp")
+    return stock_price, call_oi_by_strike, put_oi_by_strike
+
+
+def analyze_symbol(symbol, response):
+    """One results row for `symbol`, or None when the chain has no underlying price."""
+    with metrics.timer("oi_stage_seconds", stage="parse"):
+        stock_price, call_oi_by_strike, put_oi_by_strike = parse_option_chain(response)
+    if stock_price is None:
+        return None
+    return build_row(symbol, stock_price, call_oi_by_strike, put_oi_by_strike)
+
+
+def build_row(symbol, stock_price, call_oi_by_strike, put_oi_by_strike):
+    """Compute levels from OI dicts and format them as a results row."""
+    return format_row(symbol, stock_price, compute_levels(call_oi_by_strike, put_oi_by_strike, stock_price))
+
+
+def build_rows(inputs):
+    """
+    build_row() for many symbols at once: [(symbol, spot, call OI dict, put OI
+    dict, atm_window)] in, rows out, from one batch.batch_levels() pass over
+    the whole universe instead of the level functions per symbol.
+    """
+    from .batch import batch_levels, pack_dicts, to_results
+    if not inputs:
+        return []
+    symbols, spots, calls, puts, windows = zip(*inputs)
+    oi_dicts = list(zip(calls, puts))
+    atm_window = windows[0] if len(set(windows)) == 1 else windows
+    levels = batch_levels(*pack_dicts(oi_dicts), spots, atm_window=atm_window)
+    return to_results(symbols, spots, levels, oi_dicts=oi_dicts)
+
+
+def format_row(symbol, stock_price, symbol_levels):
+    """Results row from the output of levels.compute_levels()."""
+    intraday_resistances = symbol_levels["intraday_resistances"]
+    intraday_supports = symbol_levels["intraday_supports"]
+
+    res_strike, res_oi = intraday_resistances[0] if intraday_resistances else (None, None)
+    sup_strike, sup_oi = intraday_supports[0] if intraday_supports else (None, None)
+    res_diff = abs(stock_price - res_strike) if res_strike is not None else float('inf')
+    sup_diff = abs(stock_price - sup_strike) if sup_strike is not None else float('inf')
+
+    return {
+        "symbol": symbol,
+        "stock_price": stock_price,
+        "support_strike": sup_strike,
+        "support_oi": sup_oi,
+        "support_diff": sup_diff,
+        "resistance_strike": res_strike,
+        "resistance_oi": res_oi,
+        "resistance_diff": res_diff,
+        "nearest_level": min(sup_diff, res_diff)
+    }
+
+
+def run_scan(fyers, symbols, strikecount=20, max_workers=MAX_CONCURRENCY, rate_per_sec=RATE_LIMIT_PER_SEC,
+             cache=None, store=None, expiries=None, buildup=None):
+    """
+    Fetch and analyze every symbol; results sorted by nearest level.
+
+    Chains are parsed per symbol and their levels computed for the whole
+    universe at once by build_rows(); the rows equal analyze_symbol()'s.
+
+    With a store.SnapshotStore, every fetched chain is also appended to the history.
+    With an expiries.ExpiryPlanner, each symbol's near/next/monthly chains are
+    fetched with strike windows sized to its strike spacing (strikecount is
+    ignored) and levels come from their weighted OI; the store gets the near chain.
+    With a buildup.BuildupTracker, rows also get change in OI, buildup and
+    level-shift columns against the previous scan (of the near chain).
+    """
+    scan_start = time.perf_counter()
+    timings = {}
+    fetch_kwargs = dict(max_workers=max_workers, rate_per_sec=rate_per_sec, cache=cache, timings=timings)
+    if expiries is None:
+        responses = fetch_option_chains(fyers, symbols, strikecount=strikecount, **fetch_kwargs)
+    else:
+        responses = expiries.fetch(fyers, symbols, **fetch_kwargs)
+    inputs = []
+    chains = {}
+    if buildup is not None:
+        from .parser import parse_chain
+    for symbol, response in zip(symbols, responses):
+        start = time.perf_counter()
+        near = response if expiries is None else expiries.near(response)
+        if store is not None:
+            with metrics.timer("oi_stage_seconds", stage="store"):
+                store.append(symbol, near)
+        if expiries is None:
+            with metrics.timer("oi_stage_seconds", stage="parse"):
+                stock_price, call_oi_by_strike, put_oi_by_strike = parse_option_chain(response)
+            parsed = None if stock_price is None else (stock_price, call_oi_by_strike, put_oi_by_strike, ATM_WINDOW)
+        else:
+            parsed = expiries.level_inputs(symbol, response)
+        timings[symbol] = timings.get(symbol, 0.0) + time.perf_counter() - start
+        if parsed is None:
+            metrics.inc("oi_symbols_skipped_total")
+            print(f"Skipping {symbol}: no underlying price in response ({near.get('message', '')})")
+            continue
+        if buildup is not None:
+            chains[symbol] = parse_chain(near)
+        inputs.append((symbol, *parsed))
+    # Levels for the whole universe in one matrix pass; each symbol is charged an equal share.
+    start = time.perf_counter()
+    with metrics.timer("oi_stage_seconds", stage="levels"):
+        results = build_rows(inputs)
+    share = (time.perf_counter() - start) / len(inputs) if inputs else 0.0
+    for symbol, *_ in inputs:
+        metrics.observe("oi_symbol_seconds", timings[symbol] + share)
+        metrics.set_gauge("oi_symbol_last_seconds", timings[symbol] + share, symbol=symbol)
+    if buildup is not None:
+        with metrics.timer("oi_stage_seconds", stage="buildup"):
+            buildup.annotate(results, chains)
+    metrics.observe("oi_scan_seconds", time.perf_counter() - scan_start)
+    return sorted(results, key=lambda x: x["nearest_level"])
+
+
+def save_results(results, filepath=OUTPUT_FILE):
+    """Write results atomically; the format follows the extension (see output.py)."""
+    with metrics.timer("oi_stage_seconds", stage="output"):
+        output.write_results(results, filepath)
+
+
+# --- BACKGROUND SERVICE ---
+Snapshot = namedtuple("Snapshot", ["results", "refreshed_at", "duration", "error"])
+
+
+class AnalyzerService:
+    """
+    Runs `scan()` on a background schedule and keeps the latest results.
+
+    Readers get the current snapshot without waiting. refresh() calls that
+    arrive while a scan is running wait for that scan instead of starting
+    another one. `on_refresh(snapshot)` runs after every scan, failed ones
+    included, e.g. to push the results to live viewers.
+    """
+
+    def __init__(self, scan, interval=60, on_refresh=None):
+        self.scan = scan
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.snapshot = Snapshot([], None, None, None)
+        self.lock = threading.Lock()
+        self.inflight = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self, wait=True):
+        with self.lock:
+            done = self.inflight
+            leader = done is None
+            if leader:
+                done = self.inflight = threading.Event()
+        if not leader:
+            if wait:
+                done.wait()
+            return self.snapshot
+        start = time.time()
+        try:
+            results = self.scan()
+            self.snapshot = Snapshot(results, start, time.time() - start, None)
+        except Exception as e:
+            # Keep serving the last good results alongside the error.
+            self.snapshot = self.snapshot._replace(error=f"{type(e).__name__}: {e}")
+        finally:
+            with self.lock:
+                self.inflight = None
+            done.set()
+        if self.on_refresh is not None:
+            try:
+                self.on_refresh(self.snapshot)
+            except Exception:
+                # A failing publisher must not kill the background loop; the next scan tries again.
+                print("on_refresh callback failed:", file=sys.stderr)
+                traceback.print_exc()
+        return self.snapshot
+
+    def is_refreshing(self):
+        return self.inflight is not None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.refresh()
+            self.stop_event.wait(self.interval)
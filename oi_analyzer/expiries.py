@@ -0,0 +1,185 @@
+"""
+Expiry-aware fetching for stock and index options.
+
+Each symbol gets its near, next and monthly expiries (a date filling two
+roles is fetched once; stock options list monthly expiries only). The strike
+window follows the symbol's strike spacing: strikecount covers WINDOW_PCT of
+spot either side of ATM - as far as the intraday filters in
+levels.compute_levels look - instead of a blanket ±20 strikes, which is far
+too wide for a ₹300 stock on ₹5 strikes and too narrow for an index on
+50-point strikes. Positional levels see the same window. The ATM dominance
+window likewise becomes ATM_WINDOW_STRIKES strikes instead of ₹200.
+
+The first scan of a symbol probes its nearest expiry with a tiny strikecount
+to learn the spot, strike spacing and expiry calendar. The plan is reused
+until its near expiry passes, with the spot and spacing refreshed from every
+scan's chains.
+
+OI from the fetched expiries is merged per strike, each expiry weighted by
+EXPIRY_WEIGHTS, and the merged chain goes through the usual level functions.
+
+    planner = ExpiryPlanner()
+    results = run_scan(fyers, symbols, expiries=planner)
+"""
+import math
+import time
+
+from . import metrics
+from .engine import ATM_WINDOW, format_row, parse_option_chain
+from .fetcher import fetch_chain_requests
+from .levels import compute_levels
+
+WINDOW_PCT = 0.06       # widest max_pct_away in compute_levels (nearest_strong_supports_cluster)
+ATM_WINDOW_STRIKES = 4  # the old 200-point atm_window on 50-point index strikes
+PROBE_STRIKECOUNT = 2
+MAX_STRIKECOUNT = 50
+EXPIRY_WEIGHTS = {"near": 1.0, "next": 0.5, "monthly": 0.25}
+
+
+def strike_step(strikes):
+    """Smallest gap between distinct strikes, or None with fewer than two strikes."""
+    strikes = sorted(set(strikes))
+    gaps = [b - a for a, b in zip(strikes, strikes[1:])]
+    return min(gaps) if gaps else None
+
+
+def strikecount_for(spot, step, window_pct=WINDOW_PCT):
+    """Strikes per side of ATM needed to cover spot ± window_pct."""
+    return max(1, min(MAX_STRIKECOUNT, math.ceil(spot * window_pct / step) + 1))
+
+
+def select_expiries(expiry_data, now=None):
+    """
+    [(label, timestamp)] for the near, next and monthly expiries in an
+    optionchain response's expiryData. A date that fills several roles is
+    listed once, under its first label.
+    """
+    now = time.time() if now is None else now
+    dates = sorted(ts for ts in (int(e["expiry"]) for e in expiry_data if e.get("expiry")) if ts >= now)
+    if not dates:
+        return []
+    picks = [("near", dates[0])]
+    if len(dates) > 1:
+        picks.append(("next", dates[1]))
+    month = lambda ts: time.localtime(ts)[:2]
+    # The monthly contract is the last listed expiry of its calendar month.
+    monthly = next((d for d, after in zip(dates, dates[1:]) if month(d) != month(after)), None)
+    if monthly is not None and monthly not in [ts for _, ts in picks]:
+        picks.append(("monthly", monthly))
+    return picks
+
+
+def merge_oi(weighted):
+    """One OI-by-strike dict, in strike order, from [(weight, oi_by_strike)]."""
+    merged = {}
+    for weight, oi_by_strike in weighted:
+        for strike, oi in oi_by_strike.items():
+            merged[strike] = merged.get(strike, 0) + weight * oi
+    return dict(sorted(merged.items()))
+
+
+class Plan:
+    """What the planner knows about one symbol: spot, strike spacing per expiry and the expiries to fetch."""
+
+    def __init__(self, spot, step, expiries):
+        self.spot = spot
+        self.step = step
+        self.steps = {}
+        self.expiries = expiries
+
+    def strikecount(self, ts, window_pct):
+        return strikecount_for(self.spot, self.steps.get(ts, self.step), window_pct)
+
+
+class ExpiryPlanner:
+    def __init__(self, window_pct=WINDOW_PCT, weights=None, atm_window_strikes=ATM_WINDOW_STRIKES):
+        self.window_pct = window_pct
+        self.weights = dict(EXPIRY_WEIGHTS if weights is None else weights)
+        self.atm_window_strikes = atm_window_strikes
+        self.plans = {}
+        self.stats = {"probes": 0, "requests": 0}
+
+    # --- FETCHING ---
+    def fetch(self, fyers, symbols, **fetch_kwargs):
+        """
+        Per symbol, a list of (label, expiry timestamp, response) - for a symbol
+        whose probe failed, just [("near", None, probe response)] so the error
+        surfaces. fetch_kwargs go to fetcher.fetch_chain_requests().
+        """
+        now = time.time()
+        failed = {}
+        unplanned = [s for s in symbols if s not in self.plans or self.plans[s].expiries[0][1] < now]
+        if unplanned:
+            probes = fetch_chain_requests(fyers, [(s, PROBE_STRIKECOUNT, "") for s in unplanned], **fetch_kwargs)
+            self.stats["probes"] += len(unplanned)
+            for symbol, response in zip(unplanned, probes):
+                if not self._learn(symbol, response, now):
+                    failed[symbol] = [("near", None, response)]
+
+        requests, owners = [], []
+        for symbol in symbols:
+            plan = self.plans.get(symbol)
+            if symbol in failed or plan is None:
+                continue
+            for label, ts in plan.expiries:
+                requests.append((symbol, plan.strikecount(ts, self.window_pct), str(ts)))
+                owners.append((symbol, label, ts))
+        responses = fetch_chain_requests(fyers, requests, **fetch_kwargs)
+        self.stats["requests"] += len(requests)
+        chains = dict(failed)
+        for (symbol, label, ts), response in zip(owners, responses):
+            chains.setdefault(symbol, []).append((label, ts, response))
+        return [chains.get(symbol, []) for symbol in symbols]
+
+    def _learn(self, symbol, response, now):
+        spot, calls, puts = parse_option_chain(response)
+        step = strike_step(list(calls) + list(puts))
+        expiries = select_expiries(response.get("data", {}).get("expiryData", []), now)
+        if spot is None or not step or not expiries:
+            self.plans.pop(symbol, None)
+            return False
+        self.plans[symbol] = Plan(spot, step, expiries)
+        return True
+
+    # --- ANALYSIS ---
+    @staticmethod
+    def near(chains):
+        """The nearest expiry's response (or the failed probe's) from fetch()'s list for one symbol."""
+        return chains[0][2] if chains else {}
+
+    def analyze(self, symbol, chains):
+        """One results row from a symbol's expiry chains, or None when none has an underlying price."""
+        inputs = self.level_inputs(symbol, chains)
+        if inputs is None:
+            return None
+        spot, calls, puts, atm_window = inputs
+        return format_row(symbol, spot, compute_levels(calls, puts, spot, atm_window=atm_window))
+
+    def level_inputs(self, symbol, chains):
+        """
+        (spot, weighted call OI, weighted put OI, atm_window) from a symbol's
+        expiry chains, or None when none has an underlying price.
+        """
+        plan = self.plans.get(symbol)
+        spot = near_step = None
+        calls, puts = [], []
+        for label, ts, response in chains:
+            with metrics.timer("oi_stage_seconds", stage="parse"):
+                chain_spot, call_oi_by_strike, put_oi_by_strike = parse_option_chain(response)
+            if chain_spot is None:
+                continue
+            weight = self.weights.get(label, 0.0)
+            calls.append((weight, call_oi_by_strike))
+            puts.append((weight, put_oi_by_strike))
+            step = strike_step(list(call_oi_by_strike) + list(put_oi_by_strike))
+            if spot is None:
+                spot, near_step = chain_spot, step
+            if plan is not None and step:
+                plan.steps[ts] = step
+        if spot is None:
+            return None
+        if plan is not None:
+            plan.spot = spot
+            near_step = near_step or plan.step
+        atm_window = self.atm_window_strikes * near_step if near_step else ATM_WINDOW
+        return spot, merge_oi(calls), merge_oi(puts), atm_window
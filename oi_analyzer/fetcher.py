@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+
+# Fyers answers quota breaches with HTTP 429 and a "request limit reached" message.
+THROTTLE_CODES = {429, -429}
+# Only these phrases mark a throttle when the code is missing; a bare "limit" also
+# turns up in strike/price-limit and limit-order errors.
+THROTTLE_PHRASES = ("request limit", "rate limit", "too many requests")
+# ...and expired, revoked or unknown access tokens with these.
+AUTH_CODES = {401, -8, -15, -16}
+
+
+# --- RATE LIMITING ---
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until a request slot is free."""
+
+    def __init__(self, rate_per_sec, capacity=None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(capacity if capacity is not None else rate_per_sec)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        while not self.try_acquire():
+            time.sleep(1.0 / self.rate / 4)
+
+
+def is_throttled(response):
+    code = response.get("code")
+    message = str(response.get("message", "")).lower()
+    return code in THROTTLE_CODES or any(phrase in message for phrase in THROTTLE_PHRASES)
+
+
+def is_unauthenticated(response):
+    return response.get("code") in AUTH_CODES
+
+
+# --- FETCHING ---
+def fetch_option_chain(fyers, symbol, strikecount=20, timestamp="", bucket=None,
+                       max_retries=3, backoff=0.5):
+    """Fetch one option chain, retrying with exponential backoff when throttled."""
+    data = {
+        "symbol": symbol,
+        "strikecount": strikecount,
+        "timestamp": timestamp
+    }
+    attempt = 0
+    while True:
+        if bucket is not None:
+            bucket.acquire()
+        with metrics.timer("oi_stage_seconds", stage="fetch"):
+            try:
+                response = fyers.optionchain(data=data)
+            except Exception as e:
+                response = {"s": "error", "code": -99, "message": str(e)}
+        # The SDK hands back one shared dict for every failed call; copy it so
+        # concurrent failures don't overwrite each other.
+        response = dict(response)
+        metrics.inc("oi_api_requests_total")
+        if is_throttled(response):
+            metrics.inc("oi_api_throttled_total")
+        elif response.get("code") != 200:
+            metrics.inc("oi_api_errors_total", code=response.get("code"))
+        else:
+            metrics.inc("oi_api_chain_rows_total", len(response.get("data", {}).get("optionsChain", [])))
+        if not is_throttled(response) or attempt >= max_retries:
+            return response
+        time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+        attempt += 1
+
+
+def fetch_option_chains(fyers, symbols, strikecount=20, max_workers=8, rate_per_sec=10,
+                        burst=None, max_retries=3, backoff=0.5, cache=None, timings=None, bucket=None):
+    """
+    Fetch option chains for many symbols concurrently.
+
+    Requests share one token bucket so the whole pool stays inside the broker's
+    per-second quota. Responses are returned in the same order as `symbols`.
+    With a ChainCache, fresh or stale-but-servable chains skip the network.
+    A `timings` dict receives each symbol's fetch time, queueing included.
+    Pass a TokenBucket as `bucket` to share one quota across calls.
+    """
+    return fetch_chain_requests(fyers, [(symbol, strikecount, "") for symbol in symbols], max_workers=max_workers,
+                                rate_per_sec=rate_per_sec, burst=burst, max_retries=max_retries, backoff=backoff,
+                                cache=cache, timings=timings, bucket=bucket)
+
+
+def fetch_chain_requests(fyers, requests, max_workers=8, rate_per_sec=10,
+                         burst=None, max_retries=3, backoff=0.5, cache=None, timings=None, bucket=None):
+    """
+    fetch_option_chains() for explicit (symbol, strikecount, expiry timestamp) requests,
+    so each symbol and expiry can ask for its own strike window. An empty
+    timestamp means the nearest expiry. `timings` sums each symbol's requests.
+    """
+    requests = list(requests)
+    if not requests:
+        return []
+    if bucket is None:
+        bucket = TokenBucket(rate_per_sec, burst)
+
+    def fetch(request):
+        symbol, strikecount, timestamp = request
+
+        def download():
+            return fetch_option_chain(fyers, symbol, strikecount=strikecount, timestamp=timestamp, bucket=bucket,
+                                      max_retries=max_retries, backoff=backoff)
+        start = time.perf_counter()
+        if cache is None:
+            response = download()
+        else:
+            response = cache.get_or_fetch(cache.key(symbol, strikecount, timestamp), download)
+        return response, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as pool:
+        results = list(pool.map(fetch, requests))
+    if timings is not None:
+        for (symbol, _, _), (_, elapsed) in zip(requests, results):
+            timings[symbol] = timings.get(symbol, 0.0) + elapsed
+    return [response for response, _ in results]
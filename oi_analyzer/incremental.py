@@ -0,0 +1,307 @@
+"""
+Incrementally maintained strike ladder for per-tick level updates.
+
+Each side (CE/PE) keeps its strikes sorted with a segment tree over their OI
+holding range sums and range maxima (with leftmost/rightmost argmax for tie
+breaks). Every level function in levels.py only ever needs, over a contiguous
+strike window, the sum, the count, the maximum and the next few strikes in
+OI order, so an OI change or a spot move costs O(log n) instead of the
+O(n log n) full recomputation. A strike appearing for the first time
+rebuilds its side in O(n).
+
+Results equal levels.py's for integer OI. OI ties resolve in strike order, as
+levels.py's do for chains delivered in strike order (which Fyers does).
+"""
+import bisect
+import heapq
+
+NEG_INF = float('-inf')
+
+
+class SideTree:
+    """Segment tree over one side's sorted strikes: range sum and range max."""
+
+    def __init__(self, oi_by_strike):
+        self.rebuild(oi_by_strike)
+
+    def rebuild(self, oi_by_strike):
+        self.strikes = sorted(oi_by_strike)
+        self.index = {k: i for i, k in enumerate(self.strikes)}
+        n = len(self.strikes)
+        size = 1
+        while size < n:
+            size *= 2
+        self.size = size
+        self.oi = [oi_by_strike[k] for k in self.strikes]
+        self.sums = [0] * (2 * size)
+        self.maxv = [NEG_INF] * (2 * size)
+        self.left = [-1] * (2 * size)
+        self.right = [-1] * (2 * size)
+        for i, v in enumerate(self.oi):
+            p = size + i
+            self.sums[p] = v
+            self.maxv[p] = v
+            self.left[p] = self.right[p] = i
+        for p in range(size - 1, 0, -1):
+            self._pull(p)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def _pull(self, p):
+        l, r = 2 * p, 2 * p + 1
+        self.sums[p] = self.sums[l] + self.sums[r]
+        if self.maxv[l] > self.maxv[r]:
+            self.maxv[p], self.left[p], self.right[p] = self.maxv[l], self.left[l], self.right[l]
+        elif self.maxv[l] < self.maxv[r]:
+            self.maxv[p], self.left[p], self.right[p] = self.maxv[r], self.left[r], self.right[r]
+        else:
+            self.maxv[p], self.left[p], self.right[p] = self.maxv[l], self.left[l], self.right[r]
+
+    def update(self, i, v):
+        self.oi[i] = v
+        p = self.size + i
+        self.sums[p] = v
+        self.maxv[p] = v
+        p //= 2
+        while p:
+            self._pull(p)
+            p //= 2
+
+    def _nodes(self, lo, hi):
+        """Tree nodes covering [lo, hi) in left-to-right order."""
+        left, right = [], []
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                left.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right.append(hi)
+            lo //= 2
+            hi //= 2
+        return left + right[::-1]
+
+    def range_sum(self, lo, hi):
+        total = 0
+        for p in self._nodes(lo, hi):
+            total += self.sums[p]
+        return total
+
+    def range_max(self, lo, hi, prefer_right=False):
+        """(max OI, index) over [lo, hi), ties to the lowest (or highest) strike; None if empty."""
+        best, best_i = NEG_INF, -1
+        for p in self._nodes(lo, hi):
+            v = self.maxv[p]
+            if v > best or (v == best and prefer_right and best_i >= 0):
+                best, best_i = v, self.right[p] if prefer_right else self.left[p]
+        return (best, best_i) if best_i >= 0 else None
+
+    def ranked(self, lo, hi, prefer_right=False):
+        """Yield (oi, index) over [lo, hi) by OI descending, lazily, O(log n) per item."""
+        heap = []
+
+        def push(a, b):
+            if a < b:
+                found = self.range_max(a, b, prefer_right)
+                if found:
+                    v, i = found
+                    heapq.heappush(heap, (-v, -i if prefer_right else i, i, a, b))
+
+        push(lo, hi)
+        while heap:
+            neg_v, _, i, a, b = heapq.heappop(heap)
+            yield -neg_v, i
+            push(a, i)
+            push(i + 1, b)
+
+    def first_where(self, predicate):
+        """Smallest index whose strike satisfies a monotone (False..True) predicate."""
+        lo, hi = 0, len(self.strikes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if predicate(self.strikes[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def level(self, i):
+        return (self.strikes[i], self.oi[i])
+
+
+class IncrementalLadder:
+    def __init__(self, call_oi_by_strike, put_oi_by_strike, spot):
+        self.calls = SideTree(call_oi_by_strike)
+        self.puts = SideTree(put_oi_by_strike)
+        self.spot = spot
+
+    # --- UPDATES ---
+    def set_spot(self, spot):
+        self.spot = spot
+
+    def set_oi(self, strike, option_type, oi):
+        side = self.calls if option_type == "CE" else self.puts
+        i = side.index.get(strike)
+        if i is None:
+            oi_by_strike = self.oi_by_strike(side)
+            oi_by_strike[strike] = oi
+            side.rebuild(oi_by_strike)
+        else:
+            side.update(i, oi)
+
+    def oi_by_strike(self, side):
+        return dict(zip(side.strikes, side.oi))
+
+    # --- WINDOWS ---
+    def _above(self, side, spot, max_pct_away=None):
+        """Index range of strikes >= spot, optionally within max_pct_away above it."""
+        lo = bisect.bisect_left(side.strikes, spot)
+        if max_pct_away is None:
+            return lo, len(side)
+        hi = side.first_where(lambda k: not (k - spot) / spot <= max_pct_away)
+        return lo, max(lo, hi)
+
+    def _below(self, side, spot, max_pct_away=None):
+        """Index range of strikes <= spot, optionally within max_pct_away below it."""
+        hi = bisect.bisect_right(side.strikes, spot)
+        if max_pct_away is None:
+            return 0, hi
+        lo = side.first_where(lambda k: (spot - k) / spot <= max_pct_away)
+        return min(lo, hi), hi
+
+    @staticmethod
+    def _threshold(side, lo, hi, min_avg_multiplier):
+        avg_oi = side.range_sum(lo, hi) / (hi - lo)
+        max_oi = side.range_max(lo, hi)[0]
+        return min(avg_oi * min_avg_multiplier, max_oi), max_oi
+
+    # --- LEVEL FUNCTIONS (same parameters and results as levels.py) ---
+    def atm_preferred_level(self, kind='call', dominance_factor=1.2, atm_window=200):
+        side = self.calls if kind == 'call' else self.puts
+        if not len(side):
+            return []
+        spot = self.spot
+        i = bisect.bisect_left(side.strikes, spot)
+        if i == len(side) or (i > 0 and abs(side.strikes[i - 1] - spot) <= abs(side.strikes[i] - spot)):
+            i -= 1
+        atm, atm_oi = side.level(i)
+        if kind == 'call':
+            lo, hi = i + 1, bisect.bisect_right(side.strikes, atm + atm_window)
+        else:
+            lo, hi = bisect.bisect_left(side.strikes, atm - atm_window), i
+        # For a non-negative factor, the largest neighbour decides the all() check.
+        strongest = side.range_max(lo, hi) if lo < hi else None
+        if atm_oi > 0 and (strongest is None or strongest[0] <= 0 or atm_oi >= dominance_factor * strongest[0]):
+            return [(atm, atm_oi)]
+        return []
+
+    def intraday_resistance_only_highest(self, max_pct_away=0.04, cluster_ratio=0.7, min_avg_multiplier=1.5):
+        side = self.calls
+        lo, hi = self._above(side, self.spot, max_pct_away)
+        if lo >= hi:
+            return []
+        _, max_oi = self._threshold(side, lo, hi, min_avg_multiplier)
+        # The maximum always clears the adaptive threshold; only the cluster ratio can reject it.
+        if max_oi < max_oi * cluster_ratio:
+            return []
+        return [side.level(side.range_max(lo, hi)[1])]
+
+    def nearest_strong_supports_cluster(self, n=2, max_pct_away=0.04, cluster_ratio=0.6, min_avg_multiplier=1.5):
+        side = self.puts
+        lo, hi = self._below(side, self.spot, max_pct_away)
+        if lo >= hi:
+            return []
+        min_oi_threshold, max_oi = self._threshold(side, lo, hi, min_avg_multiplier)
+        levels = []
+        for v, i in side.ranked(lo, hi, prefer_right=True):
+            if len(levels) == n or v < min_oi_threshold or v < max_oi * cluster_ratio:
+                break
+            levels.append(side.level(i))
+        return levels
+
+    def positional_resistances_highest(self, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+        side = self.calls
+        lo, hi = self._above(side, self.spot)
+        return self._positional(side, lo, hi, cluster_ratio, min_avg_multiplier, dominance_factor, False)
+
+    def positional_supports_highest(self, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+        side = self.puts
+        lo, hi = self._below(side, self.spot)
+        return self._positional(side, lo, hi, cluster_ratio, min_avg_multiplier, dominance_factor, True)
+
+    def _positional(self, side, lo, hi, cluster_ratio, min_avg_multiplier, dominance_factor, supports):
+        if lo >= hi:
+            return []
+        min_oi_threshold, max_oi = self._threshold(side, lo, hi, min_avg_multiplier)
+        dominant = []
+        previous = None
+        for v, i in side.ranked(lo, hi, prefer_right=supports):
+            if v < min_oi_threshold or v < max_oi * cluster_ratio:
+                break
+            if supports:
+                # Overshadowed when the strongest support has dominance_factor x its OI;
+                # candidates only get smaller from here, so the first miss ends the scan.
+                if dominant and dominant[0][0] >= dominance_factor * v:
+                    break
+                dominant.append((v, i))
+                if len(dominant) == 2:
+                    break
+            else:
+                # Overshadowed when the next-ranked resistance has dominance_factor x its OI;
+                # a candidate is settled once its successor is known.
+                if previous is not None and not v >= dominance_factor * previous[0]:
+                    dominant.append(previous)
+                    if len(dominant) == 2:
+                        previous = None
+                        break
+                previous = (v, i)
+        if previous is not None:
+            # The last-ranked candidate has nothing after it to overshadow it.
+            dominant.append(previous)
+        return [side.level(i) for _, i in dominant[:2]]
+
+    # --- ADJACENT OI FILTERING NEAR PRICE ---
+    def neighboring_put_oi_near_price(self, strike, max_pct_away=0.05):
+        side, spot = self.puts, self.spot
+        i = bisect.bisect_left(side.strikes, strike) - 1
+        if i >= 0 and (spot - side.strikes[i]) / spot <= max_pct_away:
+            return side.oi[i]
+        return 0
+
+    def neighboring_call_oi_near_price(self, strike, max_pct_away=0.05):
+        side, spot = self.calls, self.spot
+        i = bisect.bisect_right(side.strikes, strike)
+        if i < len(side) and (side.strikes[i] - spot) / spot <= max_pct_away:
+            return side.oi[i]
+        return 0
+
+    def filter_resistances_by_adjacent_puts_near_price(self, resistances, max_pct_away=0.05):
+        return [(k, v) for k, v in resistances if v > self.neighboring_put_oi_near_price(k, max_pct_away)]
+
+    def filter_supports_by_adjacent_calls_near_price(self, supports, max_pct_away=0.05):
+        return [(k, v) for k, v in supports if v > self.neighboring_call_oi_near_price(k, max_pct_away)]
+
+    # --- FULL PER-SYMBOL PIPELINE ---
+    def compute_levels(self):
+        """Same result as levels.compute_levels() on this ladder's current state."""
+        intraday_resistances = self.atm_preferred_level(kind='call')
+        intraday_supports = self.atm_preferred_level(kind='put')
+        if not intraday_resistances:
+            intraday_resistances = self.filter_resistances_by_adjacent_puts_near_price(
+                self.intraday_resistance_only_highest(max_pct_away=0.04, cluster_ratio=0.7, min_avg_multiplier=1.5),
+                max_pct_away=0.05)
+        if not intraday_supports:
+            intraday_supports = self.filter_supports_by_adjacent_calls_near_price(
+                self.nearest_strong_supports_cluster(n=2, max_pct_away=0.06, cluster_ratio=0.6, min_avg_multiplier=1.5),
+                max_pct_away=0.05)
+        return {
+            "intraday_resistances": intraday_resistances,
+            "intraday_supports": intraday_supports,
+            "positional_resistances": self.positional_resistances_highest(
+                cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5),
+            "positional_supports": self.positional_supports_highest(
+                cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5),
+        }
@@ -0,0 +1,206 @@
+import time
+
+from . import metrics
+
+
+def get_atm_strike(strikes, spot):
+    return min(strikes, key=lambda x: abs(x - spot))
+
+def atm_preferred_level(oi_by_strike, spot, kind='call', dominance_factor=1.2, atm_window=200):
+    """ATM preferred support/resistance filtering."""
+    if not oi_by_strike:
+        return []
+    strikes = sorted(oi_by_strike)
+    atm = get_atm_strike(strikes, spot)
+    atm_oi = oi_by_strike.get(atm, 0)
+    # Neighbors within ±atm_window
+    if kind == 'call':
+        relevant_neighbors = [oi_by_strike.get(s, 0) for s in strikes if atm < s <= atm + atm_window]
+    else:  # 'put'
+        relevant_neighbors = [oi_by_strike.get(s, 0) for s in strikes if atm - atm_window <= s < atm]
+    if all(atm_oi >= dominance_factor * n for n in relevant_neighbors if n > 0) and atm_oi > 0:
+        return [(atm, atm_oi)]
+    return []
+
+# --- INTRADAY HIGHEST RESISTANCE ONLY WITH ADAPTIVE THRESHOLD ---
+def intraday_resistance_only_highest(oi_by_strike, spot, max_pct_away=0.04, cluster_ratio=0.7, min_avg_multiplier=1.5):
+    choices = [(k, v) for k, v in oi_by_strike.items()
+               if k >= spot and (k - spot) / spot <= max_pct_away]
+    if not choices:
+        return []
+    avg_oi = sum(v for _, v in choices) / len(choices)
+    max_oi = max(v for _, v in choices)
+    min_oi_threshold = min(avg_oi * min_avg_multiplier, max_oi)
+    filtered = [(k, v) for k, v in choices if v >= min_oi_threshold and v >= max_oi * cluster_ratio]
+    if filtered:
+        return [max(filtered, key=lambda x: x[1])]
+    return []
+
+# --- INTRADAY STRONG SUPPORTS WITH ADAPTIVE THRESHOLD AND CLUSTER FILTER ---
+def nearest_strong_supports_cluster(oi_by_strike, spot, n=2, max_pct_away=0.04, cluster_ratio=0.6, min_avg_multiplier=1.5):
+    levels = [(k, v) for k, v in oi_by_strike.items()
+              if k <= spot and (spot - k) / spot <= max_pct_away]
+    if not levels:
+        return []
+    avg_oi = sum(v for _, v in levels) / len(levels)
+    max_oi = max(v for _, v in levels)
+    min_oi_threshold = min(avg_oi * min_avg_multiplier, max_oi)
+    filtered = [(k, v) for k, v in levels if v >= min_oi_threshold]
+    if not filtered:
+        return []
+    max_filtered_oi = max(v for _, v in filtered)
+    cluster_levels = [(k, v) for k, v in filtered if v >= max_filtered_oi * cluster_ratio]
+    cluster_levels.sort(key=lambda x: (-x[1], spot - x[0]))
+    return cluster_levels[:n]
+
+# --- POSITIONAL WATCHLIST RESISTANCES (TOP 2 CLUSTERS, WITH DOMINANCE LOGIC) ---
+def positional_resistances_highest(oi_by_strike, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+    choices = [(k, v) for k, v in oi_by_strike.items() if k >= spot]
+    if not choices:
+        return []
+    avg_oi = sum(v for _, v in choices) / len(choices)
+    max_oi = max(v for _, v in choices)
+    min_oi_threshold = min(avg_oi * min_avg_multiplier, max_oi)
+    filtered = [(k, v) for k, v in choices if v >= min_oi_threshold]
+    if not filtered:
+        return []
+    max_filtered_oi = max(v for _, v in filtered)
+    cluster_choices = [(k, v) for k, v in filtered if v >= max_filtered_oi * cluster_ratio]
+    cluster_choices.sort(key=lambda x: (-x[1], x[0]))
+    # Dominance filter: exclude closer strikes overshadowed by farther higher OI strikes
+    if cluster_choices:
+        dominant = []
+        for i, (strike, oi) in enumerate(cluster_choices):
+            overshadowed = False
+            for j in range(i + 1, len(cluster_choices)):
+                farther_strike, farther_oi = cluster_choices[j]
+                if farther_oi >= dominance_factor * oi:
+                    overshadowed = True
+                    break
+            if not overshadowed:
+                dominant.append((strike, oi))
+        if dominant:
+            return dominant[:2]
+        return cluster_choices[:2]
+    return []
+
+# --- POSITIONAL WATCHLIST SUPPORTS (TOP 2 CLUSTERS, WITH DOMINANCE LOGIC) ---
+def positional_supports_highest(oi_by_strike, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5):
+    choices = [(k, v) for k, v in oi_by_strike.items() if k <= spot]
+    if not choices:
+        return []
+    avg_oi = sum(v for _, v in choices) / len(choices)
+    max_oi = max(v for _, v in choices)
+    min_oi_threshold = min(avg_oi * min_avg_multiplier, max_oi)
+    filtered = [(k, v) for k, v in choices if v >= min_oi_threshold]
+    if not filtered:
+        return []
+    max_filtered_oi = max(v for _, v in filtered)
+    cluster_choices = [(k, v) for k, v in filtered if v >= max_filtered_oi * cluster_ratio]
+    cluster_choices.sort(key=lambda x: (-x[1], -x[0]))
+    # Dominance filter: exclude farther supports overshadowed by closer stronger supports
+    if cluster_choices:
+        dominant = []
+        for i, (strike, oi) in enumerate(cluster_choices):
+            overshadowed = False
+            for j in range(i):
+                closer_strike, closer_oi = cluster_choices[j]
+                if closer_oi >= dominance_factor * oi:
+                    overshadowed = True
+                    break
+            if not overshadowed:
+                dominant.append((strike, oi))
+        if dominant:
+            return dominant[:2]
+        return cluster_choices[:2]
+    return []
+
+# --- HELPER FUNCTIONS FOR ADJACENT OI FILTERING NEAR PRICE ---
+def neighboring_put_oi_near_price(put_oi_by_strike, strike, spot, max_pct_away=0.05):
+    candidates = [k for k in put_oi_by_strike.keys() if k < strike and (spot - k) / spot <= max_pct_away]
+    if not candidates:
+        return 0
+    nearest_lower = max(candidates)
+    return put_oi_by_strike.get(nearest_lower, 0)
+
+def neighboring_call_oi_near_price(call_oi_by_strike, strike, spot, max_pct_away=0.05):
+    candidates = [k for k in call_oi_by_strike.keys() if k > strike and (k - spot) / spot <= max_pct_away]
+    if not candidates:
+        return 0
+    nearest_higher = min(candidates)
+    return call_oi_by_strike.get(nearest_higher, 0)
+
+def filter_resistances_by_adjacent_puts_near_price(resistances, put_oi_by_strike, spot, max_pct_away=0.05):
+    filtered = []
+    for strike, oi in resistances:
+        put_adj_oi = neighboring_put_oi_near_price(put_oi_by_strike, strike, spot, max_pct_away)
+        if oi > put_adj_oi:
+            filtered.append((strike, oi))
+    return filtered
+
+def filter_supports_by_adjacent_calls_near_price(supports, call_oi_by_strike, spot, max_pct_away=0.05):
+    filtered = []
+    for strike, oi in supports:
+        call_adj_oi = neighboring_call_oi_near_price(call_oi_by_strike, strike, spot, max_pct_away)
+        if oi > call_adj_oi:
+            filtered.append((strike, oi))
+    return filtered
+
+
+# --- FULL PER-SYMBOL PIPELINE (AS RUN BY THE SCAN) ---
+STAGE_SECONDS = {name: metrics.histogram("oi_stage_seconds", stage=name) for name in (
+    "atm_preferred_level", "intraday_resistance_only_highest", "filter_resistances_by_adjacent_puts_near_price",
+    "nearest_strong_supports_cluster", "filter_supports_by_adjacent_calls_near_price",
+    "positional_resistances_highest", "positional_supports_highest")}
+
+
+def compute_levels(call_oi_by_strike, put_oi_by_strike, spot, atm_window=200):
+    """
+    Intraday and positional support/resistance lists for one symbol's chain.
+
+    atm_window is in price units; expiries.py passes a fixed number of strike steps.
+    """
+    clock = time.perf_counter
+    t0 = clock()
+    intraday_resistances = atm_preferred_level(call_oi_by_strike, spot, kind='call', atm_window=atm_window)
+    intraday_supports = atm_preferred_level(put_oi_by_strike, spot, kind='put', atm_window=atm_window)
+    t1 = clock()
+    STAGE_SECONDS["atm_preferred_level"].observe(t1 - t0)
+
+    # If ATM-based not found, fallback to original filters
+    if not intraday_resistances:
+        t0 = clock()
+        intraday_resistances_raw = intraday_resistance_only_highest(
+            call_oi_by_strike, spot, max_pct_away=0.04, cluster_ratio=0.7, min_avg_multiplier=1.5)
+        t1 = clock()
+        intraday_resistances = filter_resistances_by_adjacent_puts_near_price(
+            intraday_resistances_raw, put_oi_by_strike, spot, max_pct_away=0.05)
+        t2 = clock()
+        STAGE_SECONDS["intraday_resistance_only_highest"].observe(t1 - t0)
+        STAGE_SECONDS["filter_resistances_by_adjacent_puts_near_price"].observe(t2 - t1)
+    if not intraday_supports:
+        t0 = clock()
+        intraday_supports_raw = nearest_strong_supports_cluster(
+            put_oi_by_strike, spot, n=2, max_pct_away=0.06, cluster_ratio=0.6, min_avg_multiplier=1.5)
+        t1 = clock()
+        intraday_supports = filter_supports_by_adjacent_calls_near_price(
+            intraday_supports_raw, call_oi_by_strike, spot, max_pct_away=0.05)
+        t2 = clock()
+        STAGE_SECONDS["nearest_strong_supports_cluster"].observe(t1 - t0)
+        STAGE_SECONDS["filter_supports_by_adjacent_calls_near_price"].observe(t2 - t1)
+
+    t0 = clock()
+    positional_resistances = positional_resistances_highest(
+        call_oi_by_strike, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5)
+    t1 = clock()
+    positional_supports = positional_supports_highest(
+        put_oi_by_strike, spot, cluster_ratio=0.3, min_avg_multiplier=1.2, dominance_factor=1.5)
+    t2 = clock()
+    STAGE_SECONDS["positional_resistances_highest"].observe(t1 - t0)
+    STAGE_SECONDS["positional_supports_highest"].observe(t2 - t1)
+    return {
+        "intraday_resistances": intraday_resistances,
+        "intraday_supports": intraday_supports,
+        "positional_resistances": positional_resistances,
+        "positional_supports": positional_supports,
+    }
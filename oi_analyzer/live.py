@@ -0,0 +1,122 @@
+"""
+Server-sent events for the dashboard: the latest result set, row-level diffs
+between scans, and a fan-out that encodes each event once.
+
+publish(results) diffs the new rows against the previous set by symbol and
+appends one pre-encoded SSE message (changed rows plus removed symbols) to a
+short history. Each connected browser is a generator that waits on a shared
+Condition and writes those bytes as they are, so a viewer costs one wake-up
+and one socket write per scan however many viewers there are. New viewers,
+and ones that reconnect too far behind for the history (EventSource resends
+Last-Event-ID), start from a snapshot event that is also encoded once per
+version.
+
+Events: "snapshot" {"rows": [...], "meta": {...}} and "diff"
+{"upserts": [...], "removed": [...], "meta": {...}}. Non-finite floats are
+sent as null.
+"""
+import json
+import math
+import threading
+from collections import deque
+
+HISTORY = 32
+KEEPALIVE_SEC = 15
+COLUMNS = ("symbol", "stock_price", "support_strike", "support_oi",
+           "resistance_strike", "resistance_oi", "nearest_level")
+RETRY = b"retry: 3000\n\n"
+KEEPALIVE = b": keepalive\n\n"
+
+
+def _clean(value):
+    return None if isinstance(value, float) and not math.isfinite(value) else value
+
+
+def project(results, columns=COLUMNS):
+    """{symbol: row restricted to `columns`} with non-finite floats as None."""
+    return {row["symbol"]: {c: _clean(row.get(c)) for c in columns} for row in results}
+
+
+def diff_rows(old, new):
+    """(upserts, removed symbols) that turn projected rows `old` into `new`."""
+    upserts = [row for symbol, row in new.items() if old.get(symbol) != row]
+    removed = [symbol for symbol in old if symbol not in new]
+    return upserts, removed
+
+
+def encode(event, version, payload):
+    data = json.dumps(payload, separators=(",", ":"), allow_nan=False)
+    return f"id: {version}\nevent: {event}\ndata: {data}\n\n".encode()
+
+
+class Broadcaster:
+    def __init__(self, columns=COLUMNS, history=HISTORY, keepalive=KEEPALIVE_SEC):
+        self.columns = columns
+        self.keepalive = keepalive
+        self.cond = threading.Condition()
+        self.rows = {}
+        self.meta = {}
+        self.version = 0
+        self.events = deque(maxlen=history)  # (version, encoded diff event)
+        self._snapshot = (None, b"")
+        self.clients = 0
+        self.stats = {"published": 0, "diff_bytes": 0, "snapshots_encoded": 0}
+
+    # --- PUBLISHING ---
+    def publish(self, results=None, **meta):
+        """Push a new result set (None keeps the rows) and/or status fields to every viewer."""
+        projected = None if results is None else project(results, self.columns)
+        with self.cond:  # the diff must be against the rows the previous event left behind
+            rows = self.rows if projected is None else projected
+            upserts, removed = diff_rows(self.rows, rows)
+            merged_meta = dict(self.meta, **meta)
+            self.version += 1
+            event = encode("diff", self.version, {"upserts": upserts, "removed": removed, "meta": merged_meta})
+            self.events.append((self.version, event))
+            self.rows = rows
+            self.meta = merged_meta
+            self.stats["published"] += 1
+            self.stats["diff_bytes"] += len(event)
+            self.cond.notify_all()
+        return event
+
+    # --- STREAMING ---
+    def stream(self, last_event_id=None):
+        """Generator of SSE bytes for one viewer; resumes after `last_event_id` when it can."""
+        with self.cond:
+            self.clients += 1
+            try:
+                seen = int(last_event_id)
+            except (TypeError, ValueError):
+                seen = None
+            pending, seen = self._since(seen)
+        try:
+            yield RETRY
+            while True:
+                for chunk in pending:
+                    yield chunk
+                with self.cond:
+                    if self.version == seen:
+                        self.cond.wait(self.keepalive)
+                    pending, seen = self._since(seen)
+                if not pending:
+                    yield KEEPALIVE
+        finally:
+            with self.cond:
+                self.clients -= 1
+
+    def _since(self, seen):
+        """(events a viewer at version `seen` is missing, new version); call with the lock held."""
+        if seen == self.version:
+            return [], seen
+        if seen is not None and seen < self.version and self.events and self.events[0][0] <= seen + 1:
+            return [event for version, event in self.events if version > seen], self.version
+        return [self._snapshot_event()], self.version
+
+    def _snapshot_event(self):
+        version, event = self._snapshot
+        if version != self.version:
+            event = encode("snapshot", self.version, {"rows": list(self.rows.values()), "meta": self.meta})
+            self._snapshot = (self.version, event)
+            self.stats["snapshots_encoded"] += 1
+        return event
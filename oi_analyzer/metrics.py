@@ -0,0 +1,202 @@
+"""
+In-process timing histograms, counters and gauges in the Prometheus text
+format, without a client library.
+
+    with metrics.timer("oi_stage_seconds", stage="parse"):
+        ...
+    metrics.inc("oi_api_errors_total", code=500)
+    text = metrics.render()
+
+Recording is a perf_counter() pair, a bisect and a locked increment; the
+per-level-function timings keep histogram() handles to skip the label lookup. profile_call() runs one
+function under cProfile (or pyinstrument, if installed) and dumps the result.
+"""
+import bisect
+import threading
+import time
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "oi_stage_seconds": ("histogram", "Time spent per pipeline stage (fetch, parse, level functions, output)."),
+    "oi_symbol_seconds": ("histogram", "Fetch-to-row time per symbol."),
+    "oi_scan_seconds": ("histogram", "Wall time of a full scan."),
+    "oi_symbol_last_seconds": ("gauge", "Fetch-to-row time of each symbol in its latest scan."),
+    "oi_api_requests_total": ("counter", "Option-chain API calls, including retries."),
+    "oi_api_errors_total": ("counter", "Option-chain API calls that returned an error, by code."),
+    "oi_api_chain_rows_total": ("counter", "Option-chain rows (underlying plus one per strike and side) downloaded."),
+    "oi_api_throttled_total": ("counter", "Option-chain API calls rejected by the rate limit."),
+    "oi_quotes_errors_total": ("counter", "Quotes API calls (price alerts) that returned an error, by code."),
+    "oi_quotes_throttled_total": ("counter", "Quotes API calls (price alerts) rejected by the rate limit."),
+    "oi_symbols_skipped_total": ("counter", "Symbols dropped from a scan for lack of an underlying price."),
+    "oi_live_viewers": ("gauge", "Dashboard viewers connected to /events."),
+    "oi_alerts_total": ("counter", "Level-proximity alerts fired, by level kind."),
+    "oi_alert_sink_errors_total": ("counter", "Alert deliveries that raised, by sink."),
+}
+
+
+def _key(name, labels):
+    """Registry key for name+labels. Label values are stored as strings, so code=500 and
+    code="500" are one series (and keys stay sortable for render())."""
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def histogram(self, name, **labels):
+        """The histogram for name+labels; hot paths can keep the handle and call observe()."""
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def timer(self, name, **labels):
+        return Timer(self.histogram(name, **labels))
+
+    def reset(self):
+        with self.lock:
+            for histogram in self.histograms.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum = 0.0
+            self.counters.clear()
+            self.gauges.clear()
+
+    def summary(self, name="oi_stage_seconds"):
+        """(labels, count, total seconds) per label set of one histogram, slowest first."""
+        with self.lock:
+            rows = [(dict(labels), sum(h.counts), h.sum) for (n, labels), h in self.histograms.items()
+                    if n == name and h.sum]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self.lock:
+            histograms = {k: (list(h.counts), h.sum, h.buckets) for k, h in list(self.histograms.items())}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, (kind, name.replace('_', ' ')))[1]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (counts, total, buckets) in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for (name, labels), value in sorted(values.items()):
+                header(name, kind)
+                lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Timer:
+    __slots__ = ("histogram", "start", "elapsed")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.elapsed)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+# --- DEFAULT REGISTRY ---
+REGISTRY = Registry()
+histogram = REGISTRY.histogram
+observe = REGISTRY.observe
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set
+timer = REGISTRY.timer
+summary = REGISTRY.summary
+render = REGISTRY.render
+
+
+# --- PROFILING ---
+def profile_call(fn, path, top=25):
+    """
+    Run fn() once under a profiler and write the result to `path`.
+
+    A .html path uses pyinstrument (optional dependency); anything else uses
+    cProfile and writes pstats data readable with `python -m pstats path`.
+    Returns fn()'s result.
+    """
+    if path.endswith(".html"):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("HTML profiles need pyinstrument (pip install pyinstrument); use a .prof path instead")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return fn()
+        finally:
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+            print(f"Wrote pyinstrument profile to {path}")
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        profiler.dump_stats(path)
+        pstats.Stats(path).sort_stats("cumulative").print_stats(top)
+        print(f"Wrote cProfile stats to {path}")
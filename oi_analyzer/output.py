@@ -0,0 +1,149 @@
+"""
+Reading and writing result tables and the symbol list.
+
+The format follows the file extension:
+
+    .csv              stdlib csv, no heavy imports (the default)
+    .parquet          pyarrow (optional dependency)
+    .arrow, .feather  Arrow IPC file, pyarrow (optional dependency)
+    .xlsx             pandas + openpyxl, for humans only
+
+Writes go to a temporary file in the target directory and are moved into
+place with os.replace(), so readers never see a half-written file.
+"""
+import csv
+import os
+import tempfile
+import threading
+
+SYMBOL_COLUMN = "symbol"
+
+
+# --- WRITERS ---
+def _write_csv(rows, path):
+    columns = list(rows[0]) if rows else [SYMBOL_COLUMN]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _arrow_table(rows):
+    pa = _pyarrow()
+    return pa.Table.from_pylist(rows) if rows else pa.table({SYMBOL_COLUMN: pa.array([], pa.string())})
+
+
+def _write_parquet(rows, path):
+    _pyarrow()
+    import pyarrow.parquet as pq
+    pq.write_table(_arrow_table(rows), path)
+
+
+def _write_arrow(rows, path):
+    pa = _pyarrow()
+    table = _arrow_table(rows)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _write_excel(rows, path):
+    import pandas as pd
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+# --- READERS ---
+def _number(value):
+    if value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return [{k: (v if k == SYMBOL_COLUMN else _number(v)) for k, v in row.items()} for row in csv.DictReader(f)]
+
+
+def _read_parquet(path):
+    _pyarrow()
+    import pyarrow.parquet as pq
+    return pq.read_table(path).to_pylist()
+
+
+def _read_arrow(path):
+    pa = _pyarrow()
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pylist()
+
+
+def _read_excel(path):
+    import pandas as pd
+    df = pd.read_excel(path)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet/Arrow output needs pyarrow (pip install pyarrow); use a .csv path instead")
+    return pyarrow
+
+
+FORMATS = {
+    ".csv": (_write_csv, _read_csv),
+    ".parquet": (_write_parquet, _read_parquet),
+    ".arrow": (_write_arrow, _read_arrow),
+    ".feather": (_write_arrow, _read_arrow),
+    ".xlsx": (_write_excel, _read_excel),
+}
+
+
+def _format(filepath):
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported table format {ext!r} for {filepath}; use one of {', '.join(FORMATS)}")
+    return FORMATS[ext]
+
+
+# --- PUBLIC API ---
+def write_results(rows, filepath):
+    """Atomically write a list of row dicts in the format given by the extension."""
+    write, _ = _format(filepath)
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(filepath)[1])
+    os.close(fd)
+    try:
+        write(rows, tmp)
+        os.replace(tmp, filepath)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def read_results(filepath):
+    """List of row dicts from a file written by write_results() (or any table with a header)."""
+    _, read = _format(filepath)
+    return read(filepath)
+
+
+_symbols_cache = {}
+_symbols_lock = threading.Lock()
+
+
+def load_symbols(filepath):
+    """The `symbol` column of a table, re-parsed only when the file's mtime or size changes."""
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _symbols_lock:
+        cached = _symbols_cache.get(path)
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+    symbols = [row[SYMBOL_COLUMN] for row in read_results(path)]
+    with _symbols_lock:
+        _symbols_cache[path] = (version, symbols)
+    return list(symbols)
@@ -0,0 +1,135 @@
+"""
+Option chains as strike-aligned NumPy arrays.
+
+parse_chain() sorts the legs of optionsChain into CE and PE lists and picks
+up the underlying's price, then converts fields to NumPy a column at a time
+with np.fromiter over map(itemgetter(...)). The result is a Chain: the spot
+price plus contiguous arrays aligned on an ascending strike array, with
+masks marking the strikes where a side has OI. Fyers lists CE and PE at the
+same strikes in ascending order, so the common case needs no sort or merge.
+
+This is the form buildup.py and store.py work on, since they need change in
+OI and volume per strike as well. Scans don't use it: for the OI dicts that
+levels.py takes, engine.parse_option_chain() is faster (see
+benchmarks/bench_parser.py).
+
+Strikes and OI are converted up front. Change in OI, volume and LTP are
+converted the first time they are read, so a caller that only needs OI does
+not pay for them.
+
+Missing values: OI, change in OI and volume are 0 (with the mask False for
+missing OI), LTP is NaN.
+"""
+from operator import itemgetter
+
+import numpy as np
+
+from .batch import StrikeLadder
+
+_GETTERS = {}
+
+
+def _column(legs, key):
+    """float64 array of one field over a list of leg dicts; missing or null values become NaN."""
+    getter = _GETTERS.get(key)
+    if getter is None:
+        getter = _GETTERS[key] = itemgetter(key)
+    try:
+        return np.fromiter(map(getter, legs), np.float64, len(legs))
+    except (KeyError, TypeError):
+        return np.array([leg.get(key) for leg in legs], dtype=np.float64)
+
+
+def _lazy(kind, key, fill):
+    return property(lambda self: self.field(kind, key, fill))
+
+
+class Chain:
+    """One option chain as strike-aligned arrays."""
+
+    ce_oich = _lazy("CE", "oich", 0.0)
+    pe_oich = _lazy("PE", "oich", 0.0)
+    ce_volume = _lazy("CE", "volume", 0.0)
+    pe_volume = _lazy("PE", "volume", 0.0)
+    ce_ltp = _lazy("CE", "ltp", np.nan)
+    pe_ltp = _lazy("PE", "ltp", np.nan)
+
+    def __init__(self, spot, strikes, legs, positions):
+        self.spot = spot
+        self.strikes = strikes
+        self.legs = legs            # {"CE": [leg dicts], "PE": [...]}
+        self.positions = positions  # {"CE": strike index per leg, or None when legs line up with strikes}
+        self._fields = {}
+        self.ce_oi, self.ce_mask = self._oi("CE")
+        self.pe_oi, self.pe_mask = self._oi("PE")
+
+    def field(self, kind, key, fill=0.0):
+        """Any numeric leg field ("oich", "volume", "ltp", ...) for kind "CE"/"PE", aligned on strikes."""
+        cache_key = (kind, key)
+        if cache_key not in self._fields:
+            self._fields[cache_key] = self._aligned(kind, _column(self.legs[kind], key), fill)
+        return self._fields[cache_key]
+
+    def ladder(self):
+        """StrikeLadder sharing this chain's arrays, for batch.pack_ladders()."""
+        return StrikeLadder(self.strikes, self.ce_oi, self.pe_oi, self.ce_mask, self.pe_mask)
+
+    def oi_dicts(self):
+        """(call_oi_by_strike, put_oi_by_strike) in strike order, for the functions in levels.py."""
+        calls = dict(zip(self.strikes[self.ce_mask].tolist(), self.ce_oi[self.ce_mask].tolist()))
+        puts = dict(zip(self.strikes[self.pe_mask].tolist(), self.pe_oi[self.pe_mask].tolist()))
+        return calls, puts
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def _aligned(self, kind, values, fill):
+        positions = self.positions[kind]
+        if positions is None:
+            out = values
+        else:
+            out = np.full(len(self.strikes), np.nan)
+            out[positions] = values
+        if fill is not np.nan:
+            out[np.isnan(out)] = fill
+        return out
+
+    def _oi(self, kind):
+        oi = self._aligned(kind, _column(self.legs[kind], "oi"), np.nan)
+        mask = ~np.isnan(oi)
+        oi[~mask] = 0
+        # Keep integer OI as int64 so levels come back as ints, like the dict path.
+        oi_int = oi.astype(np.int64)
+        return (oi_int if np.array_equal(oi_int, oi) else oi), mask
+
+
+def parse_chain(response):
+    """Chain from an optionchain response dict; spot is None when the underlying row is missing."""
+    spot = None
+    ce, pe = [], []
+    for item in response.get("data", {}).get("optionsChain", []):
+        option_type = item.get("option_type")
+        if option_type == "CE":
+            ce.append(item)
+        elif option_type == "PE":
+            pe.append(item)
+        elif spot is None and not option_type and item.get("strike_price") == -1:
+            spot = item.get("ltp")
+    ce_strikes = _column(ce, "strike_price")
+    pe_strikes = _column(pe, "strike_price")
+    if (len(ce_strikes) == len(pe_strikes) and (not len(ce_strikes) or ce_strikes[0] != -1)
+            and np.array_equal(ce_strikes, pe_strikes) and (ce_strikes[1:] > ce_strikes[:-1]).all()):
+        return Chain(spot, ce_strikes, {"CE": ce, "PE": pe}, {"CE": None, "PE": None})
+    # Gaps, unsorted or repeated strikes: drop strike-less legs and merge onto the union of
+    # strikes (a repeated strike keeps its last leg, as the dict path does).
+    ce_ok, pe_ok = _valid(ce_strikes), _valid(pe_strikes)
+    ce = [leg for leg, ok in zip(ce, ce_ok) if ok]
+    pe = [leg for leg, ok in zip(pe, pe_ok) if ok]
+    ce_strikes, pe_strikes = ce_strikes[ce_ok], pe_strikes[pe_ok]
+    strikes = np.union1d(ce_strikes, pe_strikes)
+    positions = {"CE": np.searchsorted(strikes, ce_strikes), "PE": np.searchsorted(strikes, pe_strikes)}
+    return Chain(spot, strikes, {"CE": ce, "PE": pe}, positions)
+
+
+def _valid(strikes):
+    return ~np.isnan(strikes) & (strikes != -1)
@@ -0,0 +1,78 @@
+"""
+One scan of the symbol list, saved as a results table (oi-analyzer scan).
+"""
+import argparse
+import os
+
+from .engine import OUTPUT_FILE
+
+parser = argparse.ArgumentParser(prog="oi-analyzer scan",
+                                 description="Scan option chains for stocks near OI support/resistance.")
+parser.add_argument("output", nargs="?", default=OUTPUT_FILE,
+                    help="results file; .csv (default), .parquet, .arrow or .xlsx")
+parser.add_argument("--profile", metavar="PATH",
+                    help="profile the scan: PATH.prof for cProfile, PATH.html for pyinstrument")
+parser.add_argument("--expiries", action="store_true",
+                    help="fetch near/next/monthly expiries with strike windows sized to each symbol's spacing")
+parser.add_argument("--buildup", action="store_true",
+                    help="add change-in-OI, buildup and level-shift columns against the previous run")
+parser.add_argument("--tokens-dir", metavar="DIR",
+                    help="shard the scan across one worker process per token file in DIR")
+parser.add_argument("--timings", action="store_true", help="print per-stage timings after the scan")
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    from .engine import load_symbols, run_scan, save_results
+    from .metrics import profile_call, summary
+    symbols = load_symbols()
+
+    if args.tokens_dir:
+        # --- SHARDED SCAN ---
+        # One process per Fyers app; options that keep per-symbol state stay single-process
+        if args.expiries or args.buildup:
+            parser.error("--tokens-dir can't be combined with --expiries or --buildup")
+        from .coordinator import ShardedScanner, accounts_from
+        scanner = ShardedScanner(accounts_from(args.tokens_dir))
+        if args.profile:
+            results_sorted = profile_call(lambda: scanner.scan(symbols), args.profile)
+        else:
+            results_sorted = scanner.scan(symbols)
+    else:
+        from .buildup import BuildupTracker
+        from .expiries import ExpiryPlanner
+        from .output import read_results
+        from .store import SnapshotStore
+        from .tokens import TokenManager
+
+        # --- TOKENS ---
+        # Validates the saved token, or renews it with the refresh_token grant, in-process
+        fyers = TokenManager("fyers_tokens.json").client()
+
+        # --- MAIN CODE ---
+        store = SnapshotStore()
+        planner = ExpiryPlanner() if args.expiries else None
+        tracker = None
+        if args.buildup:
+            # The previous run is whatever the store and the last results file hold
+            tracker = BuildupTracker()
+            tracker.seed(store, symbols, read_results(args.output) if os.path.exists(args.output) else ())
+        if args.profile:
+            results_sorted = profile_call(
+                lambda: run_scan(fyers, symbols, store=store, expiries=planner, buildup=tracker), args.profile)
+        else:
+            results_sorted = run_scan(fyers, symbols, store=store, expiries=planner, buildup=tracker)
+
+    # Save results sorted by nearest level
+    output_filename = args.output
+    save_results(results_sorted, output_filename)
+    print(f"Saved stocks near intraday support/resistance to {output_filename}")
+
+    if args.timings:
+        for labels, count, total in summary():
+            print(f"{labels['stage']:48s} {count:6d} calls  {total * 1e3:9.1f} ms  {total / count * 1e6:9.1f} us/call")
+
+
+# Worker processes re-import the main module (spawn), so the scan only runs when executed directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Append-only columnar store for raw option-chain snapshots.
+
+Layout, partitioned by (local) date and symbol:
+
+    oi_store/2025-01-31/NSE_SBIN-EQ/
+        ts.f8 strike.f8 ce_oi.i8 pe_oi.i8 ce_ltp.f8 pe_ltp.f8   one row per strike per snapshot
+        snap_ts.f8 snap_row.i8 snap_len.i8 snap_spot.f8         one row per snapshot
+
+Every file is a flat little-endian array, so readers np.memmap them without
+copying or parsing and only the pages a query touches are read. Rows are
+appended in time order, so time ranges are a binary search on ts. The
+snapshot index is written after the row columns and defines what readers
+see, so a crash mid-append never exposes a partial snapshot.
+
+Missing values: OI is -1 and LTP is NaN when a strike has no CE (or PE) row.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from .parser import parse_chain
+
+STORE_DIR = "oi_store"
+
+ROW_COLUMNS = {"ts": "<f8", "strike": "<f8", "ce_oi": "<i8", "pe_oi": "<i8", "ce_ltp": "<f8", "pe_ltp": "<f8"}
+SNAP_COLUMNS = {"snap_ts": "<f8", "snap_row": "<i8", "snap_len": "<i8", "snap_spot": "<f8"}
+
+
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def symbol_dir(symbol):
+    return symbol.replace(":", "_").replace("/", "_")
+
+
+def chain_columns(response):
+    """(spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp) arrays from an optionchain response."""
+    chain = parse_chain(response)
+    ce_oi = np.where(chain.ce_mask, chain.ce_oi, -1).astype("<i8")
+    pe_oi = np.where(chain.pe_mask, chain.pe_oi, -1).astype("<i8")
+    return chain.spot, chain.strikes, ce_oi, pe_oi, chain.ce_ltp, chain.pe_ltp
+
+
+def _read(path, dtype, count=None):
+    """Zero-copy view of a column file (first `count` items), or an empty array."""
+    itemsize = np.dtype(dtype).itemsize
+    available = os.path.getsize(path) // itemsize if os.path.exists(path) else 0
+    count = available if count is None else min(count, available)
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class SnapshotStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.last_response = {}
+
+    def path(self, day, symbol):
+        return os.path.join(self.root, day, symbol_dir(symbol))
+
+    # --- WRITING ---
+    def append(self, symbol, response, ts=None):
+        """Append one optionchain response; returns rows written (0 for errors/repeats)."""
+        if response.get("code") != 200 or self.last_response.get(symbol) is response:
+            # Cache hits hand back the same response object; don't store it twice.
+            return 0
+        self.last_response[symbol] = response
+        spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp = chain_columns(response)
+        if spot is None or not len(strikes):
+            return 0
+        return self.append_arrays(symbol, time.time() if ts is None else ts, spot,
+                                  strikes, ce_oi, pe_oi, ce_ltp, pe_ltp)
+
+    def append_arrays(self, symbol, ts, spot, strikes, ce_oi, pe_oi, ce_ltp, pe_ltp):
+        n = len(strikes)
+        columns = {
+            "ts": np.full(n, ts), "strike": strikes, "ce_oi": ce_oi, "pe_oi": pe_oi,
+            "ce_ltp": ce_ltp, "pe_ltp": pe_ltp,
+        }
+        directory = self.path(day_of(ts), symbol)
+        with self.lock:
+            os.makedirs(directory, exist_ok=True)
+            row = self._visible_rows(directory)
+            for name, dtype in ROW_COLUMNS.items():
+                self._write_at(os.path.join(directory, f"{name}.{dtype[1:]}"), row, dtype, columns[name])
+            snapshots = len(_read(os.path.join(directory, "snap_ts.f8"), "<f8"))
+            snap = {"snap_ts": [ts], "snap_row": [row], "snap_len": [n], "snap_spot": [spot]}
+            # snap_ts goes last: it is what makes the snapshot visible to readers.
+            for name in ("snap_row", "snap_len", "snap_spot", "snap_ts"):
+                dtype = SNAP_COLUMNS[name]
+                self._write_at(os.path.join(directory, f"{name}.{dtype[1:]}"), snapshots, dtype, snap[name])
+        return n
+
+    @staticmethod
+    def _write_at(path, index, dtype, values):
+        # Writing at the committed length (not blindly appending) overwrites any
+        # torn tail left by an interrupted append.
+        data = np.ascontiguousarray(values, dtype=dtype)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(index * data.itemsize)
+            f.write(data.tobytes())
+            f.truncate()
+
+    @staticmethod
+    def _visible_rows(directory):
+        snap_ts = _read(os.path.join(directory, "snap_ts.f8"), "<f8")
+        if not len(snap_ts):
+            return 0
+        n = len(snap_ts)
+        last_row = _read(os.path.join(directory, "snap_row.i8"), "<i8", n)[-1]
+        last_len = _read(os.path.join(directory, "snap_len.i8"), "<i8", n)[-1]
+        return int(last_row + last_len)
+
+    # --- READING ---
+    def days(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def symbols(self, day):
+        directory = os.path.join(self.root, day)
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def snapshots(self, symbol, day):
+        """Snapshot index: dict of snap_ts/snap_row/snap_len/snap_spot memmaps."""
+        directory = self.path(day, symbol)
+        n = len(_read(os.path.join(directory, "snap_ts.f8"), "<f8"))
+        return {name: _read(os.path.join(directory, f"{name}.{dtype[1:]}"), dtype, n)
+                for name, dtype in SNAP_COLUMNS.items()}
+
+    def columns(self, symbol, day):
+        """Row columns for one symbol-day as zero-copy memmaps (committed rows only)."""
+        directory = self.path(day, symbol)
+        rows = self._visible_rows(directory)
+        return {name: _read(os.path.join(directory, f"{name}.{dtype[1:]}"), dtype, rows)
+                for name, dtype in ROW_COLUMNS.items()}
+
+    def load_day(self, day):
+        """Every symbol's row columns for `day`, memory-mapped; nothing is read until used."""
+        return {name: self.columns(name, day) for name in self.symbols(day)}
+
+    def snapshot(self, symbol, day, i):
+        """(ts, spot, {column: array}) for the i-th snapshot of a symbol-day."""
+        index = self.snapshots(symbol, day)
+        row, length = int(index["snap_row"][i]), int(index["snap_len"][i])
+        cols = self.columns(symbol, day)
+        return (float(index["snap_ts"][i]), float(index["snap_spot"][i]),
+                {name: col[row:row + length] for name, col in cols.items() if name != "ts"})
+
+    def oi_at_strike(self, symbol, strike, start, end=None, option_type="CE"):
+        """(timestamps, OI) for one strike of `symbol` with start <= ts < end."""
+        end = time.time() + 1 if end is None else end
+        ts_parts, oi_parts = [], []
+        day = day_of(start)
+        while day <= day_of(end):
+            cols = self.columns(symbol, day)
+            ts = cols["ts"]
+            lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "left")
+            if lo < hi:
+                hit = np.flatnonzero(cols["strike"][lo:hi] == strike) + lo
+                ts_parts.append(ts[hit])
+                oi_parts.append(cols["ce_oi" if option_type == "CE" else "pe_oi"][hit])
+            day = day_of(time.mktime(time.strptime(day, "%Y-%m-%d")) + 36 * 3600)
+        if not ts_parts:
+            return np.empty(0, "<f8"), np.empty(0, "<i8")
+        return np.concatenate(ts_parts), np.concatenate(oi_parts)
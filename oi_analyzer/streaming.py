@@ -0,0 +1,244 @@
+"""
+Streaming OI mode: keep per-symbol OI state current from ticks and only
+recompute levels when a tick can actually move them.
+
+Each underlying is seeded from one optionchain snapshot, which also tells us
+the CE/PE option symbols to subscribe to. After that:
+
+* an option tick updates the strike's OI in the symbol's IncrementalLadder;
+  levels are recomputed only when the strike lies within `max_pct_away` of
+  spot, within ATM_WINDOW of its side's ATM strike, or is new to its side
+  (ticks further out are kept and picked up by the next recompute);
+* an underlying tick updates spot and the row's distance columns; levels
+  are recomputed only when the move changes something compute_levels()
+  reads from spot: which strikes are at/above/below it, either side's ATM
+  strike, or which strikes fall inside one of its %-windows.
+
+Ticks are plain dicts: {"symbol": ..., "ltp": ..., "oi": ...}.
+"""
+import argparse
+import bisect
+import json
+import threading
+
+from .engine import format_row, parse_option_chain
+from .incremental import IncrementalLadder
+
+# Widest window any level function looks at (intraday supports use 6%).
+WINDOW_PCT = 0.06
+# The %-windows compute_levels() puts around spot, per side: intraday resistance
+# and calls adjacent to a support above it; intraday supports and puts adjacent
+# to a resistance below it.
+CALL_WINDOWS = (0.04, 0.05)
+PUT_WINDOWS = (0.06, 0.05)
+# atm_preferred_level()'s neighbour window, as compute_levels() calls it.
+ATM_WINDOW = 200
+
+
+def atm_index(strikes, spot):
+    """Index of the strike nearest spot, the lower one on ties (as levels.get_atm_strike)."""
+    i = bisect.bisect_left(strikes, spot)
+    if i == len(strikes) or (i > 0 and abs(strikes[i - 1] - spot) <= abs(strikes[i] - spot)):
+        i -= 1
+    return i
+
+
+class SymbolState:
+    def __init__(self, symbol, spot, call_oi_by_strike, put_oi_by_strike):
+        self.symbol = symbol
+        self.spot = spot
+        self.ladder = IncrementalLadder(call_oi_by_strike, put_oi_by_strike, spot)
+        self.key = None
+        self.row = None
+
+    def spot_key(self, spot):
+        """
+        Everything compute_levels() reads from spot, per side: where spot falls
+        among the strikes, the ATM strike and the edge of each %-window (found
+        with the level functions' own predicates). Spots with equal keys get
+        equal levels, so only a change of key needs a recompute.
+        """
+        key = []
+        for side, windows in ((self.ladder.calls, CALL_WINDOWS), (self.ladder.puts, PUT_WINDOWS)):
+            strikes = side.strikes
+            key += [bisect.bisect_left(strikes, spot), bisect.bisect_right(strikes, spot), atm_index(strikes, spot)]
+            for pct in windows:
+                if side is self.ladder.calls:
+                    key.append(side.first_where(lambda k: not (k - spot) / spot <= pct))
+                else:
+                    key.append(side.first_where(lambda k: (spot - k) / spot <= pct))
+        return tuple(key)
+
+
+class OIStreamer:
+    def __init__(self, max_pct_away=WINDOW_PCT, on_update=None):
+        self.max_pct_away = max_pct_away
+        self.on_update = on_update
+        self.states = {}
+        self.options = {}  # option symbol -> (underlying, strike, "CE"/"PE")
+        self.lock = threading.Lock()
+        self.stats = {"ticks": 0, "recomputes": 0, "skipped": 0, "unknown": 0}
+
+    # --- SEEDING ---
+    def seed(self, symbol, response):
+        """(Re)load a symbol from an optionchain snapshot; returns its row or None."""
+        spot, call_oi_by_strike, put_oi_by_strike = parse_option_chain(response)
+        if spot is None:
+            return None
+        with self.lock:
+            state = self.states[symbol] = SymbolState(symbol, spot, call_oi_by_strike, put_oi_by_strike)
+            for option in response.get("data", {}).get("optionsChain", []):
+                option_type = option.get("option_type")
+                if option_type in ("CE", "PE") and option.get("symbol"):
+                    self.options[option["symbol"]] = (symbol, float(option["strike_price"]), option_type)
+            return self._recompute(state)
+
+    def subscriptions(self):
+        """Underlyings plus every CE/PE symbol discovered by the seeding snapshots."""
+        return list(self.states) + list(self.options)
+
+    # --- TICKS ---
+    def on_tick(self, tick):
+        """Apply one tick; returns the symbol's new row when its levels were recomputed."""
+        symbol = tick.get("symbol")
+        with self.lock:
+            self.stats["ticks"] += 1
+            if symbol in self.states:
+                return self._on_spot(self.states[symbol], tick.get("ltp"))
+            if symbol in self.options:
+                underlying, strike, option_type = self.options[symbol]
+                return self._on_oi(self.states[underlying], strike, option_type, tick.get("oi"))
+            self.stats["unknown"] += 1
+            return None
+
+    def _on_spot(self, state, ltp):
+        if ltp is None or ltp == state.spot:
+            self.stats["skipped"] += 1
+            return None
+        state.spot = ltp
+        state.ladder.set_spot(ltp)
+        if state.spot_key(ltp) != state.key:
+            return self._recompute(state)
+        # Same strike interval, ATM strikes and windows: the levels stand, only the distances move.
+        row = state.row
+        row["stock_price"] = ltp
+        for side in ("support", "resistance"):
+            strike = row[f"{side}_strike"]
+            row[f"{side}_diff"] = abs(ltp - strike) if strike is not None else float('inf')
+        row["nearest_level"] = min(row["support_diff"], row["resistance_diff"])
+        self.stats["skipped"] += 1
+        return None
+
+    def _on_oi(self, state, strike, option_type, oi):
+        side = state.ladder.calls if option_type == "CE" else state.ladder.puts
+        i = side.index.get(strike)
+        if oi is None or (i is not None and side.oi[i] == oi):
+            self.stats["skipped"] += 1
+            return None
+        if i is not None:
+            # Far strikes only matter as neighbours of the ATM strike
+            atm = side.strikes[atm_index(side.strikes, state.spot)]
+            if option_type == "CE":
+                near_atm = atm <= strike <= atm + ATM_WINDOW
+            else:
+                near_atm = atm - ATM_WINDOW <= strike <= atm
+            if abs(strike - state.spot) / state.spot > self.max_pct_away and not near_atm:
+                state.ladder.set_oi(strike, option_type, oi)
+                self.stats["skipped"] += 1
+                return None
+        # A strike new to its side can become the ATM strike or move a window edge
+        state.ladder.set_oi(strike, option_type, oi)
+        return self._recompute(state)
+
+    def _recompute(self, state):
+        state.key = state.spot_key(state.spot)
+        state.row = format_row(state.symbol, state.spot, state.ladder.compute_levels())
+        self.stats["recomputes"] += 1
+        if self.on_update is not None:
+            self.on_update(state.symbol, state.row)
+        return state.row
+
+    def rows(self):
+        """Current rows for every symbol, sorted by nearest level like run_scan()."""
+        with self.lock:
+            rows = [dict(s.row) for s in self.states.values() if s.row is not None]
+        return sorted(rows, key=lambda x: x["nearest_level"])
+
+
+# --- TICK SOURCES ---
+def stream_websocket(url, streamer, on_open=None):
+    """
+    Feed JSON ticks from a websocket into `streamer` until the server closes.
+
+    Each message is one tick dict or a list of them. On connect the client
+    sends {"subscribe": [...]} with the streamer's subscription list.
+    """
+    import websocket
+
+    def handle_open(ws):
+        ws.send(json.dumps({"subscribe": streamer.subscriptions()}))
+        if on_open is not None:
+            on_open(ws)
+
+    def handle_message(ws, message):
+        payload = json.loads(message)
+        for tick in payload if isinstance(payload, list) else [payload]:
+            streamer.on_tick(tick)
+
+    app = websocket.WebSocketApp(url, on_open=handle_open, on_message=handle_message)
+    app.run_forever()
+
+
+def stream_fyers_spot(access_token, streamer, symbols=None):
+    """
+    Feed underlying LTP ticks from the Fyers data socket.
+
+    The SDK strips OI from SymbolUpdate messages, so this source only moves
+    spot; OI changes have to come from a JSON tick feed or a periodic reseed.
+    `symbols` defaults to the streamer's underlyings.
+    """
+    from fyers_apiv3.FyersWebsocket import data_ws
+
+    def on_connect():
+        socket.subscribe(symbols=list(streamer.states) if symbols is None else list(symbols),
+                         data_type="SymbolUpdate")
+        socket.keep_running()
+
+    socket = data_ws.FyersDataSocket(
+        access_token=access_token, litemode=True, write_to_file=False, reconnect=True,
+        on_connect=on_connect, on_message=streamer.on_tick)
+    socket.connect()
+    return socket
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="oi-analyzer stream",
+                                     description="Stream OI ticks and print level changes.")
+    parser.add_argument("--ws", required=True, help="JSON tick websocket URL")
+    parser.add_argument("--fyers-spot", action="store_true", help="also take underlying LTP from the Fyers data socket")
+    parser.add_argument("--tokens", default="fyers_tokens.json")
+    args = parser.parse_args(argv)
+
+    from .engine import load_symbols
+    from .fetcher import fetch_option_chains
+    from .tokens import TokenManager
+
+    token_manager = TokenManager(args.tokens)
+    fyers = token_manager.client()
+
+    def print_update(symbol, row):
+        print(f"{symbol}: support {row['support_strike']} resistance {row['resistance_strike']} "
+              f"@ {row['stock_price']}")
+
+    streamer = OIStreamer(on_update=print_update)
+    symbols = load_symbols()
+    for symbol, response in zip(symbols, fetch_option_chains(fyers, symbols)):
+        streamer.seed(symbol, response)
+    if args.fyers_spot:
+        client_id, access_token = token_manager.access_token()
+        stream_fyers_spot(f"{client_id}:{access_token}", streamer)
+    stream_websocket(args.ws, streamer)
+
+
+if __name__ == "__main__":
+    main()
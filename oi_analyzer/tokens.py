@@ -0,0 +1,251 @@
+"""
+Shared access-token handling for the scanner, web view and streaming mode.
+
+TokenManager validates a token once (one get_profile call) and then trusts
+it until the expiry in its JWT `exp` claim. Expired or rejected tokens are
+renewed in-process with the refresh_token grant; no login subprocess.
+Concurrent callers in one process share a single validation/refresh, and a
+lock file next to fyers_tokens.json makes other processes wait for that
+refresh and pick up the new token instead of starting their own.
+
+All API traffic goes through one FyersModel whose requests.Session keeps a
+pool of keep-alive connections sized for the scan's concurrency.
+
+fyers_tokens.json keys: client_id, access_token, refresh_token and
+optionally pin (or FYERS_PIN in the environment). The app secret the
+refresh needs is not stored there: it comes from TokenManager's
+client_secret argument or FYERS_SECRET_KEY in the environment (a
+client_secret left in the file by older versions is still honoured).
+The file is written owner-only (0600) through write_private_json().
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+TOKENS_FILE = "fyers_tokens.json"
+REFRESH_ENDPOINT = "/validate-refresh-token"
+EXPIRY_SKEW_SEC = 60         # renew this long before `exp`
+UNKNOWN_EXPIRY_TTL_SEC = 300  # re-validate tokens without a readable `exp` this often
+POOL_SIZE = 16
+HTTP_TIMEOUT_SEC = 5         # per auth call; two of them fit well inside a lock's stale_after
+
+
+class TokenError(Exception):
+    pass
+
+
+def token_expiry(access_token):
+    """The `exp` claim (epoch seconds) of a JWT access token, or None."""
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def write_private_json(path, data):
+    """Atomically replace `path` with `data` as JSON, readable by the owner only."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")  # created 0600
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class FileLock:
+    """
+    Cross-process lock built on exclusive file creation (works on Windows and
+    POSIX alike). A lock file older than `stale_after` seconds is assumed to
+    belong to a crashed process and is taken over, so `stale_after` must stay
+    below `timeout` or waiters give up before an orphaned lock expires.
+    """
+
+    def __init__(self, path, timeout=30, stale_after=15, poll=0.05):
+        if stale_after >= timeout:
+            raise ValueError("stale_after must be shorter than timeout")
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll = poll
+
+    def __enter__(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TokenError(f"Timed out waiting for {self.path}")
+                time.sleep(self.poll)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class TokenManager:
+    def __init__(self, path=TOKENS_FILE, client_id=None, client_secret=None, pool_size=POOL_SIZE):
+        self.path = path
+        self.default_client_id = client_id
+        self.client_secret = client_secret
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.inflight = None
+        self.token = None
+        self.client_id = None
+        self.valid_until = 0.0
+        self.session = None
+        self._client = None
+        self.stats = {"validations": 0, "refreshes": 0}
+
+    # --- PUBLIC API ---
+    def access_token(self):
+        """(client_id, access_token), validated or refreshed as needed."""
+        if self.token and time.time() < self.valid_until:
+            return self.client_id, self.token
+        with self.lock:
+            done = self.inflight
+            leader = done is None
+            if leader:
+                done = self.inflight = threading.Event()
+        if not leader:
+            done.wait()
+            if not (self.token and time.time() < self.valid_until):
+                raise TokenError("No valid access token (see the first caller's error)")
+            return self.client_id, self.token
+        try:
+            self._ensure()
+        finally:
+            with self.lock:
+                self.inflight = None
+            done.set()
+        return self.client_id, self.token
+
+    def client(self):
+        """The shared FyersModel for the current token (rebuilt only when the token changes)."""
+        from fyers_apiv3 import fyersModel
+        client_id, token = self.access_token()
+        with self.lock:
+            if self._client is None or self._client.token != token:
+                self._client = fyersModel.FyersModel(client_id=client_id, token=token, is_async=False, log_path="")
+                self._client.service.session = self._session()
+            return self._client
+
+    def invalidate(self):
+        """Forget the cached validity, e.g. after an API call was rejected as unauthenticated."""
+        self.valid_until = 0.0
+
+    # --- INTERNALS ---
+    def _session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        if self.session is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        return self.session
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, tokens):
+        write_private_json(self.path, tokens)
+
+    def _ensure(self):
+        tokens = self._read()
+        token = tokens.get("access_token", "")
+        if token and self._check(tokens):
+            return
+        with FileLock(self.path + ".lock"):
+            # Another process may have refreshed while we waited for the lock.
+            tokens = self._read()
+            if tokens.get("access_token", "") != token and self._check(tokens):
+                return
+            self._refresh(tokens)
+
+    def _check(self, tokens):
+        """Accept tokens' access token if it is unexpired and the API takes it."""
+        client_id = tokens.get("client_id") or self.default_client_id
+        token = tokens.get("access_token", "")
+        expiry = token_expiry(token)
+        if not token or (expiry is not None and expiry - EXPIRY_SKEW_SEC <= time.time()):
+            return False
+        if not self._validate(client_id, token):
+            return False
+        self._accept(client_id, token, expiry)
+        return True
+
+    def _validate(self, client_id, token):
+        import requests
+        from fyers_apiv3 import fyersModel
+        self.stats["validations"] += 1
+        try:
+            url = fyersModel.Config.API + fyersModel.Config.get_profile
+            response = self._session().get(url, headers={"Authorization": f"{client_id}:{token}", "version": "3"},
+                                           timeout=HTTP_TIMEOUT_SEC)
+            return response.json().get("code") == 200
+        except (requests.RequestException, ValueError):
+            return False
+
+    def _refresh(self, tokens):
+        import requests
+        from fyers_apiv3 import fyersModel
+        client_id = tokens.get("client_id") or self.default_client_id
+        secret = self.client_secret or os.environ.get("FYERS_SECRET_KEY") or tokens.get("client_secret", "")
+        refresh_token = tokens.get("refresh_token", "")
+        if not secret:
+            raise TokenError("Token expired and no app secret to renew it with; set FYERS_SECRET_KEY")
+        if not (client_id and refresh_token):
+            raise TokenError(f"Token expired and {self.path} lacks client_id/refresh_token; "
+                             "run `oi-analyzer login` to log in again")
+        self.stats["refreshes"] += 1
+        payload = {
+            "grant_type": "refresh_token",
+            "appIdHash": hashlib.sha256(f"{client_id}:{secret}".encode()).hexdigest(),
+            "refresh_token": refresh_token,
+            "pin": str(tokens.get("pin") or os.environ.get("FYERS_PIN", "")),
+        }
+        try:
+            response = self._session().post(fyersModel.Config.API + REFRESH_ENDPOINT, json=payload,
+                                            timeout=HTTP_TIMEOUT_SEC).json()
+        except (requests.RequestException, ValueError) as e:
+            raise TokenError(f"Token refresh failed: {e}")
+        if response.get("s") != "ok" or not response.get("access_token"):
+            raise TokenError(f"Token refresh rejected ({response.get('message', response)}); "
+                             "run `oi-analyzer login` to log in again")
+        tokens = dict(tokens, access_token=response["access_token"])
+        self._write(tokens)
+        self._accept(client_id, tokens["access_token"], token_expiry(tokens["access_token"]))
+
+    def _accept(self, client_id, token, expiry):
+        self.client_id = client_id
+        self.token = token
+        if expiry is None:
+            self.valid_until = time.time() + UNKNOWN_EXPIRY_TTL_SEC
+        else:
+            self.valid_until = expiry - EXPIRY_SKEW_SEC
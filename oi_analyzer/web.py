@@ -0,0 +1,285 @@
+from flask import Flask, Response, abort, jsonify, redirect, render_template_string, request, send_file
+import argparse
+import io
+import os
+import tempfile
+import threading
+import time
+import webbrowser
+
+from . import metrics
+from .buildup import BuildupTracker
+from .cache import ChainCache
+from .engine import MAX_CONCURRENCY, AnalyzerService, load_symbols, run_scan, save_results
+from .live import Broadcaster
+from .store import STORE_DIR, SnapshotStore
+from .tokens import TokenManager
+
+CLIENT_ID = "Your_CLIENT_ID"
+TOKENS_FILE = "fyers_tokens.json"
+REFRESH_INTERVAL_SEC = 60
+CHAIN_CACHE_FILE = "chain_cache.json"
+CHAIN_TTL_SEC = REFRESH_INTERVAL_SEC  # a chain serves one scan; raise it to spend less broker quota
+CHAIN_STALE_SEC = 300
+RESULTS_FILE = "latest_results.csv"
+DOWNLOAD_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+                    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+DISPLAY_COLUMNS = ["symbol", "stock_price", "support_strike", "support_oi",
+                   "resistance_strike", "resistance_oi", "nearest_level",
+                   "buildup", "support_shift", "resistance_shift"]
+
+TABLE_CSS = """
+<style>
+body { font-family: Arial, sans-serif; margin: 24px; }
+h1 { margin-bottom: 8px; }
+.small { color: #666; margin-top: 0; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: center; }
+th { background: #f2f2f2; position: sticky; top: 0; cursor: pointer; }
+tr:nth-child(even) { background: #fafafa; }
+tr.changed td { background: #fff3c4; }
+.error { color: #b00; }
+.btn {
+  display:inline-block; padding:8px 12px; border:1px solid #444; border-radius:6px;
+  text-decoration:none; color:#111; font-weight:bold; margin-right:8px;
+}
+input { padding: 6px; margin-right: 8px; }
+</style>
+"""
+
+# The table lives in the browser: /events sends a snapshot, then only changed rows;
+# sorting and filtering never touch the server.
+PAGE_TMPL = """
+<!doctype html>
+<html>
+<head>
+<meta charset="utf-8" />
+<title>OI Support &amp; Resistance</title>
+{{ css }}
+</head>
+<body>
+  <h1>OI Support &amp; Resistance</h1>
+  <p class="small"><span id="status">Connecting&hellip;</span></p>
+  <p id="error" class="error"></p>
+  <p>
+    <a class="btn" href="/refresh" id="refresh">Refresh Now</a>
+    <a class="btn" href="/download/csv">CSV</a>
+    <a class="btn" href="/download/xlsx">Excel</a>
+  </p>
+  <p>
+    <input id="symbol-filter" placeholder="Symbol contains" />
+    <input id="level-filter" type="number" step="any" min="0" placeholder="Max nearest level" />
+    <span id="count" class="small"></span>
+  </p>
+  <table>
+    <thead><tr>{% for c in columns %}<th data-col="{{ c }}">{{ c }}</th>{% endfor %}</tr></thead>
+    <tbody id="rows"></tbody>
+  </table>
+<script>
+const columns = {{ columns | tojson }};
+const rows = new Map();
+const changed = new Set();
+let meta = {};
+let sortCol = "nearest_level", sortAsc = true, pending = false;
+
+function fmt(v) { return v === null || v === undefined ? "" : (typeof v === "number" ? +v.toFixed(2) : v); }
+
+function render() {
+  pending = false;
+  const text = document.getElementById("symbol-filter").value.toUpperCase();
+  const maxLevel = parseFloat(document.getElementById("level-filter").value);
+  let list = [...rows.values()].filter(r =>
+    (!text || r.symbol.toUpperCase().includes(text)) &&
+    (isNaN(maxLevel) || (r.nearest_level !== null && r.nearest_level <= maxLevel)));
+  list.sort((a, b) => {
+    const x = a[sortCol], y = b[sortCol];
+    if (x === y) return 0;
+    if (x === null) return 1;
+    if (y === null) return -1;
+    return (x < y ? -1 : 1) * (sortAsc ? 1 : -1);
+  });
+  const body = document.createDocumentFragment();
+  for (const r of list) {
+    const tr = document.createElement("tr");
+    if (changed.has(r.symbol)) tr.className = "changed";
+    for (const c of columns) {
+      const td = document.createElement("td");
+      td.textContent = fmt(r[c]);
+      tr.appendChild(td);
+    }
+    body.appendChild(tr);
+  }
+  document.getElementById("rows").replaceChildren(body);
+  document.getElementById("count").textContent = list.length + " of " + rows.size + " symbols";
+  const ts = meta.refreshed_at ? new Date(meta.refreshed_at * 1000).toLocaleTimeString() : "never";
+  document.getElementById("status").textContent = "Refreshed at: " + ts + " | " +
+    (meta.refreshing ? "scan running" : "next scan within " + (meta.interval || "?") + "s");
+  document.getElementById("error").textContent = meta.error ? "Error: " + meta.error : "";
+}
+
+function schedule() { if (!pending) { pending = true; requestAnimationFrame(render); } }
+
+const events = new EventSource("/events");
+events.addEventListener("snapshot", e => {
+  const msg = JSON.parse(e.data);
+  rows.clear();
+  changed.clear();
+  for (const r of msg.rows) rows.set(r.symbol, r);
+  meta = msg.meta;
+  schedule();
+});
+events.addEventListener("diff", e => {
+  const msg = JSON.parse(e.data);
+  if (msg.upserts.length || msg.removed.length) changed.clear();
+  for (const r of msg.upserts) { rows.set(r.symbol, r); changed.add(r.symbol); }
+  for (const s of msg.removed) rows.delete(s);
+  meta = msg.meta;
+  schedule();
+});
+events.onerror = () => { document.getElementById("status").textContent = "Disconnected, retrying\u2026"; };
+
+document.querySelectorAll("th").forEach(th => th.addEventListener("click", () => {
+  const col = th.dataset.col;
+  sortAsc = col === sortCol ? !sortAsc : true;
+  sortCol = col;
+  schedule();
+}));
+document.getElementById("symbol-filter").addEventListener("input", schedule);
+document.getElementById("level-filter").addEventListener("input", schedule);
+document.getElementById("refresh").addEventListener("click", e => {
+  e.preventDefault();
+  fetch("/refresh", {method: "POST"});
+});
+</script>
+</body>
+</html>
+"""
+
+# ---------------- App ----------------
+def create_app(tokens_file=TOKENS_FILE, client_id=CLIENT_ID, interval=REFRESH_INTERVAL_SEC,
+               chain_ttl=CHAIN_TTL_SEC, chain_stale=CHAIN_STALE_SEC, revalidate=True,
+               chain_cache_file=CHAIN_CACHE_FILE, results_file=RESULTS_FILE, store_dir=STORE_DIR):
+    """
+    The dashboard app with its own token manager, chain cache, snapshot store
+    and background scan service (app.service; not started). Importing this
+    module builds none of them.
+
+    Chains younger than chain_ttl are served from the cache. With revalidate,
+    a scan that finds chains up to chain_stale seconds past their TTL
+    publishes rows from them straight away, then waits for the background
+    refetches and publishes again; without it, stale chains are refetched in
+    the foreground and only stand in for fetches that fail.
+    """
+    app = Flask(__name__)
+    token_manager = TokenManager(tokens_file, client_id=client_id)
+    chain_cache = ChainCache(ttl=chain_ttl, stale_ttl=chain_stale, path=chain_cache_file, revalidate=revalidate,
+                             revalidate_workers=MAX_CONCURRENCY)
+    snapshot_store = SnapshotStore(store_dir)
+    buildup_tracker = BuildupTracker()
+    broadcaster = Broadcaster(columns=DISPLAY_COLUMNS)
+
+    def scan():
+        """Fetches and analyzes the whole list with the shared, already-validated client."""
+        broadcaster.publish(refreshing=True)
+        client, symbols = token_manager.client(), load_symbols()
+        stale_hits = chain_cache.snapshot_stats()["stale_hits"]
+        results = run_scan(client, symbols, cache=chain_cache, store=snapshot_store, buildup=buildup_tracker)
+        if chain_cache.snapshot_stats()["stale_hits"] > stale_hits:
+            # Show the rows from stale chains now, then rescan once their refetches are cached.
+            broadcaster.publish(results, refreshing=True)
+            chain_cache.wait_revalidations(timeout=interval)
+            results = run_scan(client, symbols, cache=chain_cache, store=snapshot_store, buildup=buildup_tracker)
+        chain_cache.save()
+        # Atomic replace: other readers of results_file never see a partial write.
+        save_results(results, results_file)
+        return results
+
+    def publish(snap):
+        """Push the finished scan to live viewers as a diff against the previous one."""
+        broadcaster.publish(snap.results, refreshed_at=snap.refreshed_at, duration=snap.duration,
+                            error=snap.error, refreshing=False, interval=interval)
+
+    service = AnalyzerService(scan, interval=interval, on_refresh=publish)
+    app.token_manager, app.chain_cache, app.broadcaster, app.service = token_manager, chain_cache, broadcaster, service
+
+    @app.route("/")
+    def index():
+        return render_template_string(PAGE_TMPL, columns=DISPLAY_COLUMNS, css=TABLE_CSS)
+
+    @app.route("/events")
+    def events():
+        # Each viewer only replays bytes the broadcaster already encoded.
+        return Response(broadcaster.stream(request.headers.get("Last-Event-ID")), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.route("/refresh", methods=["GET", "POST"])
+    def refresh():
+        # Results arrive over /events; concurrent clicks share the scan already in flight.
+        if not service.is_refreshing():
+            threading.Thread(target=service.refresh, daemon=True).start()
+        if request.method == "POST":
+            return jsonify({"refreshing": True}), 202
+        return redirect("/")
+
+    @app.route("/cache/stats")
+    def cache_stats():
+        return jsonify(chain_cache.snapshot_stats())
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        for name, value in chain_cache.snapshot_stats().items():
+            metrics.set_gauge(f"oi_chain_cache_{name}", value)
+        for name, value in token_manager.stats.items():
+            metrics.set_gauge(f"oi_token_{name}", value)
+        metrics.set_gauge("oi_live_viewers", broadcaster.clients)
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/download/<fmt>")
+    def download(fmt):
+        # Excel/Parquet are only built when someone asks for them.
+        if fmt not in DOWNLOAD_FORMATS:
+            abort(404)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"oi_levels.{fmt}")
+            try:
+                save_results(service.snapshot.results, path)
+            except ImportError as e:
+                # The writer's optional dependency isn't installed: say which one instead of a 500
+                return Response(f"{e}\n", status=406, mimetype="text/plain")
+            with open(path, "rb") as f:
+                data = f.read()
+        return send_file(io.BytesIO(data), mimetype=DOWNLOAD_FORMATS[fmt], as_attachment=True,
+                         download_name=f"oi_levels.{fmt}")
+
+    return app
+
+def open_browser(url):
+    time.sleep(1.5)
+    try:
+        webbrowser.open_new(url)
+    except Exception:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="oi-analyzer serve", description="Live OI support/resistance dashboard.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--no-browser", action="store_true", help="don't open the dashboard in a browser")
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL_SEC, help="seconds between scans")
+    parser.add_argument("--chain-ttl", type=float, help="seconds a fetched chain is served from the cache "
+                        "(default: the scan interval; higher spends less broker quota on staler chains)")
+    parser.add_argument("--chain-stale", type=float, default=CHAIN_STALE_SEC,
+                        help="seconds past the TTL a chain may still be shown while it is refetched")
+    parser.add_argument("--no-revalidate", action="store_true",
+                        help="refetch stale chains before a scan publishes instead of in the background")
+    args = parser.parse_args(argv)
+    app = create_app(interval=args.interval, chain_ttl=args.interval if args.chain_ttl is None else args.chain_ttl,
+                     chain_stale=args.chain_stale, revalidate=not args.no_revalidate)
+    app.chain_cache.load()
+    app.service.start()
+    if not args.no_browser:
+        threading.Thread(target=open_browser, args=(f"http://{args.host}:{args.port}/",), daemon=True).start()
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+
+if __name__ == "__main__":
+    main()
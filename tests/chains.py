@@ -0,0 +1,35 @@
+"""Random option chains for the equivalence tests."""
+
+
+def random_chain(rng, max_strikes=60):
+    """(calls, puts, spot): dicts built in strike order, like the scan builds them from a Fyers response."""
+    step = rng.choice([1, 2.5, 5, 10, 20, 50, 100])
+    base = rng.randint(1, 400) * step
+    count = rng.randint(0, max_strikes)
+    strikes = [float(base + i * step) for i in range(count)]
+    span = rng.choice([3, 50, 10_000, 5_000_000])
+    calls, puts = {}, {}
+    for k in strikes:
+        # Small spans force ties; occasional gaps leave a side missing a strike.
+        if rng.random() > 0.05:
+            calls[k] = rng.randint(0, span)
+        if rng.random() > 0.05:
+            puts[k] = rng.randint(0, span)
+    if strikes:
+        spot = rng.uniform(strikes[0] - step, strikes[-1] + step)
+        if rng.random() < 0.2:
+            spot = rng.choice(strikes)
+    else:
+        spot = rng.uniform(1, 1000)
+    return calls, puts, max(spot, 0.01)
+
+
+def random_params(rng):
+    return {
+        "cluster_ratio": rng.choice([0.0, 0.3, 0.6, 0.7, 1.0, 1.2]),
+        "min_avg_multiplier": rng.choice([0.5, 1.0, 1.2, 1.5, 3.0]),
+        "dominance_factor": rng.choice([0.5, 1.0, 1.2, 1.5, 2.0]),
+        "max_pct_away": rng.choice([0.01, 0.04, 0.06, 0.5]),
+        "atm_window": rng.choice([10, 200, 1000]),
+        "n": rng.choice([1, 2, 3]),
+    }
@@ -0,0 +1,319 @@
+"""
+Local stand-ins for the Fyers APIs, used by the tests and benchmarks.
+
+Serves `/data/options-chain-v3` with synthetic chains in the same shape the
+real endpoint returns (per expiry via `timestamp`, rows counted in
+`server.chain_rows`), with configurable latency and an optional per-second
+quota that answers with HTTP 429 like the broker does. `/api/v3/profile`
+and `/api/v3/validate-refresh-token` mimic token validation and the
+refresh_token grant, counting calls in `server.auth_hits`. `/data/quotes`
+answers with each symbol's synthetic spot, or the price set in
+`server.spots`, as the LTP feed for alerts. A minimal websocket
+server replays a recorded list of JSON ticks for the streaming mode.
+"""
+import base64
+import datetime
+import hashlib
+import json
+import random
+import socketserver
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from oi_analyzer.fetcher import TokenBucket
+
+
+# --- SYNTHETIC CHAINS ---
+MAX_STRIKECOUNT = 50  # the API's widest chain
+FAR_OTM_STRIKES = 14  # legs beyond this many strikes from ATM may be missing
+
+
+def expiry_dates(symbol, now=None):
+    """
+    Upcoming expiries as epoch seconds: weekly Thursdays for "-INDEX"
+    symbols, last Thursdays of the next three months for stocks.
+    """
+    day = datetime.date.fromtimestamp(time.time() if now is None else now)
+    thursday = day + datetime.timedelta(days=(3 - day.weekday()) % 7)
+    weeks = [thursday + datetime.timedelta(weeks=i) for i in range(15)]
+    month_ends = [d for d, after in zip(weeks, weeks[1:]) if d.month != after.month]
+    dates = weeks[:4] + month_ends[:1] if symbol.endswith("-INDEX") else month_ends[:3]
+    return sorted({int(time.mktime((d.year, d.month, d.day, 15, 30, 0, 0, 0, -1))) for d in dates})
+
+
+def expiry_data(symbol, now=None):
+    return [{"date": time.strftime("%d-%m-%Y", time.localtime(ts)), "expiry": str(ts)}
+            for ts in expiry_dates(symbol, now)]
+
+
+def make_option_chain(symbol, spot=None, strikecount=20, step=None, seed=None, missing=0.05, expiry=None):
+    """
+    Build an optionchain response dict with a spot row and CE/PE rows per strike.
+
+    OI is lognormal, piles up at round strikes, decays away from ATM and is
+    heavier on the OTM side of each leg (call writers above spot, put writers
+    below). Far-OTM legs are left out with probability `missing`, as thinly
+    traded contracts are in real chains. "-INDEX" symbols get index-sized
+    spots and 50/100-point strikes. A later `expiry` (epoch seconds) keeps
+    the symbol's spot and strikes but draws its own, smaller OI.
+    """
+    rng = random.Random(seed if seed is not None else zlib.crc32(symbol.encode()))
+    index = symbol.endswith("-INDEX")
+    if spot is None:
+        spot = round(rng.uniform(18000, 52000) if index else rng.uniform(100, 5000), 2)
+    if step is None:
+        if index:
+            step = 50 if spot < 30000 else 100
+        else:
+            step = 50 if spot >= 2000 else 20 if spot >= 500 else 5
+    expiries = expiry_data(symbol)
+    scale = 1.0
+    if expiry and str(expiry) != expiries[0]["expiry"]:
+        rng = random.Random(zlib.crc32(f"{symbol}:{expiry}:{seed}".encode()))
+        scale = 0.5
+    atm = round(spot / step) * step
+    chain = [{
+        "symbol": symbol,
+        "strike_price": -1,
+        "option_type": "",
+        "ltp": spot,
+    }]
+    # Draw every strike of the widest chain so a strike's numbers don't depend on strikecount.
+    width = max(strikecount, MAX_STRIKECOUNT)
+    for i in range(-width, width + 1):
+        strike = atm + i * step
+        if strike <= 0:
+            continue
+        for option_type in ("CE", "PE"):
+            dropped = abs(i) > FAR_OTM_STRIKES and rng.random() < missing
+            weight = 3.0 if strike % (step * 5) == 0 else 1.0
+            otm = strike > spot if option_type == "CE" else strike < spot
+            weight *= 1.5 if otm else 0.6
+            oi = int(rng.lognormvariate(10, 0.8) * weight * scale / (1 + abs(i) * 0.1))
+            oich, volume, premium = rng.uniform(-0.2, 0.2), rng.uniform(0.1, 2.0), rng.uniform(1, 20)
+            if dropped or abs(i) > strikecount:
+                continue
+            chain.append({
+                "symbol": f"{symbol}{strike}{option_type}",
+                "strike_price": strike,
+                "option_type": option_type,
+                "oi": oi,
+                "oich": int(oi * oich),
+                "volume": int(oi * volume),
+                "ltp": round(max(0.05, (spot - strike if option_type == "CE" else strike - spot)) + premium, 2),
+            })
+    return {
+        "code": 200,
+        "s": "ok",
+        "message": "",
+        "data": {"optionsChain": chain, "expiryData": expiries},
+    }
+
+
+def make_universe(count, strikecount=20, seed=0):
+    """{symbol: response} for `count` synthetic underlyings."""
+    return {f"NSE:SYM{i}-EQ": make_option_chain(f"NSE:SYM{i}-EQ", strikecount=strikecount, seed=seed * 1_000_003 + i)
+            for i in range(count)}
+
+
+# --- FAKE AUTH ---
+def make_access_token(ttl=3600, now=None):
+    """JWT-shaped token whose payload carries an `exp` claim (the signature is fake)."""
+    def b64(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+    exp = int((time.time() if now is None else now) + ttl)
+    return f"{b64({'alg': 'HS256', 'typ': 'JWT'})}.{b64({'exp': exp, 'nonce': random.random()})}.fakesig"
+
+
+# --- FAKE SERVER ---
+class FakeFyersHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server = self.server
+        if url.path.endswith("/profile"):
+            self.handle_profile()
+            return
+        server.hits += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.quota is not None and not server.quota.try_acquire():
+            self.send_json(429, {"s": "error", "code": 429, "message": "request limit reached"})
+            return
+        if server.require_auth and not self.authenticated():
+            self.send_json(401, {"s": "error", "code": -16, "message": "Could not authenticate the user"})
+            return
+        if url.path.endswith("/options-chain-v3"):
+            symbol = params.get("symbol", "")
+            strikecount = int(params.get("strikecount") or 20)
+            response = make_option_chain(symbol, strikecount=strikecount, expiry=params.get("timestamp") or None)
+            with server.auth_lock:
+                server.chain_rows += len(response["data"]["optionsChain"])
+            self.send_json(200, response)
+        elif url.path.endswith("/quotes"):
+            symbols = [s for s in params.get("symbols", "").split(",") if s]
+            self.send_json(200, {"s": "ok", "code": 200, "d": [
+                {"n": symbol, "s": "ok", "v": {"symbol": symbol, "lp": self.spot(symbol)}} for symbol in symbols]})
+        else:
+            self.send_json(404, {"s": "error", "code": 404, "message": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not urlparse(self.path).path.endswith("/validate-refresh-token"):
+            self.send_json(404, {"s": "error", "code": 404, "message": "not found"})
+            return
+        with server.auth_lock:
+            server.auth_hits["refresh"] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if body.get("refresh_token") != server.refresh_token or body.get("grant_type") != "refresh_token":
+            self.send_json(400, {"s": "error", "code": -501, "message": "invalid refresh token"})
+            return
+        token = make_access_token(server.token_ttl)
+        with server.auth_lock:
+            server.valid_tokens.add(token)
+        self.send_json(200, {"s": "ok", "code": 200, "message": "", "access_token": token})
+
+    def handle_profile(self):
+        server = self.server
+        with server.auth_lock:
+            server.auth_hits["profile"] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if self.authenticated():
+            self.send_json(200, {"s": "ok", "code": 200, "data": {"fy_id": "XX0000", "name": "TEST"}})
+        else:
+            self.send_json(401, {"s": "error", "code": -16, "message": "Could not authenticate the user"})
+
+    def spot(self, symbol):
+        spot = self.server.spots.get(symbol)
+        if spot is None:
+            spot = make_option_chain(symbol, strikecount=1)["data"]["optionsChain"][0]["ltp"]
+        return spot
+
+    def authenticated(self):
+        token = (self.headers.get("Authorization") or "").partition(":")[2]
+        with self.server.auth_lock:
+            return token in self.server.valid_tokens
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.05, rate_per_sec=None, require_auth=False):
+    """
+    Start the fake API on a daemon thread and return (server, base_url).
+    With require_auth, data calls need a token from server.valid_tokens.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeFyersHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.quota = TokenBucket(rate_per_sec) if rate_per_sec else None
+    server.require_auth = require_auth
+    server.hits = 0
+    server.chain_rows = 0
+    server.auth_lock = threading.Lock()
+    server.auth_hits = {"profile": 0, "refresh": 0}
+    server.valid_tokens = set()
+    server.refresh_token = "fake-refresh-token"
+    server.token_ttl = 3600
+    server.spots = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def point_sdk_at(base_url):
+    """Redirect fyers_apiv3 data and account/auth calls to `base_url`."""
+    from fyers_apiv3 import fyersModel
+    fyersModel.Config.DATA_API = base_url + "/data"
+    fyersModel.Config.API = base_url + "/api/v3"
+
+
+# --- REPLAY WEBSOCKET ---
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def ws_frame(payload, opcode=0x1):
+    """One unmasked, unfragmented server->client frame."""
+    n = len(payload)
+    if n < 126:
+        header = bytes([0x80 | opcode, n])
+    elif n < 65536:
+        header = bytes([0x80 | opcode, 126]) + n.to_bytes(2, "big")
+    else:
+        header = bytes([0x80 | opcode, 127]) + n.to_bytes(8, "big")
+    return header + payload
+
+
+def ws_read_frame(rfile):
+    """Read one client frame; returns (opcode, payload) or (None, b"") on EOF."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, b""
+    opcode, n = head[0] & 0x0F, head[1] & 0x7F
+    if n == 126:
+        n = int.from_bytes(rfile.read(2), "big")
+    elif n == 127:
+        n = int.from_bytes(rfile.read(8), "big")
+    mask = rfile.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+    payload = rfile.read(n)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class ReplayHandler(socketserver.StreamRequestHandler):
+    """Upgrade, wait for {"subscribe": [...]}, send the subscribed ticks in order, close."""
+
+    def handle(self):
+        headers = {}
+        self.rfile.readline()
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+        self.wfile.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+        opcode, payload = ws_read_frame(self.rfile)
+        subscribed = set(json.loads(payload).get("subscribe", [])) if opcode == 0x1 else set()
+        server = self.server
+        batch = []
+        for tick in server.ticks:
+            if subscribed and tick.get("symbol") not in subscribed:
+                continue
+            batch.append(tick)
+            if len(batch) >= server.batch_size:
+                self.wfile.write(ws_frame(json.dumps(batch).encode()))
+                batch = []
+                if server.interval:
+                    time.sleep(server.interval)
+        if batch:
+            self.wfile.write(ws_frame(json.dumps(batch).encode()))
+        self.wfile.write(ws_frame((1000).to_bytes(2, "big"), opcode=0x8))
+        ws_read_frame(self.rfile)
+
+
+def start_replay_server(ticks, interval=0.0, batch_size=1, port=0):
+    """Serve `ticks` to every websocket client; returns (server, ws_url)."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", port), ReplayHandler)
+    server.daemon_threads = True
+    server.ticks = list(ticks)
+    server.interval = interval
+    server.batch_size = batch_size
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"ws://127.0.0.1:{server.server_address[1]}/"
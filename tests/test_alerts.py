@@ -0,0 +1,60 @@
+"""Quotes polling survives expired tokens and failed requests."""
+from oi_analyzer import alerts
+
+AUTH_ERROR = {"s": "error", "code": -16, "message": "Could not authenticate the user"}
+
+
+class Quotes:
+    """Fake Fyers client: answers each quotes call with the next of `responses`."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def quotes(self, data):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, dict):
+            return response
+        return {"s": "ok", "code": 200, "d": [{"n": symbol, "v": {"lp": response}}
+                                              for symbol in data["symbols"].split(",")]}
+
+
+class Manager:
+    """Fake TokenManager whose renewed client is `renewed`."""
+
+    def __init__(self, renewed):
+        self.renewed = renewed
+        self.invalidated = 0
+
+    def invalidate(self):
+        self.invalidated += 1
+
+    def client(self):
+        return self.renewed
+
+
+def poll(fyers, cycles=1, token_manager=None):
+    return [(symbol, ltp) for symbol, ltp, _ in alerts.poll_quotes(fyers, ["NSE:A-EQ"], interval=0, rate_per_sec=1e6,
+                                                                   cycles=cycles, token_manager=token_manager)]
+
+
+def test_expired_token_is_renewed_and_the_batch_retried():
+    expired, renewed = Quotes(AUTH_ERROR), Quotes(101.0, 102.0)
+    manager = Manager(renewed)
+    assert poll(expired, cycles=2, token_manager=manager) == [("NSE:A-EQ", 101.0), ("NSE:A-EQ", 102.0)]
+    assert (expired.calls, renewed.calls, manager.invalidated) == (1, 2, 1)
+
+
+def test_token_rejected_after_renewal_skips_the_batch():
+    manager = Manager(Quotes(AUTH_ERROR, 101.0))
+    assert poll(Quotes(AUTH_ERROR), cycles=2, token_manager=manager) == [("NSE:A-EQ", 101.0)]
+    assert manager.invalidated == 1
+
+
+def test_request_exception_skips_only_that_cycle(capsys):
+    client = Quotes(ConnectionError("reset by peer"), 101.0)
+    assert poll(client, cycles=2) == [("NSE:A-EQ", 101.0)]
+    assert "reset by peer" in capsys.readouterr().err
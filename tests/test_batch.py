@@ -0,0 +1,85 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from oi_analyzer import batch, levels
+from tests.chains import random_chain
+
+
+def same(want, got):
+    """levels.py's None is batch's NaN."""
+    return math.isnan(got) if want is None else want == got
+
+
+def padded(found, count):
+    return found + [(None, None)] * (count - len(found))
+
+
+def check_rows(chains, out, **kwargs):
+    for i, (calls, puts, spot) in enumerate(chains):
+        want = levels.compute_levels(calls, puts, spot, **kwargs)
+        pairs = [
+            (padded(want["intraday_resistances"], 1)[0], (out["resistance_strike"][i], out["resistance_oi"][i])),
+            (padded(want["intraday_supports"], 1)[0], (out["support_strike"][i], out["support_oi"][i])),
+        ]
+        for j, level in enumerate(padded(want["positional_resistances"], 2)):
+            pairs.append((level, (out["positional_resistance_strikes"][i, j], out["positional_resistance_oi"][i, j])))
+        for j, level in enumerate(padded(want["positional_supports"], 2)):
+            pairs.append((level, (out["positional_support_strikes"][i, j], out["positional_support_oi"][i, j])))
+        for expected, got in pairs:
+            assert same(expected[0], got[0]) and same(expected[1], got[1]), \
+                f"row {i}: {expected} != {got}\nspot={spot}\ncalls={calls}\nputs={puts}"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_compute_levels(seed):
+    rng = random.Random(seed)
+    chains = [random_chain(rng) for _ in range(200)]
+    packed = batch.pack_ladders([batch.StrikeLadder.from_dicts(calls, puts) for calls, puts, _ in chains])
+    out = batch.batch_levels(*packed, [spot for _, _, spot in chains])
+    check_rows(chains, out)
+
+
+def test_all_empty_chains():
+    chains = [({}, {}, 100.0), ({}, {}, 250.0)]
+    out = batch.batch_levels(*batch.pack_ladders([batch.StrikeLadder.from_dicts({}, {})] * 2), [100.0, 250.0])
+    check_rows(chains, out)
+    rows = batch.to_results(["A", "B"], [100.0, 250.0], out)
+    assert [row["nearest_level"] for row in rows] == [float("inf")] * 2
+
+
+@pytest.mark.parametrize("atm_window", [0, 25, 500, 5000])
+def test_batch_matches_compute_levels_atm_window(atm_window):
+    rng = random.Random(atm_window)
+    chains = [random_chain(rng) for _ in range(200)]
+    packed = batch.pack_ladders([batch.StrikeLadder.from_dicts(calls, puts) for calls, puts, _ in chains])
+    out = batch.batch_levels(*packed, [spot for _, _, spot in chains], atm_window=atm_window)
+    check_rows(chains, out, atm_window=atm_window)
+
+
+def test_atm_window_per_row():
+    rng = random.Random(7)
+    chains = [random_chain(rng) for _ in range(200)]
+    windows = [rng.choice([0, 25, 200, 5000]) for _ in chains]
+    packed = batch.pack_ladders([batch.StrikeLadder.from_dicts(calls, puts) for calls, puts, _ in chains])
+    out = batch.batch_levels(*packed, [spot for _, _, spot in chains], atm_window=windows)
+    for i, window in enumerate(windows):
+        check_rows([chains[i]], {key: values[i:i + 1] for key, values in out.items()}, atm_window=window)
+
+
+def test_strike_ladder_aligns_both_sides():
+    ladder = batch.StrikeLadder.from_dicts({110.0: 5, 100.0: 7}, {105.0: 3})
+    assert ladder.strikes.tolist() == [100.0, 105.0, 110.0]
+    assert ladder.ce_oi.tolist() == [7, 0, 5] and ladder.ce_mask.tolist() == [True, False, True]
+    assert ladder.pe_oi.tolist() == [0, 3, 0] and ladder.pe_mask.tolist() == [False, True, False]
+
+
+def test_pack_dicts_equals_pack_ladders():
+    rng = random.Random(11)
+    chains = [random_chain(rng) for _ in range(100)] + [({}, {}, 1.0)]
+    pairs = [(calls, puts) for calls, puts, _ in chains]
+    want = batch.pack_ladders([batch.StrikeLadder.from_dicts(calls, puts) for calls, puts in pairs])
+    for expected, got in zip(want, batch.pack_dicts(pairs)):
+        assert expected.shape == got.shape and np.array_equal(expected, got, equal_nan=expected.dtype != bool)
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from oi_analyzer.cache import ChainCache
+
+OK = {"s": "ok", "code": 200, "data": {"optionsChain": [{"ltp": 100.0}]}}
+NEW = {"s": "ok", "code": 200, "data": {"optionsChain": [{"ltp": 101.0}]}}
+ERROR = {"s": "error", "code": 429, "message": "request limit reached"}
+KEY = ChainCache.key("NSE:SBIN-EQ")
+
+
+def fetcher(*responses):
+    """fetch() returning `responses` in order (raising the exceptions among them), counting calls."""
+    queue = list(responses)
+
+    def fetch():
+        fetch.calls += 1
+        response = queue.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    fetch.calls = 0
+    return fetch
+
+
+def aged(cache, seconds):
+    cache.put(KEY, OK, stored_at=time.time() - seconds)
+
+
+def test_fresh_entry_skips_fetch():
+    cache = ChainCache(ttl=30)
+    aged(cache, 10)
+    fetch = fetcher()
+    assert cache.get_or_fetch(KEY, fetch) is OK and fetch.calls == 0
+
+
+def test_expired_entry_is_a_miss():
+    cache = ChainCache(ttl=30, stale_ttl=60)
+    aged(cache, 120)
+    assert cache.get_or_fetch(KEY, fetcher(NEW)) is NEW
+    assert cache.stats["misses"] == 1
+
+
+def test_stale_while_revalidate():
+    cache = ChainCache(ttl=30, stale_ttl=300)
+    aged(cache, 60)
+    assert cache.get_or_fetch(KEY, fetcher(NEW)) is OK
+    cache.pool.shutdown(wait=True)
+    assert cache.get_or_fetch(KEY, fetcher()) is NEW
+    assert cache.stats["stale_hits"] == 1 and cache.stats["revalidations"] == 1
+
+
+def test_without_revalidation_stale_entries_are_refetched():
+    cache = ChainCache(ttl=30, stale_ttl=300, revalidate=False)
+    aged(cache, 60)
+    fetch = fetcher(NEW)
+    assert cache.get_or_fetch(KEY, fetch) is NEW and fetch.calls == 1
+    assert cache.get_or_fetch(KEY, fetcher()) is NEW  # and now fresh
+
+
+@pytest.mark.parametrize("failure", [ERROR, OSError("connection reset")])
+def test_without_revalidation_stale_entry_covers_failed_fetch(failure):
+    cache = ChainCache(ttl=30, stale_ttl=300, revalidate=False)
+    aged(cache, 60)
+    assert cache.get_or_fetch(KEY, fetcher(failure)) is OK
+    assert cache.stats["stale_fallbacks"] == 1
+
+
+def test_failed_fetch_without_servable_entry():
+    cache = ChainCache(ttl=30, stale_ttl=60, revalidate=False)
+    assert cache.get_or_fetch(KEY, fetcher(ERROR)) is ERROR
+    assert KEY not in cache.entries  # errors are never cached
+    aged(cache, 120)
+    with pytest.raises(OSError):
+        cache.get_or_fetch(KEY, fetcher(OSError("down")))
+
+
+def test_load_drops_entries_too_old_to_serve(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ChainCache(ttl=30, stale_ttl=60, path=path)
+    aged(cache, 50)
+    cache.put(ChainCache.key("NSE:OLD-EQ"), OK, stored_at=time.time() - 500)
+    cache.save()
+    warm = ChainCache(ttl=30, stale_ttl=60, path=path)
+    assert warm.load() == 1 and list(warm.entries) == [KEY]
+
+
+def test_lru_eviction_bounds_memory():
+    cache = ChainCache(max_bytes=200)
+    for i in range(10):
+        cache.put(ChainCache.key(f"NSE:S{i}-EQ"), OK)
+    assert cache.bytes <= 200 and cache.stats["evictions"] > 0
+    assert ChainCache.key("NSE:S9-EQ") in cache.entries
+
+
+def test_wait_revalidations():
+    cache = ChainCache(ttl=30, stale_ttl=300)
+    aged(cache, 60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return NEW
+
+    assert cache.get_or_fetch(KEY, slow) is OK
+    started.wait(5)
+    assert not cache.wait_revalidations(timeout=0.05)
+    release.set()
+    assert cache.wait_revalidations(timeout=5)
+    assert cache.get_or_fetch(KEY, fetcher()) is NEW
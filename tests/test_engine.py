@@ -0,0 +1,96 @@
+import threading
+
+from oi_analyzer.engine import AnalyzerService, analyze_symbol, format_row, run_scan
+from oi_analyzer.expiries import ExpiryPlanner
+from oi_analyzer.levels import compute_levels
+from tests import fake_fyers
+
+
+class FakeClient:
+    """optionchain() straight from fake_fyers, no server or SDK."""
+
+    def optionchain(self, data):
+        if data["symbol"] == "NSE:NOSPOT-EQ":
+            return {"s": "error", "code": -300, "message": "no data"}
+        return fake_fyers.make_option_chain(data["symbol"], strikecount=data["strikecount"],
+                                            expiry=data["timestamp"] or None)
+
+
+class CheckedPlanner(ExpiryPlanner):
+    """Records analyze()'s per-symbol row next to the inputs handed to the batch pass."""
+
+    def __init__(self):
+        super().__init__()
+        self.expected = {}
+
+    def level_inputs(self, symbol, chains):
+        inputs = super().level_inputs(symbol, chains)
+        if inputs is not None:
+            spot, calls, puts, atm_window = inputs
+            self.expected[symbol] = format_row(symbol, spot, compute_levels(calls, puts, spot, atm_window=atm_window))
+        return inputs
+
+
+def test_refresh_survives_failing_on_refresh(capsys):
+    def publish(snapshot):
+        raise RuntimeError("broadcaster gone")
+
+    service = AnalyzerService(lambda: [{"symbol": "A"}], on_refresh=publish)
+    snapshot = service.refresh()
+    assert snapshot.results == [{"symbol": "A"}] and snapshot.error is None
+    assert "broadcaster gone" in capsys.readouterr().err
+
+
+def test_background_loop_keeps_scanning_after_publish_error():
+    scans = []
+    done = threading.Event()
+
+    def scan():
+        scans.append(1)
+        if len(scans) >= 3:
+            done.set()
+        return []
+
+    def publish(snapshot):
+        raise RuntimeError("broadcaster gone")
+
+    service = AnalyzerService(scan, interval=0.01, on_refresh=publish)
+    service.start()
+    try:
+        assert done.wait(5), f"loop stopped after {len(scans)} scan(s)"
+    finally:
+        service.stop()
+
+
+def test_failed_scan_keeps_last_results():
+    results = iter([[{"symbol": "A"}]])
+    service = AnalyzerService(lambda: next(results))
+    service.refresh()
+    snapshot = service.refresh()
+    assert snapshot.results == [{"symbol": "A"}]
+    assert snapshot.error.startswith("StopIteration")
+
+
+def scan_symbols():
+    return [f"NSE:SYM{i}-EQ" for i in range(60)] + ["NSE:NIFTY50-INDEX", "NSE:NOSPOT-EQ"]
+
+
+def test_run_scan_rows_equal_analyze_symbol():
+    client = FakeClient()
+    symbols = scan_symbols()
+    rows = run_scan(client, symbols, rate_per_sec=1e6)
+    expected = [analyze_symbol(s, client.optionchain({"symbol": s, "strikecount": 20, "timestamp": ""}))
+                for s in symbols]
+    expected = sorted((row for row in expected if row is not None), key=lambda x: x["nearest_level"])
+    assert rows == expected
+    assert [[type(v) for v in row.values()] for row in rows] == [[type(v) for v in row.values()] for row in expected]
+
+
+def test_run_scan_with_expiries_equals_per_symbol_levels():
+    planner = CheckedPlanner()
+    symbols = scan_symbols()
+    for _ in range(2):  # the probe scan, then one on the learned plans
+        planner.expected.clear()
+        rows = run_scan(FakeClient(), symbols, rate_per_sec=1e6, expiries=planner)
+        assert rows == sorted(planner.expected.values(), key=lambda x: x["nearest_level"])
+        assert len(rows) == len(symbols) - 1
@@ -0,0 +1,30 @@
+"""Throttle and auth-error classification of API responses."""
+import pytest
+
+from oi_analyzer.fetcher import is_throttled, is_unauthenticated
+
+
+@pytest.mark.parametrize("response", [
+    {"s": "error", "code": 429, "message": "request limit reached"},
+    {"s": "error", "code": -429, "message": ""},
+    {"s": "error", "code": -99, "message": "Rate limit exceeded, try later"},
+    {"s": "error", "message": "Too Many Requests"},
+])
+def test_throttled(response):
+    assert is_throttled(response)
+
+
+@pytest.mark.parametrize("response", [
+    {"s": "ok", "code": 200, "message": ""},
+    {"s": "error", "code": -50, "message": "Price is outside the upper circuit limit"},
+    {"s": "error", "code": -392, "message": "Strike limit exceeded for this symbol"},
+    {"s": "error", "code": -99, "message": "limit order not allowed"},
+    {"s": "error", "code": -16, "message": "Could not authenticate the user"},
+])
+def test_not_throttled(response):
+    assert not is_throttled(response)
+
+
+def test_unauthenticated():
+    assert is_unauthenticated({"s": "error", "code": -16, "message": "Could not authenticate the user"})
+    assert not is_unauthenticated({"s": "error", "code": 429, "message": "request limit reached"})
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from oi_analyzer import levels
+from oi_analyzer.incremental import IncrementalLadder
+from tests.chains import random_chain, random_params
+
+
+def expected(calls, puts, spot, p):
+    return [
+        levels.atm_preferred_level(calls, spot, 'call', p["dominance_factor"], p["atm_window"]),
+        levels.atm_preferred_level(puts, spot, 'put', p["dominance_factor"], p["atm_window"]),
+        levels.intraday_resistance_only_highest(calls, spot, p["max_pct_away"], p["cluster_ratio"], p["min_avg_multiplier"]),
+        levels.nearest_strong_supports_cluster(puts, spot, p["n"], p["max_pct_away"], p["cluster_ratio"], p["min_avg_multiplier"]),
+        levels.positional_resistances_highest(calls, spot, p["cluster_ratio"], p["min_avg_multiplier"], p["dominance_factor"]),
+        levels.positional_supports_highest(puts, spot, p["cluster_ratio"], p["min_avg_multiplier"], p["dominance_factor"]),
+        levels.compute_levels(calls, puts, spot),
+    ]
+
+
+def actual(ladder, p):
+    return [
+        ladder.atm_preferred_level('call', p["dominance_factor"], p["atm_window"]),
+        ladder.atm_preferred_level('put', p["dominance_factor"], p["atm_window"]),
+        ladder.intraday_resistance_only_highest(p["max_pct_away"], p["cluster_ratio"], p["min_avg_multiplier"]),
+        ladder.nearest_strong_supports_cluster(p["n"], p["max_pct_away"], p["cluster_ratio"], p["min_avg_multiplier"]),
+        ladder.positional_resistances_highest(p["cluster_ratio"], p["min_avg_multiplier"], p["dominance_factor"]),
+        ladder.positional_supports_highest(p["cluster_ratio"], p["min_avg_multiplier"], p["dominance_factor"]),
+        ladder.compute_levels(),
+    ]
+
+
+def random_update(rng, ladder, span):
+    """Move spot, change an existing strike's OI, or (rarely) add a new strike."""
+    roll = rng.random()
+    if roll < 0.3:
+        ladder.set_spot(max(0.01, ladder.spot * (1 + rng.gauss(0, 0.01))))
+        return
+    option_type = rng.choice(["CE", "PE"])
+    side = ladder.calls if option_type == "CE" else ladder.puts
+    if roll < 0.95 and len(side):
+        ladder.set_oi(rng.choice(side.strikes), option_type, rng.randint(0, span))
+    else:
+        ladder.set_oi(float(rng.randint(1, 4000)), option_type, rng.randint(0, span))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_matches_levels_under_updates(seed):
+    rng = random.Random(seed)
+    for trial in range(30):
+        calls, puts, spot = random_chain(rng)
+        ladder = IncrementalLadder(calls, puts, spot)
+        span = rng.choice([3, 50, 100_000])
+        for step in range(10):
+            p = random_params(rng)
+            calls, puts = ladder.oi_by_strike(ladder.calls), ladder.oi_by_strike(ladder.puts)
+            assert actual(ladder, p) == expected(calls, puts, ladder.spot, p), \
+                f"trial {trial} step {step}: spot={ladder.spot} params={p}"
+            random_update(rng, ladder, span)
+
+
+def test_new_strike_rebuilds_its_side():
+    ladder = IncrementalLadder({100.0: 10, 110.0: 20}, {100.0: 5}, 104.0)
+    ladder.set_oi(105.0, "CE", 50)
+    assert ladder.calls.strikes == [100.0, 105.0, 110.0]
+    assert ladder.compute_levels() == levels.compute_levels({100.0: 10, 105.0: 50, 110.0: 20}, {100.0: 5}, 104.0)
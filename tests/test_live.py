@@ -0,0 +1,50 @@
+"""Broadcaster diffs stay consistent when scans publish from several threads."""
+import json
+import threading
+
+from oi_analyzer import live
+from oi_analyzer.live import Broadcaster
+
+
+def rows(scan):
+    """Scan `scan`'s result set: five symbols that the next scan drops."""
+    return [{"symbol": f"NSE:S{scan * 5 + i}-EQ", "stock_price": float(scan)} for i in range(5)]
+
+
+def replay(events):
+    """Rows and meta a viewer holds after applying every diff event in order."""
+    state, meta = {}, {}
+    for _, event in sorted(events):
+        payload = json.loads(event.decode().split("data: ", 1)[1])
+        for row in payload["upserts"]:
+            state[row["symbol"]] = row
+        for symbol in payload["removed"]:
+            del state[symbol]
+        meta = payload["meta"]
+    return state, meta
+
+
+def test_concurrent_publishers_leave_a_consistent_diff_history(monkeypatch):
+    broadcaster = Broadcaster()
+    broadcaster.publish(rows(0), scan=0)
+    diffing, scanned = threading.Event(), threading.Event()
+    diff_rows = live.diff_rows
+
+    def paused_diff(old, new):
+        if new is old:  # the status-only publish: let the scan publish while it is mid-diff
+            diffing.set()
+            scanned.wait(0.2)  # a publish that holds the lock here times out instead of deadlocking
+        return diff_rows(old, new)
+
+    monkeypatch.setattr(live, "diff_rows", paused_diff)
+    status = threading.Thread(target=broadcaster.publish, kwargs={"refreshing": True})
+    status.start()
+    assert diffing.wait(5)
+    scan = threading.Thread(target=lambda: (broadcaster.publish(rows(1), scan=1), scanned.set()))
+    scan.start()
+    status.join()
+    scan.join()
+
+    assert broadcaster.rows == live.project(rows(1))
+    assert replay(broadcaster.events) == (broadcaster.rows, broadcaster.meta)
+    assert broadcaster.meta == {"scan": 1, "refreshing": True}
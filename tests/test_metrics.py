@@ -0,0 +1,27 @@
+"""Counter label handling and which series the quotes poller reports to."""
+from oi_analyzer import alerts, metrics
+
+
+class FailingQuotes:
+    def quotes(self, data):
+        return {"s": "error", "code": 429, "message": "request limit reached"}
+
+
+def test_int_and_str_label_values_are_one_series():
+    registry = metrics.Registry()
+    registry.inc("oi_api_errors_total", code=500)
+    registry.inc("oi_api_errors_total", code="500")
+    registry.inc("oi_api_errors_total", code=None)
+    text = registry.render()
+    assert 'oi_api_errors_total{code="500"} 2' in text
+    assert 'oi_api_errors_total{code="None"} 1' in text
+
+
+def test_quote_errors_have_their_own_series():
+    metrics.REGISTRY.reset()
+    assert list(alerts.poll_quotes(FailingQuotes(), ["NSE:A-EQ"], rate_per_sec=1e6, cycles=1)) == []
+    text = metrics.render()
+    assert 'oi_quotes_errors_total{code="429"} 1' in text
+    assert "oi_quotes_throttled_total 1" in text
+    assert "oi_api_errors_total" not in text
+    metrics.REGISTRY.reset()
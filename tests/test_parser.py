@@ -0,0 +1,33 @@
+"""parser.parse_chain() against engine.parse_option_chain() on synthetic chains."""
+import random
+
+import pytest
+
+from oi_analyzer.engine import parse_option_chain
+from oi_analyzer.parser import parse_chain
+from tests import fake_fyers
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_parse_chain_matches_parse_option_chain(seed):
+    rng = random.Random(seed)
+    for trial in range(400):
+        response = fake_fyers.make_option_chain(f"NSE:S{trial}-EQ", strikecount=rng.randint(0, 60),
+                                                seed=rng.random(), missing=rng.choice([0, 0.05, 0.5]))
+        items = response["data"]["optionsChain"]
+        if rng.random() < 0.3:
+            rng.shuffle(items)
+        legs = [item for item in items if item["option_type"]]
+        if legs and rng.random() < 0.1:
+            del rng.choice(legs)["oi"]
+        spot, calls, puts = parse_option_chain(response)
+        chain = parse_chain(response)
+        assert (chain.spot, *chain.oi_dicts()) == (spot, calls, puts), trial
+        assert list(chain.strikes[chain.ce_mask | chain.pe_mask]) == sorted(calls.keys() | puts.keys()), trial
+
+
+def test_missing_underlying_row():
+    response = fake_fyers.make_option_chain("NSE:S-EQ", strikecount=5, seed=1)
+    response["data"]["optionsChain"] = [item for item in response["data"]["optionsChain"] if item["option_type"]]
+    assert parse_chain(response).spot is None
+    assert parse_option_chain(response)[0] is None
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from oi_analyzer.engine import build_row
+from oi_analyzer.streaming import OIStreamer
+from tests.chains import random_chain
+
+SYMBOL = "NSE:TEST-EQ"
+
+
+def response_for(calls, puts, spot, strikes):
+    """Optionchain response listing every strike's CE and PE symbol; legs missing from the dicts have no OI yet."""
+    chain = [{"symbol": SYMBOL, "strike_price": -1, "option_type": "", "ltp": spot}]
+    for k in strikes:
+        for option_type, oi_by_strike in (("CE", calls), ("PE", puts)):
+            chain.append({"symbol": f"{SYMBOL}:{k:g}{option_type}", "strike_price": k,
+                          "option_type": option_type, "oi": oi_by_strike.get(k)})
+    return {"s": "ok", "code": 200, "data": {"optionsChain": chain}}
+
+
+def ticks(rng, calls, puts, spot, strikes, count):
+    """Spot moves of every size (onto strikes, across window edges, big jumps) mixed with OI changes anywhere."""
+    step = strikes[1] - strikes[0] if len(strikes) > 1 else 1.0
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.15:
+            spot = rng.choice(strikes)
+        elif r < 0.3:
+            # Just inside or outside a window edge around a random strike
+            k, pct = rng.choice(strikes), rng.choice([0.04, 0.05, 0.06])
+            spot = k / (1 + pct) if rng.random() < 0.5 else k / (1 - pct)
+            spot *= 1 + rng.choice([-1e-9, 0.0, 1e-9])
+        elif r < 0.6:
+            spot = max(0.01, spot + rng.gauss(0, step / 4))
+        elif r < 0.65:
+            spot = max(0.01, spot * rng.uniform(0.8, 1.2))
+        else:
+            k, option_type = rng.choice(strikes), rng.choice(["CE", "PE"])
+            oi_by_strike = calls if option_type == "CE" else puts
+            oi_by_strike[k] = max(0, oi_by_strike.get(k, rng.randint(0, 5000)) + rng.randint(-5000, 5000))
+            yield {"symbol": f"{SYMBOL}:{k:g}{option_type}", "oi": oi_by_strike[k]}, spot
+            continue
+        yield {"symbol": SYMBOL, "ltp": spot}, spot
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_streamed_rows_equal_build_row_after_every_tick(seed):
+    rng = random.Random(seed)
+    calls, puts, spot = random_chain(rng)
+    while len(set(calls) | set(puts)) < 2:
+        calls, puts, spot = random_chain(rng)
+    strikes = sorted(set(calls) | set(puts))
+    streamer = OIStreamer()
+    streamer.seed(SYMBOL, response_for(calls, puts, spot, strikes))
+    assert streamer.states[SYMBOL].row == build_row(SYMBOL, spot, calls, puts)
+    for n, (tick, spot) in enumerate(ticks(rng, calls, puts, spot, strikes, 1500)):
+        streamer.on_tick(tick)
+        assert streamer.states[SYMBOL].row == build_row(SYMBOL, spot, calls, puts), f"tick {n}: {tick}"
+
+
+def test_moves_within_a_strike_interval_skip_recompute():
+    calls = {float(k): 1000 for k in range(900, 1110, 10)}
+    puts = dict(calls)
+    streamer = OIStreamer()
+    streamer.seed(SYMBOL, response_for(calls, puts, 1001.0, sorted(calls)))
+    recomputes = streamer.stats["recomputes"]
+    for ltp in (1001.5, 1002.0, 1003.3, 1004.9):
+        streamer.on_tick({"symbol": SYMBOL, "ltp": ltp})
+        assert streamer.states[SYMBOL].row == build_row(SYMBOL, ltp, calls, puts)
+    assert streamer.stats["recomputes"] == recomputes
@@ -0,0 +1,154 @@
+"""TokenManager's single-flight validation/refresh and the FileLock behind it."""
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fyers_apiv3")
+
+from fyers_apiv3 import fyersModel
+
+from oi_analyzer import auth
+from oi_analyzer.tokens import FileLock, TokenError, TokenManager
+from tests import fake_fyers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+
+def write_tokens(path, access_token, refresh_token):
+    with open(path, "w") as f:
+        json.dump({"client_id": "TEST-100", "access_token": access_token, "refresh_token": refresh_token}, f)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("FYERS_SECRET_KEY", "secret")
+    monkeypatch.setattr(fyersModel.Config, "API", fyersModel.Config.API)
+    monkeypatch.setattr(fyersModel.Config, "DATA_API", fyersModel.Config.DATA_API)
+    server, base_url = fake_fyers.start_server(latency=0.05)
+    fake_fyers.point_sdk_at(base_url)
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+
+
+def in_threads(count, fn):
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(lambda _: fn(), range(count)))
+
+
+def process_worker(base_url, path, barrier):
+    fake_fyers.point_sdk_at(base_url)
+    manager = TokenManager(path)
+    barrier.wait()
+    manager.access_token()
+
+
+# --- FILE LOCK ---
+def test_orphaned_lock_is_taken_over_by_a_new_process(tmp_path):
+    lock = str(tmp_path / "fyers_tokens.json.lock")
+    crashed = run_python("import os\nfrom oi_analyzer.tokens import FileLock\n"
+                         f"FileLock({lock!r}).__enter__()\nos._exit(3)")
+    assert crashed.returncode == 3 and os.path.exists(lock), crashed.stderr
+    taken = run_python("from oi_analyzer.tokens import FileLock\n"
+                       f"with FileLock({lock!r}, timeout=5, stale_after=0.5):\n    print('acquired')")
+    assert taken.returncode == 0 and taken.stdout.strip() == "acquired", taken.stderr
+    assert not os.path.exists(lock)
+
+
+def test_default_lock_expires_orphans_before_waiters_time_out():
+    lock = FileLock("unused.lock")
+    assert lock.stale_after < lock.timeout
+    with pytest.raises(ValueError):
+        FileLock("unused.lock", timeout=10, stale_after=10)
+
+
+def test_live_holder_is_waited_for(tmp_path):
+    lock = str(tmp_path / "x.lock")
+    order = []
+
+    def wait():
+        with FileLock(lock):
+            order.append("waiter")
+
+    with FileLock(lock):
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.3)
+        order.append("holder")
+    waiter.join(5)
+    assert order == ["holder", "waiter"]
+
+
+# --- SINGLE FLIGHT ---
+def test_valid_token_is_validated_once_across_threads(server, tmp_path):
+    path = str(tmp_path / "fyers_tokens.json")
+    token = fake_fyers.make_access_token()
+    server.valid_tokens.add(token)
+    write_tokens(path, token, server.refresh_token)
+    manager = TokenManager(path)
+    assert set(in_threads(20, manager.access_token)) == {("TEST-100", token)}
+    assert server.auth_hits == {"profile": 1, "refresh": 0}
+
+
+def test_expired_token_is_refreshed_once_across_threads(server, tmp_path):
+    path = str(tmp_path / "fyers_tokens.json")
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    manager = TokenManager(path)
+    tokens = set(in_threads(20, manager.access_token))
+    assert server.auth_hits == {"profile": 0, "refresh": 1}
+    with open(path) as f:
+        assert tokens == {("TEST-100", json.load(f)["access_token"])}
+
+
+def test_expired_token_is_refreshed_once_across_processes(server, tmp_path):
+    path = str(tmp_path / "fyers_tokens.json")
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    barrier = ctx.Barrier(3)
+    procs = [ctx.Process(target=process_worker, args=(server.base_url, path, barrier)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert [p.exitcode for p in procs] == [0, 0, 0]
+    assert server.auth_hits["refresh"] == 1, server.auth_hits
+
+
+# --- STORAGE ---
+def test_refreshed_tokens_are_owner_only_and_hold_no_secret(server, tmp_path):
+    path = str(tmp_path / "fyers_tokens.json")
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    TokenManager(path).access_token()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    with open(path) as f:
+        assert "client_secret" not in json.load(f)
+    assert [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")] == []
+
+
+def test_expired_token_without_a_secret_is_not_refreshed(server, tmp_path, monkeypatch):
+    monkeypatch.delenv("FYERS_SECRET_KEY")
+    path = str(tmp_path / "fyers_tokens.json")
+    write_tokens(path, fake_fyers.make_access_token(ttl=-10), server.refresh_token)
+    with pytest.raises(TokenError, match="FYERS_SECRET_KEY"):
+        TokenManager(path).access_token()
+    assert TokenManager(path, client_secret="secret").access_token()[0] == "TEST-100"
+
+
+def test_login_save_drops_a_stored_secret(tmp_path):
+    path = str(tmp_path / "fyers_tokens.json")
+    auth.save_tokens(path, {"client_id": "TEST-100", "client_secret": "secret", "access_token": "a",
+                            "refresh_token": "r"})
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    with open(path) as f:
+        assert json.load(f) == {"client_id": "TEST-100", "access_token": "a", "refresh_token": "r"}
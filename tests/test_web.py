@@ -0,0 +1,113 @@
+"""Dashboard app construction and downloads when a format's optional writer isn't installed."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+
+from oi_analyzer import output, web
+from tests import fake_fyers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+SYMBOLS = [f"NSE:SYM{i}-EQ" for i in range(20)]
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def optionchain(self, data):
+        self.calls += 1
+        return fake_fyers.make_option_chain(data["symbol"], strikecount=data["strikecount"])
+
+
+def make_app(tmp_path, **kwargs):
+    return web.create_app(tokens_file=str(tmp_path / "fyers_tokens.json"),
+                          chain_cache_file=str(tmp_path / "chain_cache.json"),
+                          results_file=str(tmp_path / "latest_results.csv"), store_dir=str(tmp_path / "store"),
+                          **kwargs)
+
+
+@pytest.fixture
+def client(tmp_path):
+    return make_app(tmp_path).test_client()
+
+
+@pytest.fixture
+def scanning_app(tmp_path, monkeypatch):
+    app = make_app(tmp_path, interval=60, chain_ttl=60)
+    fyers = FakeClient()
+    monkeypatch.setattr(app.token_manager, "client", lambda: fyers)
+    monkeypatch.setattr(web, "load_symbols", lambda: list(SYMBOLS))
+    app.fyers = fyers
+    return app
+
+
+def age_cache(cache, seconds):
+    with cache.lock:
+        for key, (stored_at, size, response) in cache.entries.items():
+            cache.entries[key] = (stored_at - seconds, size, response)
+
+
+def test_refresh_within_ttl_is_served_from_cache(scanning_app):
+    first = scanning_app.service.refresh()
+    second = scanning_app.service.refresh()
+    assert scanning_app.fyers.calls == len(SYMBOLS)
+    levels = lambda snap: [(r["symbol"], r["support_strike"], r["resistance_strike"]) for r in snap.results]
+    assert levels(second) == levels(first) and len(first.results) == len(SYMBOLS)
+    stats = scanning_app.chain_cache.snapshot_stats()
+    assert stats["misses"] == len(SYMBOLS) and stats["hits"] == len(SYMBOLS)
+
+
+def test_stale_scan_publishes_then_rescans_on_refetched_chains(scanning_app):
+    scanning_app.service.refresh()
+    age_cache(scanning_app.chain_cache, 61)
+    published = scanning_app.broadcaster.stats["published"]
+    scanning_app.service.refresh()
+    stats = scanning_app.chain_cache.snapshot_stats()
+    assert stats["stale_hits"] == len(SYMBOLS) and stats["revalidations"] == len(SYMBOLS)
+    assert stats["hits"] == len(SYMBOLS)  # the rescan
+    assert scanning_app.fyers.calls == 2 * len(SYMBOLS)
+    # refreshing flag, rows from stale chains, final rows
+    assert scanning_app.broadcaster.stats["published"] - published == 3
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = ("import os, threading, oi_analyzer.web as web\n"
+            "assert not hasattr(web, 'app') and not hasattr(web, 'service')\n"
+            "print(threading.active_count(), sorted(os.listdir('.')))")
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    done = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.split() == ["1", "[]"]
+
+
+def test_apps_do_not_share_state(tmp_path):
+    one = web.create_app(store_dir=str(tmp_path / "a"))
+    two = web.create_app(store_dir=str(tmp_path / "b"))
+    assert one.service is not two.service and one.broadcaster is not two.broadcaster
+
+
+def missing_pyarrow():
+    raise ImportError("Parquet/Arrow output needs pyarrow (pip install pyarrow); use a .csv path instead")
+
+
+def test_parquet_download_without_pyarrow_is_a_client_error(client, monkeypatch):
+    monkeypatch.setattr(output, "_pyarrow", missing_pyarrow)
+    response = client.get("/download/parquet")
+    assert response.status_code == 406
+    assert b"pip install pyarrow" in response.data
+
+
+def test_csv_download_still_works(client):
+    response = client.get("/download/csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+
+
+def test_unknown_format_is_not_found(client):
+    assert client.get("/download/pdf").status_code == 404